@@ -0,0 +1,399 @@
+# ============================================================
+# 프레임워크 자체 성능 벤치마크 (시뮬레이터 불필요)
+#
+# 사용방법 :
+#   python auto_bench.py                               -> 기본 설정으로 실행
+#   python auto_bench.py --cycles 1k,100k,1M --width 4096 --ports 16
+#   python auto_bench.py --compare bench/<이전결과>.json -> 이전 커밋 결과와 비교
+#   python auto_bench.py --startup                     -> entry point 시작 시간만 측정
+#
+# 합성 DUT 헤더(.v), 그에 맞는 골든모델(.py), 녹화된 vsim transcript 를
+# 임시 디렉토리에 만들어서 아래 단계들을 각각 따로 측정함
+#   parse        : parse_ports / parse_parameters
+#   hex_gen      : generate_hex_inputs
+#   sim_to_csv   : sim_to_csv (합성 transcript 사용)
+#   golden       : run_single_case
+#   compare      : compare_csv
+#
+# --startup : 작은 case 를 수천 번 돌리는 CI 에서는 계산보다 시작 시간이 중요
+#   startup_python   : python -c pass (interpreter 자체, 기준선)
+#   startup_<tool>   : python <tool>.py --help (import + argparse, 새 프로세스)
+#   startup_pipeline : auto_system 처럼 네 단계 모듈을 한 interpreter 에서 import
+#   tool_probe_cold / tool_probe_cached : vsim / vlog 탐색 (캐시 없이 / 캐시 사용)
+#
+# 결과는 bench/bench_<commit>_<시간>.json 에 저장 → 커밋 간 비교 가능
+# ============================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import auto_vsim
+import auto_golden
+import auto_compare
+
+
+# ============================================================
+# 합성 DUT / 골든모델 / transcript 생성
+# ============================================================
+def make_synthetic_dut(path, n_ports, width, lanes):
+    """
+    n_ports 개의 packed 2D 입력 포트([lanes][width/lanes])와
+    출력 o_sum 하나를 가진 모듈 헤더 생성 (본문 없음)
+    """
+    data_width = max(1, width // lanes)
+
+    lines = []
+    lines.append("module bench_dut #(\n")
+    lines.append(f"    parameter INPUT_COUNT = {lanes},\n")
+    lines.append(f"    parameter DATA_WIDTH  = {data_width}\n")
+    lines.append(") (\n")
+    lines.append("    input clk,\n")
+    lines.append("    input rst_n,\n")
+    for k in range(n_ports):
+        lines.append(f"    input [INPUT_COUNT-1:0] [DATA_WIDTH-1:0] i_data{k},\n")
+    lines.append("    output reg [$clog2(INPUT_COUNT)+DATA_WIDTH-1:0] o_sum\n")
+    lines.append(");\n")
+    lines.append("endmodule\n")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+    return "bench_dut"
+
+
+# lanesum : 모든 i_data 포트 lane 합 (모델 연산 포함 측정)
+# identity: i_data0 하위 비트를 그대로 출력 (run_single_case 러너 오버헤드만 측정)
+GOLDEN_TEMPLATES = {}
+
+GOLDEN_TEMPLATES["lanesum"] = '''\
+from base_golden_model import BaseGoldenModel
+
+
+class GoldenBench(BaseGoldenModel):
+    """모든 i_data 포트의 lane 합 (FINAL_WIDTH 로 자름)"""
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.INPUT_COUNT = params["INPUT_COUNT"]
+        self.DATA_WIDTH  = params["DATA_WIDTH"]
+        self.mask = (1 << self.FINAL_WIDTH) - 1
+
+    def compute_raw(self, inputs):
+        lane_mask = (1 << self.DATA_WIDTH) - 1
+        total = 0
+        for name, flat in inputs.items():
+            if not name.startswith("i_data"):
+                continue
+            if flat is None:
+                return None
+            for i in range(self.INPUT_COUNT):
+                total += (flat >> (i * self.DATA_WIDTH)) & lane_mask
+        return total & self.mask
+'''
+
+GOLDEN_TEMPLATES["identity"] = '''\
+from base_golden_model import BaseGoldenModel
+
+
+class GoldenBenchIdentity(BaseGoldenModel):
+    """i_data0 를 FINAL_WIDTH 로 잘라서 그대로 출력"""
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.mask = (1 << self.FINAL_WIDTH) - 1
+
+    def compute_raw(self, inputs):
+        flat = inputs["i_data0"]
+        if flat is None:
+            return None
+        return flat & self.mask
+'''
+
+
+def make_synthetic_golden(path, kind="lanesum"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(GOLDEN_TEMPLATES[kind])
+
+
+def make_synthetic_transcript(path, cycles, out_ports, hex_len):
+    """vsim -c 출력 형태('# [Cycle N]', '#    port = hex')의 transcript 생성"""
+    rnd = random.Random(0)
+    bits = hex_len * 4
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("==== Simulation Log for case 0 ====\n")
+        f.write("# ==== START CASE 0 ====\n")
+        for cycle in range(cycles):
+            f.write(f"# [Cycle {cycle}]\n")
+            for p in out_ports:
+                f.write(f"#    {p} = {rnd.getrandbits(bits):0{hex_len}x}\n")
+
+
+# ============================================================
+# 측정 도우미
+# ============================================================
+def timed(fn, repeat):
+    """fn 을 repeat 번 실행하여 최소 wall time(초) 반환. stdout 은 버림"""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            dt = time.perf_counter() - t0
+        if best is None or dt < best:
+            best = dt
+    return best
+
+
+def parse_count(text):
+    """'1k', '10M' 같은 표기를 정수로 변환"""
+    text = text.strip().lower()
+    scale = 1
+    if text.endswith("k"):
+        scale, text = 1000, text[:-1]
+    elif text.endswith("m"):
+        scale, text = 1000000, text[:-1]
+    return int(float(text) * scale)
+
+
+def git_commit():
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=HERE, stderr=subprocess.DEVNULL)
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ============================================================
+# 한 설정(cycles) 에 대한 벤치마크
+# ============================================================
+def bench_one(work_dir, cycles, n_ports, width, lanes, repeat, golden_kind):
+
+    result_dir = "results"
+    os.makedirs(result_dir, exist_ok=True)
+
+    vfile = os.path.join(work_dir, "bench_dut.v")
+    top = make_synthetic_dut(vfile, n_ports, width, lanes)
+
+    golden_file = os.path.join(work_dir, "golden_bench.py")
+    make_synthetic_golden(golden_file, golden_kind)
+
+    rows = []
+
+    def record(stage, seconds, n=None):
+        rec = {"stage": stage, "cycles": cycles, "wall_s": seconds}
+        if n:
+            rec["cycles_per_s"] = n / seconds if seconds > 0 else None
+        rows.append(rec)
+        rate = f"{rec['cycles_per_s']:>14,.0f} cyc/s" if n else ""
+        print(f"  {stage:12s} {seconds * 1000:12.2f} ms  {rate}")
+
+    # ---- parse ----
+    state = {}
+
+    def do_parse():
+        state["ports"] = auto_vsim.parse_ports(vfile, top)
+        state["params"] = auto_vsim.parse_parameters(vfile, top)
+
+    record("parse", timed(do_parse, repeat))
+    ports, params = state["ports"], state["params"]
+
+    # ---- hex_gen ----
+    record("hex_gen", timed(
+        lambda: auto_vsim.generate_hex_inputs(ports, params, 0, cycles, result_dir),
+        repeat), cycles)
+    with contextlib.redirect_stdout(io.StringIO()):
+        auto_vsim.save_case_json(0, ports, params, cycles, result_dir)
+
+    with open(os.path.join(result_dir, "config_case0.json"), "r") as f:
+        cfg = json.load(f)
+
+    # ---- golden ----
+    with contextlib.redirect_stdout(io.StringIO()):
+        golden_class = auto_golden.load_golden_class(golden_file)
+    record("golden", timed(
+        lambda: auto_golden.run_single_case(golden_class, cfg),
+        repeat), cycles)
+
+    # ---- sim_to_csv ----
+    hex_len = cfg["layout"]["ports"][cfg["output_ports"][0]]["hex_digits"]
+    sim_log = os.path.join(result_dir, "SIMresult_case0.txt")
+    make_synthetic_transcript(sim_log, cycles, cfg["output_ports"], hex_len)
+    csv_log = os.path.join(result_dir, "csv_result_case0.csv")
+    record("sim_to_csv", timed(
+        lambda: auto_vsim.sim_to_csv(sim_log, csv_log),
+        repeat), cycles)
+
+    # ---- compare (golden vs 자기 자신 → 항상 PASS 경로 측정) ----
+    golden_csv = os.path.join(result_dir, "golden_case0.csv")
+
+    def do_compare():
+        g = auto_compare.read_csv(golden_csv)
+        r = auto_compare.read_csv(golden_csv)
+        auto_compare.compare_csv(g, r, 0, result_dir)
+
+    record("compare", timed(do_compare, repeat), cycles)
+
+    shutil.rmtree(result_dir)
+    return rows
+
+
+# ============================================================
+# 시작 시간 벤치마크
+# ============================================================
+STARTUP_TOOLS = ["auto_vsim", "auto_golden", "auto_compare", "auto_wave"]
+
+
+def run_python(args, repeat):
+    """새 python 프로세스 실행 시간 (최소값, 초)"""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        dt = time.perf_counter() - t0
+        if best is None or dt < best:
+            best = dt
+    return best
+
+
+def bench_startup(repeat):
+    import auto_tools
+
+    rows = []
+
+    def record(stage, seconds):
+        rows.append({"stage": stage, "cycles": 0, "wall_s": seconds})
+        print(f"  {stage:22s} {seconds * 1000:10.2f} ms")
+
+    print(f"\n[+] startup (best of {repeat})")
+    record("startup_python", run_python(["-c", "pass"], repeat))
+    for tool in STARTUP_TOOLS:
+        record(f"startup_{tool}", run_python([f"{tool}.py", "--help"], repeat))
+    record("startup_pipeline", run_python(["-c", f"import {', '.join(STARTUP_TOOLS)}"], repeat))
+
+    old_env = os.environ.get(auto_tools.CACHE_ENV)
+    os.environ[auto_tools.CACHE_ENV] = os.path.join(tempfile.mkdtemp(prefix="auto_bench_"),
+                                                    "tools.json")
+    try:
+        record("tool_probe_cold",
+               timed(lambda: auto_tools.find_tools(["vsim", "vlog"], use_cache=False), repeat))
+        auto_tools.find_tools(["vsim", "vlog"])
+        record("tool_probe_cached",
+               timed(lambda: auto_tools.find_tools(["vsim", "vlog"]), repeat))
+    finally:
+        shutil.rmtree(os.path.dirname(os.environ[auto_tools.CACHE_ENV]), ignore_errors=True)
+        if old_env is None:
+            del os.environ[auto_tools.CACHE_ENV]
+        else:
+            os.environ[auto_tools.CACHE_ENV] = old_env
+    return rows
+
+
+# ============================================================
+# 이전 결과와 비교
+# ============================================================
+def compare_with(baseline_path, rows, config):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    base_map = {(r["stage"], r["cycles"]): r["wall_s"] for r in base["results"]}
+
+    print(f"\n=== vs {base.get('commit', '?')} ({baseline_path}) ===")
+    if base.get("config") != config:
+        print(f"[WARN] config differs: {base.get('config')} vs {config}")
+    for r in rows:
+        key = (r["stage"], r["cycles"])
+        if key not in base_map:
+            continue
+        old = base_map[key]
+        ratio = old / r["wall_s"] if r["wall_s"] > 0 else float("inf")
+        print(f"  {r['stage']:12s} cycles={r['cycles']:<10d} "
+              f"{old * 1000:10.2f} ms → {r['wall_s'] * 1000:10.2f} ms  (x{ratio:.2f})")
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    ap = argparse.ArgumentParser(description="auto_* pipeline benchmark")
+    ap.add_argument("--cycles", default="1k,100k",
+                    help="comma separated cycle counts (1k ~ 10M)")
+    ap.add_argument("--ports", type=int, default=4, help="input port count")
+    ap.add_argument("--width", type=int, default=256,
+                    help="bits per input port (max 4096)")
+    ap.add_argument("--lanes", type=int, default=8, help="packed lanes per port")
+    ap.add_argument("--golden", choices=sorted(GOLDEN_TEMPLATES), default="lanesum",
+                    help="synthetic golden model (identity = runner overhead only)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out-dir", default=os.path.join(HERE, "bench"))
+    ap.add_argument("--compare", help="previous bench JSON to compare against")
+    ap.add_argument("--startup", action="store_true",
+                    help="measure entry point startup time instead of the pipeline stages")
+    args = ap.parse_args()
+
+    if not 1 <= args.width <= 4096:
+        print("[ERROR] --width must be 1..4096")
+        sys.exit(1)
+
+    cycle_list = [parse_count(c) for c in args.cycles.split(",") if c.strip()]
+
+    rows = []
+    old_cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="auto_bench_")
+    try:
+        os.chdir(work_dir)
+        if args.startup:
+            rows.extend(bench_startup(max(args.repeat, 5)))
+            cycle_list = []
+        for cycles in cycle_list:
+            print(f"\n[+] cycles={cycles} ports={args.ports} width={args.width} "
+                  f"lanes={args.lanes} golden={args.golden}")
+            rows.extend(bench_one(work_dir, cycles, args.ports,
+                                  args.width, args.lanes, args.repeat,
+                                  args.golden))
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = git_commit()
+    data = {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "config": {
+            "ports": args.ports,
+            "width": args.width,
+            "lanes": args.lanes,
+            "repeat": args.repeat,
+            "golden": args.golden,
+            "startup": args.startup,
+        },
+        "results": rows,
+    }
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_path = os.path.join(
+        args.out_dir, f"bench_{commit}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    print(f"\n[+] Saved benchmark: {out_path}")
+
+    if args.compare:
+        compare_with(args.compare, rows, data["config"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,30 @@
+import argparse
 import os
+import re
 import json
+from operator import eq
+
+from auto_profile import Profiler
+from auto_storage import artifact_path, find_artifact, open_text
 
 # ------------------------------------------------------------
 # 공용 CSV 읽기 (UTF-8)
 # ------------------------------------------------------------
 def read_csv(path):
+    path = find_artifact(path)      # .gz / .zst 로 저장된 경우도 찾음
     if not os.path.exists(path):
         return None
-    with open(path, "r", encoding="utf-8") as f:
+    with open_text(path, "r") as f:
         return [line.rstrip("\n") for line in f]
 
 
 # ------------------------------------------------------------
 # 비교 결과 저장 (개별 compare_caseN.txt)
+#   실패 위치(line N)가 있으면 그 주변 cycle 의 golden / RTL / 입력 / 로그를 같이 기록
 # ------------------------------------------------------------
+FAIL_LINE_RE = re.compile(r"at line (\d+)")
+
+
 def save_compare_result(case_id, is_equal, zero_x_mismatch_list, error_msg, output_dir="results"):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -25,6 +36,10 @@ def save_compare_result(case_id, is_equal, zero_x_mismatch_list, error_msg, outp
 
         if error_msg:
             f.write(f"[FAIL] {error_msg}\n")
+            m = FAIL_LINE_RE.search(error_msg)
+            if m:
+                from auto_index import failure_context
+                f.write(failure_context(case_id, int(m.group(1)) - 1, output_dir))
             return
 
         if is_equal:
@@ -42,6 +57,27 @@ def save_compare_result(case_id, is_equal, zero_x_mismatch_list, error_msg, outp
     print(f"[+] 결과 저장: {filename}")
 
 
+# ------------------------------------------------------------
+# 값 하나 비교 (0↔x 허용)
+#   return: None(같음) / "Length mismatch" / "Mismatch"
+# ------------------------------------------------------------
+def compare_values(g_val, r_val):
+    if g_val == r_val:
+        return None
+
+    if len(g_val) != len(r_val):
+        return "Length mismatch"
+
+    for c1, c2 in zip(g_val, r_val):
+        if c1 == c2:
+            continue
+        if (c1 == '0' and c2 == 'x') or (c1 == 'x' and c2 == '0'):
+            continue
+        return "Mismatch"
+
+    return None
+
+
 # ------------------------------------------------------------
 # CSV 비교 (UTF-8 안전)
 # ------------------------------------------------------------
@@ -79,22 +115,9 @@ def compare_csv(golden_lines, rtl_lines, case_id, output_dir="results"):
         g_val = g_val.strip()
         r_val = r_val.strip()
 
-        if len(g_val) != len(r_val):
-            err = f"Length mismatch at line {idx}"
-            save_compare_result(case_id, False, [], err, output_dir)
-            return False, err, []
-
-        equal = True
-        for c1, c2 in zip(g_val, r_val):
-            if c1 == c2:
-                continue
-            if (c1 == '0' and c2 == 'x') or (c1 == 'x' and c2 == '0'):
-                continue
-            equal = False
-            break
-
-        if not equal:
-            err = f"Mismatch at line {idx}"
+        kind = compare_values(g_val, r_val)
+        if kind is not None:
+            err = f"{kind} at line {idx}"
             save_compare_result(case_id, False, [], err, output_dir)
             return False, err, []
 
@@ -106,28 +129,217 @@ def compare_csv(golden_lines, rtl_lines, case_id, output_dir="results"):
 
 
 # ------------------------------------------------------------
-# config_caseN.json 읽기
+# self-check TB 결과 읽기 (auto_vsim --self-check)
+#   TB 가 sim 로그에 남긴 [SELFCHECK ...] 줄로 compare_csv 와 같은 결과를 만듦
+# ------------------------------------------------------------
+SELFCHECK_RE = re.compile(
+    r"\[SELFCHECK (MISMATCH|ZX)\] cycle=(\d+) port=(\w+) expected=(\S+) actual=(\S+)")
+
+
+def read_selfcheck_result(sim_log):
+    """return: (ok, errmsg, zero_x_mismatch_list)"""
+    sim_log = find_artifact(sim_log)
+    if not os.path.exists(sim_log):
+        return False, "파일 누락", []
+
+    zero_x = []
+    passed = False
+
+    with open_text(sim_log, "r", errors="ignore") as f:
+        for line in f:
+            if "[SELFCHECK" not in line:
+                continue
+            if "[SELFCHECK PASS]" in line:
+                passed = True
+                continue
+
+            m = SELFCHECK_RE.search(line)
+            if not m:
+                continue
+            kind, cycle, port, exp, act = m.groups()
+            idx = int(cycle) + 1        # CSV 라인 번호 (header = 0)
+            if kind == "MISMATCH":
+                err = f"Mismatch at line {idx} (port {port}: golden={exp}, rtl={act})"
+                return False, err, []
+            zero_x.append((idx, exp, act))
+
+    if not passed:
+        return False, "self-check TB did not finish", []
+
+    return True, None, zero_x
+
+
+# ------------------------------------------------------------
+# latency 정렬 (auto_compare.py --align)
+#   golden 모델의 self.latency 가 틀리면 모든 cycle 이 FAIL → 한 번 돌려서 맞는 값을 찾음
+#   golden 행 i 와 RTL 행 i+d 를 d = -max..+max 로 맞춰보고 일치율이 가장 높은 d 를 보고
+#   (0↔x 허용 규칙은 양쪽의 x 를 0 으로 바꿔서 같은지 보는 것과 동일 → 문자열 == 를 map 으로 한 번에)
+#   d > 0 : RTL 이 d cycle 늦음 → golden latency 를 d 만큼 늘려야 함
+#
+#   모든 d 를 전체 행으로 비교하면 (2*max+1) × rows 번 → 앞 ALIGN_PROBE_ROWS 행으로 먼저 거르고
+#   상위 ALIGN_REFINE 개 d 만 전체 행으로 계산. 그것도 block 단위로 세다가
+#   남은 행이 전부 맞아도 지금까지의 최고 일치율에 못 미치면 중단
+# ------------------------------------------------------------
+ALIGN_MAX_OFFSET = 32
+ALIGN_ROWS       = 200000       # 앞에서부터 이만큼만 사용
+ALIGN_SKIP       = 3            # reset cycle (출력이 0 으로 고정된 구간) 제외
+ALIGN_PROBE_ROWS = 4096         # 모든 d 를 훑는 앞부분
+ALIGN_REFINE     = 5            # 전체 행으로 다시 계산하는 d 수 (리포트의 상위 5 개)
+ALIGN_BLOCK      = 8192
+_X_TO_0 = str.maketrans("x", "0")
+
+
+def _aligned_values(lines, rows):
+    """header 제외, cycle 칸을 뗀 값 부분 (x → 0)"""
+    return [ln.split(",", 1)[-1].strip().translate(_X_TO_0) for ln in lines[1:rows + 1]]
+
+
+def _match_rate(g, r, d, lo, hi, need=0.0):
+    """g[i] == r[i+d] 인 비율 (i in [lo, hi)). need 에 못 미칠 것이 확실해지면 None"""
+    total = hi - lo
+    matches = 0
+    for a in range(lo, hi, ALIGN_BLOCK):
+        b = min(hi, a + ALIGN_BLOCK)
+        matches += sum(map(eq, g[a:b], r[a + d:b + d]))
+        if matches + (hi - b) < need * total:
+            return None
+    return matches / total
+
+
+def align_offsets(golden_lines, rtl_lines, max_offset=ALIGN_MAX_OFFSET, rows=ALIGN_ROWS):
+    """[(일치율, d)] 일치율 높은 순 (같으면 |d| 작은 순), 전체 행으로 계산한 d 만"""
+    g = _aligned_values(golden_lines, rows)
+    r = _aligned_values(rtl_lines, rows)
+    n = min(len(g), len(r))
+
+    def rank(score):
+        return -score[0], abs(score[1])
+
+    spans = {}
+    probe = []
+    for d in range(-max_offset, max_offset + 1):
+        lo = max(ALIGN_SKIP, ALIGN_SKIP - d)
+        hi = min(n, n - d)
+        if hi - lo <= 0:
+            continue
+        spans[d] = (lo, hi)
+        probe.append((_match_rate(g, r, d, lo, min(hi, lo + ALIGN_PROBE_ROWS)), d))
+    probe.sort(key=rank)
+
+    scores = []
+    best = 0.0
+    for _, d in probe[:ALIGN_REFINE]:
+        rate = _match_rate(g, r, d, *spans[d], need=best)
+        if rate is not None:
+            scores.append((rate, d))
+            best = max(best, rate)
+
+    scores.sort(key=rank)
+    return scores
+
+
+def align_case(case_id, golden_lines, rtl_lines, model_latency=None,
+               max_offset=ALIGN_MAX_OFFSET, output_dir="results"):
+    if golden_lines is None or rtl_lines is None:
+        print(f"[CASE {case_id}] 파일 누락 → 정렬 불가")
+        return None
+
+    scores = align_offsets(golden_lines, rtl_lines, max_offset)
+    if not scores:
+        print(f"[CASE {case_id}] 행이 너무 적어서 정렬 불가")
+        return None
+
+    best, d = scores[0]
+    out = [f"=== Latency Alignment for CASE {case_id} ===\n\n"]
+    if model_latency is None:
+        out.append(f"best offset: RTL = golden {d:+d} cycle(s) (match {best * 100:.2f}%)\n")
+    else:
+        out.append(f"best latency: {model_latency + d} (current {model_latency}, "
+                   f"offset {d:+d}, match {best * 100:.2f}%)\n")
+    out.append("\n   offset   match\n")
+    for score, off in scores[:5]:
+        out.append(f"   {off:+6d}   {score * 100:6.2f}%\n")
+
+    path = os.path.join(output_dir, f"align_case{case_id}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(out)
+    print(f"[CASE {case_id}] " + out[1].strip() + f" → {path}")
+    return d, best
+
+
+def align_all(configs, golden_file=None, max_offset=ALIGN_MAX_OFFSET, case_ids=None,
+              result_dir="results"):
+    model_latency = None
+    golden_class = None
+    if golden_file:
+        from auto_golden import load_golden_class
+        golden_class = load_golden_class(golden_file, verbose=False)     # case 마다 exec 하지 않음
+
+    offsets = {}
+    for cfg in configs:
+        case_id = cfg["case_id"]
+        if case_ids is not None and case_id not in case_ids:
+            continue
+        if golden_class is not None:
+            model_latency = golden_class(cfg["params"]).latency
+        golden_path = os.path.join(result_dir, f"golden_case{case_id}.csv")
+        rtl_path = os.path.join(result_dir, f"csv_result_case{case_id}.csv")
+        res = align_case(case_id,
+                         read_case_csv(golden_path, case_id, "golden", result_dir),
+                         read_case_csv(rtl_path, case_id, "rtl", result_dir),
+                         model_latency, max_offset, result_dir)
+        if res is not None:
+            offsets[case_id] = res
+
+    found = {d for d, _ in offsets.values()}
+    if len(found) == 1:
+        d = found.pop()
+        if model_latency is None:
+            print(f"\n[+] 모든 case 에서 같은 offset {d:+d} → golden latency 를 {d:+d} 만큼 조정")
+        else:
+            print(f"\n[+] 모든 case 에서 같은 결과 → self.latency = {model_latency + d}")
+    elif found:
+        print(f"\n[+] case 마다 offset 이 다름: {sorted(found)} (latency 외의 차이일 수 있음)")
+    return offsets
+
+
+# ------------------------------------------------------------
+# config_caseN.json 읽기 (--store run 이면 results.db 의 config 도, 같은 case 는 파일 우선)
 # ------------------------------------------------------------
 def load_all_configs(results_dir="results"):
-    configs = []
+    from auto_resultstore import stored_configs
+
+    configs = {}
     for fname in os.listdir(results_dir):
         if fname.startswith("config_case") and fname.endswith(".json"):
             full = os.path.join(results_dir, fname)
             with open(full, "r", encoding="utf-8") as f:
                 cfg = json.load(f)
-                configs.append(cfg)
+                configs[cfg["case_id"]] = cfg
 
-    configs.sort(key=lambda x: x["case_id"])
-    return configs
+    for cfg in stored_configs(results_dir):
+        configs.setdefault(cfg["case_id"], cfg)
+
+    return [configs[k] for k in sorted(configs)]
+
+
+def read_case_csv(path, case_id, source, results_dir="results"):
+    """CSV 파일, 없으면 (--store 로 모아둔 run) results.db 의 컬럼에서"""
+    lines = read_csv(path)
+    if lines is None:
+        from auto_resultstore import stored_csv_lines
+        lines = stored_csv_lines(results_dir, case_id, source)
+    return lines
 
 
 # ------------------------------------------------------------
 # 통합 로그(summary log) 저장
 # ------------------------------------------------------------
-def save_summary_log(summary_list, output_dir="results", filename="compare_summary.txt"):
-    path = os.path.join(output_dir, filename)
+def save_summary_log(summary_list, output_dir="results", filename="compare_summary.txt",
+                     compression=None):
+    path = artifact_path(os.path.join(output_dir, filename), compression)
 
-    with open(path, "w", encoding="utf-8") as f:
+    with open_text(path, "w") as f:
         f.write("========== Compare Summary ==========\n\n")
 
         for item in summary_list:
@@ -150,12 +362,48 @@ def save_summary_log(summary_list, output_dir="results", filename="compare_summa
 # 메인
 # ------------------------------------------------------------
 def main():
+    from auto_rundir import current_result_dir
+
+    ap = argparse.ArgumentParser(description="golden CSV vs RTL CSV")
+    ap.add_argument("--align", action="store_true",
+                    help="instead of comparing, find the golden/RTL cycle offset that matches "
+                         "best (use it to fix the golden model's latency)")
+    ap.add_argument("--golden", metavar="GOLDEN_PY",
+                    help="with --align: report the absolute latency for this golden model")
+    ap.add_argument("--max-offset", type=int, default=ALIGN_MAX_OFFSET)
+    ap.add_argument("--cases", help="with --align: comma separated case ids")
+    ap.add_argument("--result-dir", default=current_result_dir(),
+                    help="run directory (default: the current run, else results)")
+    args = ap.parse_args()
+    result_dir = args.result_dir
+
     print("[+] auto_compare 시작 (UTF-8 mode)\n")
 
-    configs = load_all_configs()
+    configs = load_all_configs(result_dir)
     print(f"[+] 발견된 config 파일: {len(configs)}\n")
 
+    if args.align:
+        case_ids = {int(c) for c in args.cases.split(",")} if args.cases else None
+        align_all([c for c in configs if c.get("check") != "selfcheck"],
+                  args.golden, args.max_offset, case_ids, result_dir)
+        return
+
+    prof = Profiler("compare")
+
     summary = []
+    verdicts = {}       # case_id -> (ok, errmsg, zx_list) : --store 일 때 DB 로
+
+    # --store : 판정은 끝나는 대로 DB 에 (중간에 멈춰도 끝난 case 는 남음)
+    store = None
+    if configs and configs[0].get("store"):
+        from auto_resultstore import ResultStore
+        store = ResultStore(result_dir)
+
+    def record(case_id, ok, errmsg, zx_list):
+        verdicts[case_id] = (ok, errmsg, zx_list)
+        if store is not None:
+            store.put_verdict(case_id, ok, errmsg, zx_list)
+            store.db.commit()
 
     total = len(configs)
     passed = 0
@@ -163,17 +411,36 @@ def main():
     for cfg in configs:
         case_id = cfg["case_id"]
 
-        golden_path = f"results/golden_case{case_id}.csv"
-        rtl_path    = f"results/csv_result_case{case_id}.csv"
+        # self-check TB 는 시뮬레이터 안에서 이미 비교함 → 로그에서 결과만 읽음
+        if cfg.get("check") == "selfcheck":
+            sim_log = os.path.join(result_dir, f"SIMresult_case{case_id}.txt")
+            print(f"[CASE {case_id}] Self-check result: {sim_log}")
+            ok, errmsg, zx_list = read_selfcheck_result(sim_log)
+            save_compare_result(case_id, ok, zx_list, errmsg, result_dir)
+            record(case_id, ok, errmsg, zx_list)
+            if ok:
+                print("   → PASS\n")
+                passed += 1
+                summary.append((case_id, True, None, len(zx_list)))
+            else:
+                print("   → FAIL\n")
+                summary.append((case_id, False, errmsg, 0))
+            continue
+
+        golden_path = os.path.join(result_dir, f"golden_case{case_id}.csv")
+        rtl_path    = os.path.join(result_dir, f"csv_result_case{case_id}.csv")
 
         print(f"[CASE {case_id}] Comparing:")
         print(f"   golden: {golden_path}")
         print(f"   rtl   : {rtl_path}")
 
-        golden_lines = read_csv(golden_path)
-        rtl_lines    = read_csv(rtl_path)
+        compare_path = os.path.join(result_dir, f"compare_case{case_id}.txt")
+        with prof.stage("compare", case_id, cfg["cycles"], [compare_path]):
+            golden_lines = read_case_csv(golden_path, case_id, "golden", result_dir)
+            rtl_lines    = read_case_csv(rtl_path, case_id, "rtl", result_dir)
 
-        ok, errmsg, zx_list = compare_csv(golden_lines, rtl_lines, case_id)
+            ok, errmsg, zx_list = compare_csv(golden_lines, rtl_lines, case_id, result_dir)
+        record(case_id, ok, errmsg, zx_list)
 
         if ok:
             print("   → PASS\n")
@@ -183,12 +450,31 @@ def main():
             print("   → FAIL\n")
             summary.append((case_id, False, errmsg, 0))
 
+    if store is not None:
+        store.close()
+
     print("========================================")
     print(f"전체 결과: {passed}/{total} CASE PASS")
     print("========================================")
+    if total and passed == 0:
+        print("[+] 모든 case 가 FAIL → latency 가 의심되면: python auto_compare.py --align")
 
     # ★ 통합 로그 작성 ★
-    save_summary_log(summary)
+    compression = configs[0].get("compression") if configs else None
+    save_summary_log(summary, result_dir, compression=compression)
+
+    # ★ run 간 history 기록 (입력 hex 가 지워지기 전에) ★
+    if configs:
+        from auto_history import record_run
+        record_run(configs, verdicts, result_dir, prof.records)
+
+    # ★ case 별 작은 파일 → results/results.db ★
+    if configs and configs[0].get("store"):
+        from auto_resultstore import consolidate
+        with prof.stage("store"):
+            consolidate(configs, verdicts, result_dir)
+
+    prof.save(result_dir)
 
 
 # ------------------------------------------------------------
@@ -0,0 +1,296 @@
+# ============================================================
+# 포트별 stimulus 제약 (constraints JSON)
+#
+# 기본 stimulus 는 포트 폭만큼의 균일 random
+#   → mux 의 sel >= INPUT_COUNT 같은 의미 없는 입력에 cycle 을 낭비하고
+#     valid / ready 같은 흐름은 표현할 수 없음
+#
+# 사용 : python auto_vsim.py --constraints constraints.json file1.v ...
+#   제약은 config_case<N>.json 의 "constraints" 에 그대로 기록됨 (golden 쪽에서 참조 가능)
+#
+# 형식 (포트 이름 → 제약, 없는 포트는 균일 random)
+#   {
+#     "sel":     {"range": [0, "INPUT_COUNT-1"]},
+#     "valid":   {"sequence": [1, 1, 1, 0]},
+#     "mode":    {"values": [0, 2, 5], "hold": 8},
+#     "data_in": {"lanes": "DATA_WIDTH",
+#                 "lane": {"dist": {"0": 1, "2**DATA_WIDTH-1": 1, "random": 6}}},
+#     "burst":   {"dist": {"0:15": 3, "16:255": 1}, "hold": [1, 32]}
+#   }
+#
+#   range    : [lo, hi] 균일 (양 끝 포함)
+#   values   : 목록 중 균일
+#   dist     : {값 | "lo:hi" | "random": 가중치}
+#   sequence : 목록을 순서대로 반복
+#   lanes    : packed bus 를 lane 폭으로 나눠 lane 마다 "lane" 제약 (list 면 lane 별로, lane0 = LSB)
+#   hold     : 값 하나를 N cycle 유지 ([min, max] 이면 매번 random 길이)
+#   숫자 자리에는 파라미터 식을 쓸 수 있음 ("INPUT_COUNT-1", "$clog2(DEPTH)")
+#
+# 생성은 CONSTRAINT_CHUNK cycle 단위로 한 번에
+#   작은 범위 / 목록 / 가중치 선택 : randbytes 로 16-bit 난수를 한 번에 만들고 65536 칸 표로 변환
+#   (map + __getitem__ 이라 loop 가 C 쪽에서 돌고, 가중치 정밀도는 1/65536)
+#   range / values 는 균일해야 하므로 개수가 65536 을 나눠떨어뜨릴 때만 표 사용
+#   (그 외에는 칸 수가 값마다 1 씩 달라져서 치우침 → rng.choices)
+# ============================================================
+
+import json
+from itertools import chain, cycle, islice, repeat
+
+CONSTRAINT_CHUNK = 1 << 16       # 한 번에 만드는 cycle 수
+TABLE_SIZE = 1 << 16             # 표 선택 (16-bit 난수 하나 = 선택 하나)
+_EXACT_RANGE = 1 << 48           # 이보다 넓은 range 는 choices(float) 대신 정수 rejection
+
+
+def load_constraints(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise RuntimeError(f"[ERROR] {path}: constraints must be an object keyed by port name")
+    return data
+
+
+# ------------------------------------------------------------
+# 숫자 / 파라미터 식
+# ------------------------------------------------------------
+def param_value(expr, params):
+    from auto_layout import eval_expr
+
+    try:
+        return eval_expr(expr, params)
+    except NameError as e:
+        raise RuntimeError(f"[ERROR] Unknown parameter {e} in constraint value '{expr}'")
+
+
+# ------------------------------------------------------------
+# 가중치 → 65536 칸 표 / 표에서 n 개 선택
+# ------------------------------------------------------------
+def make_table(items, weights=None):
+    if weights is None:
+        weights = [1] * len(items)
+    total = float(sum(weights))
+    table = []
+    acc = 0.0
+    for item, w in zip(items, weights):
+        acc += w
+        slots = round(acc / total * TABLE_SIZE) - len(table)
+        if w > 0 and slots <= 0:
+            raise RuntimeError(f"[ERROR] Constraint weight {w} is below the 1/{TABLE_SIZE} "
+                               f"resolution of the selection table (total {total:g})")
+        table.extend([item] * slots)
+    return table
+
+
+def exact_table(count):
+    """균일 선택을 표로 해도 치우치지 않는 개수인지"""
+    return count <= TABLE_SIZE and TABLE_SIZE % count == 0
+
+
+def table_pick(rng, table, n):
+    return list(map(table.__getitem__, memoryview(rng.randbytes(2 * n)).cast("H")))
+
+
+# ------------------------------------------------------------
+# 값 생성기 : take(n) → int n 개 (상태는 chunk 를 넘어 유지)
+# ------------------------------------------------------------
+class UniformGen:
+    def __init__(self, rng, width):
+        self.rng = rng
+        self.width = width
+
+    def take(self, n):
+        return list(map(self.rng.getrandbits, repeat(self.width, n)))
+
+
+class RangeGen:
+    def __init__(self, rng, lo, hi):
+        if hi < lo:
+            raise RuntimeError(f"[ERROR] Empty constraint range [{lo}, {hi}]")
+        self.rng = rng
+        self.lo = lo
+        self.span = hi - lo + 1
+        self.values = range(lo, hi + 1)
+        self.table = make_table(self.values) if exact_table(self.span) else None
+
+    def take(self, n):
+        if self.table is not None:
+            return table_pick(self.rng, self.table, n)
+        if self.span <= _EXACT_RANGE:
+            return self.rng.choices(self.values, k=n)
+        bits = self.span.bit_length()
+        out = []
+        getrandbits = self.rng.getrandbits
+        while len(out) < n:
+            v = getrandbits(bits)
+            if v < self.span:
+                out.append(self.lo + v)
+        return out
+
+
+class ChoiceGen:
+    def __init__(self, rng, values):
+        if not values:
+            raise RuntimeError("[ERROR] Empty constraint value list")
+        self.rng = rng
+        self.values = values
+        self.table = make_table(values) if exact_table(len(values)) else None
+
+    def take(self, n):
+        if self.table is None:
+            return self.rng.choices(self.values, k=n)
+        return table_pick(self.rng, self.table, n)
+
+
+class DistGen:
+    """가중치로 고른 뒤 항목별로 필요한 개수만큼 한 번에 생성해서 제자리에 배치"""
+
+    def __init__(self, rng, entries):
+        weights = [w for _, w in entries]
+        if not weights or min(weights) < 0 or sum(weights) <= 0:
+            raise RuntimeError("[ERROR] Constraint dist needs non-negative weights (sum > 0)")
+        self.rng = rng
+        self.gens = [g for g, _ in entries]
+        self.table = make_table(range(len(entries)), weights)
+
+    def take(self, n):
+        picks = table_pick(self.rng, self.table, n)
+        nexts = [iter(g.take(picks.count(k))).__next__ for k, g in enumerate(self.gens)]
+        return [nexts[k]() for k in picks]
+
+
+class SequenceGen:
+    def __init__(self, values):
+        if not values:
+            raise RuntimeError("[ERROR] Empty constraint sequence")
+        self.values = values
+        self.it = cycle(values)
+
+    def take(self, n):
+        return list(islice(self.it, n))
+
+
+class HoldGen:
+    """base 값 하나를 hold cycle 유지 (남은 반복은 다음 chunk 로)"""
+
+    def __init__(self, rng, base, lo, hi):
+        self.rng = rng
+        self.base = base
+        self.lengths = range(max(1, lo), max(1, hi) + 1)
+        self.pending = []
+
+    def take(self, n):
+        out = self.pending
+        while len(out) < n:
+            need = n - len(out)
+            k = -(-need // self.lengths.start)
+            vals = self.base.take(k)
+            if len(self.lengths) == 1:
+                lens = repeat(self.lengths.start, k)
+            else:
+                lens = self.rng.choices(self.lengths, k=k)
+            out.extend(chain.from_iterable(map(repeat, vals, lens)))
+        self.pending = out[n:]
+        return out[:n]
+
+
+class LaneGen:
+    def __init__(self, lanes, lane_width):
+        self.lanes = lanes
+        self.lane_width = lane_width
+
+    def take(self, n):
+        out = self.lanes[0].take(n)
+        for k, g in enumerate(self.lanes[1:], 1):
+            shift = k * self.lane_width
+            out = [o | (v << shift) for o, v in zip(out, g.take(n))]
+        return out
+
+
+# ------------------------------------------------------------
+# 제약 dict → 생성기
+# ------------------------------------------------------------
+def _check(value, width, port):
+    if not 0 <= value < (1 << width):
+        raise RuntimeError(f"[ERROR] Constraint value {value} does not fit {port} ({width} bits)")
+    return value
+
+
+def _dist_entry(key, width, params, rng, port):
+    if key == "random":
+        return UniformGen(rng, width)
+    if ":" in key:
+        lo, hi = (param_value(x.strip(), params) for x in key.split(":", 1))
+        return RangeGen(rng, _check(lo, width, port), _check(hi, width, port))
+    return ChoiceGen(rng, [_check(param_value(key, params), width, port)])
+
+
+def compile_constraint(spec, width, params, rng, port="port"):
+    if spec is None:
+        return UniformGen(rng, width)
+    if not isinstance(spec, dict):
+        raise RuntimeError(f"[ERROR] Constraint for {port} must be an object")
+
+    if "lanes" in spec:
+        lane_width = param_value(spec["lanes"], params)
+        if lane_width <= 0 or width % lane_width:
+            raise RuntimeError(f"[ERROR] {port}: {width} bits is not a multiple of lane width "
+                               f"{lane_width}")
+        count = width // lane_width
+        lane_specs = spec.get("lane")
+        if not isinstance(lane_specs, list):
+            lane_specs = [lane_specs] * count
+        if len(lane_specs) != count:
+            raise RuntimeError(f"[ERROR] {port}: {len(lane_specs)} lane constraints for "
+                               f"{count} lanes")
+        gen = LaneGen([compile_constraint(s, lane_width, params, rng, f"{port}[lane {k}]")
+                       for k, s in enumerate(lane_specs)], lane_width)
+    elif "range" in spec:
+        lo, hi = (param_value(x, params) for x in spec["range"])
+        gen = RangeGen(rng, _check(lo, width, port), _check(hi, width, port))
+    elif "values" in spec:
+        gen = ChoiceGen(rng, [_check(param_value(v, params), width, port)
+                              for v in spec["values"]])
+    elif "dist" in spec:
+        gen = DistGen(rng, [(_dist_entry(str(k), width, params, rng, port), float(w))
+                            for k, w in spec["dist"].items()])
+    elif "sequence" in spec:
+        gen = SequenceGen([_check(param_value(v, params), width, port)
+                           for v in spec["sequence"]])
+    else:
+        gen = UniformGen(rng, width)
+
+    hold = spec.get("hold")
+    if hold is not None:
+        lo, hi = (hold, hold) if not isinstance(hold, list) else hold
+        lo, hi = param_value(lo, params), param_value(hi, params)
+        if not 1 <= lo <= hi:
+            raise RuntimeError(f"[ERROR] {port}: hold must be N >= 1 or [min, max] with "
+                               f"1 <= min <= max, got {hold}")
+        gen = HoldGen(rng, gen, lo, hi)
+
+    return gen
+
+
+def port_generators(port_widths, params, rng, constraints=None):
+    """[(name, width)] → [생성기] (제약 없는 포트는 균일 random)"""
+    constraints = constraints or {}
+    unknown = set(constraints) - {name for name, _ in port_widths}
+    if unknown:
+        raise RuntimeError(f"[ERROR] Constraints for unknown input port(s): "
+                           f"{', '.join(sorted(unknown))}")
+    return [compile_constraint(constraints.get(name), width, params, rng, name)
+            for name, width in port_widths]
+
+
+_HEX_TABLES = {}
+
+
+def hex_lines(values, hex_digits):
+    """int list → hex 줄들 (한 문자열). 4 자리 이하는 미리 만든 문자열 표로"""
+    if hex_digits <= 4:
+        table = _HEX_TABLES.get(hex_digits)
+        if table is None:
+            table = _HEX_TABLES[hex_digits] = [f"{i:0{hex_digits}x}\n"
+                                               for i in range(16 ** hex_digits)]
+        return "".join(map(table.__getitem__, values))
+    spec = f"{{:0{hex_digits}x}}\n"
+    return "".join(map(spec.format, values))
@@ -0,0 +1,182 @@
+# ============================================================
+# lockstep co-simulation (named pipe)
+#
+# auto_vsim.py --cosim golden_model.py file1.v ... 로 실행하면
+# TB 가 매 cycle 출력값을 results/cosim_case<N>.fifo 로 흘려보내고,
+# 이 모듈이 골든모델을 같은 속도로 돌리면서 도착하는 cycle 마다 바로 비교함
+# 첫 번째 진짜 mismatch(0↔x 허용)가 나오면 vsim 을 종료 → 실패 case 는 몇 초 만에 끝남
+#
+# 결과는 기존 흐름과 같은 파일에 저장
+#   csv_result_case<N>.csv / golden_case<N>.csv : 비교한 구간까지의 행
+#   compare_case<N>.txt                         : PASS/FAIL
+#
+# named pipe(os.mkfifo)가 필요하므로 Linux/macOS 전용
+# ============================================================
+
+import os
+import select
+import subprocess
+import time
+
+from auto_golden import iter_golden_rows
+from auto_compare import compare_values, save_compare_result
+from auto_storage import artifact_path, open_text
+
+
+# ------------------------------------------------------------
+# FIFO 생성
+# ------------------------------------------------------------
+def make_fifo(path):
+    if not hasattr(os, "mkfifo"):
+        raise RuntimeError("[ERROR] cosim mode needs POSIX named pipes (os.mkfifo)")
+    if os.path.exists(path):
+        os.remove(path)
+    os.mkfifo(path)
+    return path
+
+
+# ------------------------------------------------------------
+# FIFO 에서 줄 단위로 읽기 (writer 가 닫거나 vsim 이 죽으면 종료)
+# ------------------------------------------------------------
+def iter_fifo_lines(fd, proc, poll_interval):
+    pending = b""
+    while True:
+        ready, _, _ = select.select([fd], [], [], poll_interval)
+        if not ready:
+            # writer 가 아직 안 열었거나 데이터 없음 → vsim 이 살아있는지만 확인
+            if proc.poll() is not None:
+                break
+            continue
+
+        data = os.read(fd, 1 << 16)
+        if not data:        # writer 가 닫음 (EOF)
+            break
+
+        data = pending + data
+        lines = data.split(b"\n")
+        pending = lines.pop()
+        for ln in lines:
+            yield ln.decode("ascii", errors="replace").strip()
+
+    if pending.strip():
+        yield pending.decode("ascii", errors="replace").strip()
+
+
+# ------------------------------------------------------------
+# golden 행을 한 줄씩
+# ------------------------------------------------------------
+def iter_golden_lines(golden_class, cfg):
+    for rows in iter_golden_rows(golden_class, cfg):
+        for row in rows:
+            yield row.rstrip("\n")
+
+
+# ------------------------------------------------------------
+# 한 CASE co-simulation
+# ------------------------------------------------------------
+def run_cosim_case(cmd, sim_log, fifo_path, golden_class, cfg,
+                   result_dir="results", on_progress=None, poll_interval=0.2):
+    """
+    cmd        : vsim 명령 (TB 는 fifo_path 에 'cycle,out1,out2...' 를 씀)
+    return     : (ok, errmsg, zero_x_mismatch_list)
+    """
+    case_id = cfg["case_id"]
+    cycles = cfg["cycles"]
+    header = "cycle," + ",".join(cfg["output_ports"]) + "\n"
+
+    make_fifo(fifo_path)
+
+    # reader 를 먼저 열어둬야 TB 의 $fopen(.., "w") 가 바로 진행됨
+    fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+
+    print("[CMD]", " ".join(cmd))
+    log_w = open(sim_log, "ab")
+    proc = subprocess.Popen(cmd, stdout=log_w, stderr=log_w)
+
+    compression = cfg.get("compression")
+    rtl_csv = artifact_path(os.path.join(result_dir, f"csv_result_case{case_id}.csv"), compression)
+    gold_csv = artifact_path(os.path.join(result_dir, f"golden_case{case_id}.csv"), compression)
+    rtl_fp = open_text(rtl_csv, "w")
+    gold_fp = open_text(gold_csv, "w")
+    rtl_fp.write(header)
+    gold_fp.write(header)
+
+    golden = iter_golden_lines(golden_class, cfg)
+    zero_x = []
+    err = None
+    finished = False        # loop 가 예외 없이 끝났을 때만 True
+    count = 0
+    last_report = time.time()
+
+    try:
+        for r_line in iter_fifo_lines(fd, proc, poll_interval):
+            if not r_line:
+                continue
+
+            g_line = next(golden, None)
+            if g_line is None:
+                err = f"RTL produced more than {cycles} cycles"
+                break
+
+            rtl_fp.write(r_line + "\n")
+            gold_fp.write(g_line + "\n")
+            count += 1
+            idx = count     # CSV 라인 번호 (header = 0) → compare_csv 와 동일
+
+            g_cells = g_line.split(",")
+            r_cells = r_line.split(",")
+            if len(g_cells) != len(r_cells) or g_cells[0] != r_cells[0]:
+                err = f"Invalid CSV format at line {idx}"
+                break
+
+            for g_val, r_val in zip(g_cells[1:], r_cells[1:]):
+                kind = compare_values(g_val, r_val)
+                if kind is not None:
+                    err = f"{kind} at line {idx}"
+                    break
+                if g_val != r_val:
+                    zero_x.append((idx, g_val, r_val))
+            if err:
+                break
+
+            if on_progress is not None and time.time() - last_report >= poll_interval:
+                on_progress(count, cycles)
+                last_report = time.time()
+        finished = True
+
+    finally:
+        # 정상 종료면 vsim 이 끝날 때까지 기다림
+        # mismatch / 예외 (golden step 오류, 짧은 hex, Ctrl-C) 면 바로 멈춤
+        #   → 아무도 FIFO 를 읽지 않으므로 기다리면 vsim 이 write 에서 영원히 멈춰 있음
+        if finished and not err:
+            proc.wait()
+        else:
+            if proc.poll() is None:
+                reason = "First mismatch found" if err else "Co-simulation aborted"
+                print(f"[+] {reason} → stopping vsim (case {case_id})")
+                proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+        golden.close()      # stream 모드면 stimulus tee FIFO 도 여기서 닫힘
+        os.close(fd)
+        os.remove(fifo_path)
+        log_w.close()
+        rtl_fp.close()
+        gold_fp.close()
+
+    if err is None and count != cycles:
+        err = f"CSV 라인 수가 다름 (RTL {count} / golden {cycles})"
+
+    if on_progress is not None:
+        on_progress(count, cycles)
+
+    if err:
+        save_compare_result(case_id, False, [], err, result_dir)
+        return False, err, []
+
+    save_compare_result(case_id, True, zero_x, None, result_dir)
+    return True, None, zero_x
@@ -0,0 +1,319 @@
+# ============================================================
+# 입력 / 출력 값 coverage + coverage 쪽으로 치우친 stimulus 생성
+#
+# generate_hex_inputs 는 포트마다 균일 random bit 를 뽑음
+#   → all-ones / lane 하나가 최대값(max carry) 같은 corner 값은 거의 나오지 않음
+#
+# bin 정의 (포트 선언 폭으로 자동 결정)
+#   폭 <= COVER_VALUE_BITS 인 입력 (mux 의 sel 등) : 값 하나하나가 bin
+#   더 넓은 입력 : zero / ones / alt5 (0101..) / altA (1010..) / lane<k>_max
+#                  (lane 구조는 config 의 layout 표)
+#   출력 : zero / msb (최상위 bit = carry 가 끝까지 올라감)
+#
+# 수집 : auto_golden 이 golden 모델의 step 을 CoverageCollector.wrap 으로 감싸서
+#        reset 이 아닌 cycle 의 입력 / 출력을 샘플링 → results/coverage_case<N>.json
+#        run 전체 합계 → results/coverage_summary.json
+#
+# 피드백 : auto_vsim --coverage
+#   같은 run 안에서 누적된 입력 coverage 를 보고, 매 cycle COVER_BIAS 확률로
+#   아직 안 나온 bin 의 값을 골라 넣음 (나머지는 지금처럼 균일 random)
+#   --coverage-target P : 누적 입력 coverage 가 P% 에 닿으면 그 case 를 짧게 끝내고
+#                         남은 case 는 만들지 않음
+#
+# 재현 : bias 는 이전 case 까지 누적된 coverage 에 따라 달라지므로 case seed 만으로는 부족
+#   → case 를 만들 때의 미도달 bin 목록 / target / cycle 수를 config 의 "coverage_bias" 에 기록
+#   python auto_coverage.py replay CASE [--result-dir results] : 그 case 의 입력 hex 를 다시 생성
+# ============================================================
+
+import argparse
+import json
+import os
+
+from auto_layout import RESET_CYCLES
+
+COVER_VALUE_BITS = 6        # 이 폭 이하 입력은 값마다 bin
+COVER_MAX_LANES  = 32
+COVER_BIAS       = 0.25     # 미도달 bin 을 일부러 고를 확률
+COVER_TAIL       = 16       # target 도달 후 출력이 나오도록 더 돌리는 cycle 수
+
+
+# ------------------------------------------------------------
+# coverage 공간 (config 의 ports / params 로 계산)
+# ------------------------------------------------------------
+def input_space(width, lane=None):
+    if width <= COVER_VALUE_BITS:
+        return {"mode": "value", "width": width, "bins": [str(v) for v in range(1 << width)]}
+
+    bins = ["zero", "ones", "alt5", "altA"]
+    if lane and 1 < width // lane <= COVER_MAX_LANES:
+        bins += [f"lane{k}_max" for k in range(width // lane)]
+    else:
+        lane = None
+    return {"mode": "corner", "width": width, "lane": lane, "bins": bins}
+
+
+def output_space(width):
+    return {"mode": "output", "width": width, "bins": ["zero", "msb"]}
+
+
+def coverage_space(cfg):
+    from auto_layout import control_ports, layout_of
+
+    ports = layout_of(cfg)["ports"]
+    space = {"inputs": {}, "outputs": {}, "reset": control_ports(cfg)[1]}
+    for name in cfg["input_ports"]:
+        space["inputs"][name] = input_space(ports[name]["width"], ports[name]["lane_width"])
+    for name in cfg["output_ports"]:
+        space["outputs"][name] = output_space(ports[name]["width"])
+    return space
+
+
+# ------------------------------------------------------------
+# bin 판정 / bin 에 들어가는 값 만들기
+# ------------------------------------------------------------
+def _patterns(width):
+    mask = (1 << width) - 1
+    alt5 = mask // 3            # 0101...
+    return mask, alt5, mask ^ alt5
+
+
+def classify(spec, value):
+    """value 가 들어가는 bin 이름들"""
+    if value is None or isinstance(value, str):
+        return ()
+    mode = spec["mode"]
+    if mode == "value":
+        return (str(value),)
+
+    width = spec["width"]
+    if mode == "output":
+        out = []
+        if value == 0:
+            out.append("zero")
+        if (value >> (width - 1)) & 1:
+            out.append("msb")
+        return out
+
+    mask, alt5, alt_a = _patterns(width)
+    out = []
+    if value == 0:
+        out.append("zero")
+    elif value == mask:
+        out.append("ones")
+    elif value == alt5:
+        out.append("alt5")
+    elif value == alt_a:
+        out.append("altA")
+    lane = spec.get("lane")
+    if lane:
+        lmask = (1 << lane) - 1
+        for k in range(width // lane):
+            if (value >> (k * lane)) & lmask == lmask:
+                out.append(f"lane{k}_max")
+    return out
+
+
+def bin_value(spec, name, rng):
+    if spec["mode"] == "value":
+        return int(name)
+    width = spec["width"]
+    mask, alt5, alt_a = _patterns(width)
+    if name == "zero":
+        return 0
+    if name == "ones":
+        return mask
+    if name == "alt5":
+        return alt5
+    if name == "altA":
+        return alt_a
+    k = int(name[4:-4])         # lane<k>_max : 그 lane 만 최대값, 나머지는 random
+    lane = spec["lane"]
+    return rng.getrandbits(width) | (((1 << lane) - 1) << (k * lane))
+
+
+# ------------------------------------------------------------
+# 수집기
+# ------------------------------------------------------------
+class CoverageCollector:
+    def __init__(self, space):
+        self.space = space
+        self.specs = dict(space["inputs"])
+        self.specs.update(space["outputs"])
+        self.hits = {p: dict.fromkeys(s["bins"], 0) for p, s in self.specs.items()}
+        self.missing = {p: list(s["bins"]) for p, s in space["inputs"].items()}
+
+    def sample(self, port, value):
+        hits = self.hits[port]
+        for b in classify(self.specs[port], value):
+            if b in hits:
+                if hits[b] == 0 and port in self.missing:
+                    self.missing[port].remove(b)
+                hits[b] += 1
+
+    def wrap(self, step):
+        """golden 모델 step 을 감싸서 reset 이 아닌 cycle 의 입력 / 출력 샘플링"""
+        inputs = list(self.space["inputs"])
+        outputs = list(self.space["outputs"])
+        reset = self.space.get("reset", "rst_n")
+        sample = self.sample
+
+        def covered_step(in_dict):
+            out = step(in_dict)
+            if in_dict.get(reset, 1) != 0:
+                for p in inputs:
+                    sample(p, in_dict.get(p))
+                for p in outputs:
+                    sample(p, out.get(p))
+            return out
+
+        return covered_step
+
+    def bias_state(self):
+        """다음 case 의 bias 를 결정하는 상태 (입력 포트별 미도달 bin, 순서 포함)"""
+        return {p: list(bins) for p, bins in self.missing.items()}
+
+    def restore_bias(self, missing):
+        """bias_state() 로 기록한 상태로 되돌림 (입력 hit 수는 도달 여부만 맞춤)"""
+        for p, bins in missing.items():
+            self.missing[p] = list(bins)
+            self.hits[p] = {b: 0 if b in bins else 1 for b in self.hits[p]}
+
+    def merge(self, other):
+        for port, hits in other.hits.items():
+            for b, n in hits.items():
+                if n:
+                    self.hits[port][b] = self.hits[port].get(b, 0) + n
+        self.missing = {p: [b for b in bins if not self.hits[p][b]]
+                        for p, bins in self.missing.items()}
+
+    # --------------------------------------------------------------
+    def counts(self, group=None):
+        ports = self.hits if group is None else self.space[group]
+        total = sum(len(self.hits[p]) for p in ports)
+        covered = sum(1 for p in ports for n in self.hits[p].values() if n)
+        return covered, total
+
+    def percent(self, group=None):
+        covered, total = self.counts(group)
+        return 100.0 * covered / total if total else 100.0
+
+    def report(self, **extra):
+        covered, total = self.counts()
+        ports = {}
+        for p, hits in self.hits.items():
+            ports[p] = {
+                "dir": "input" if p in self.space["inputs"] else "output",
+                "covered": sum(1 for n in hits.values() if n),
+                "total": len(hits),
+                "uncovered": [b for b, n in hits.items() if not n],
+                "hits": hits,
+            }
+        data = dict(extra)
+        data.update({
+            "covered": covered,
+            "total": total,
+            "percent": round(self.percent(), 2),
+            "input_percent": round(self.percent("inputs"), 2),
+            "ports": ports,
+        })
+        return data
+
+    def save(self, path, **extra):
+        with open(path, "w") as f:
+            json.dump(self.report(**extra), f, indent=4)
+        return path
+
+
+def coverage_path(result_dir, case_id):
+    return os.path.join(result_dir, f"coverage_case{case_id}.json")
+
+
+# ------------------------------------------------------------
+# 피드백 : 미도달 bin 쪽으로 치우친 입력 hex 생성
+#   cover 는 run 안에서 case 를 넘어 누적됨
+#   return: (hex 경로 list, 실제로 쓴 cycle 수)
+# ------------------------------------------------------------
+def write_biased_hex(port_widths, case_id, cycles, result_dir, rng, cover, target=None):
+    # stimulus 포트와 coverage 공간 (config 의 input_ports) 은 같은 clk / reset 기준이어야 함
+    unknown = [name for name, _ in port_widths if name not in cover.space["inputs"]]
+    if unknown:
+        raise RuntimeError(f"[ERROR] stimulus port(s) {', '.join(unknown)} not in the coverage "
+                           f"space (reset port is '{cover.space.get('reset')}')")
+    specs = [cover.space["inputs"][name] for name, _ in port_widths]
+    missing = [cover.missing[name] for name, _ in port_widths]
+    names = [name for name, _ in port_widths]
+    digits = [(w + 3) // 4 for _, w in port_widths]
+    paths = [os.path.join(result_dir, f"{name}_case{case_id}.hex") for name in names]
+    files = [open(p, "w") for p in paths]
+
+    stop = cycles
+    try:
+        for cycle in range(cycles):
+            active = cycle >= RESET_CYCLES
+            for k, (name, width) in enumerate(port_widths):
+                if active and missing[k] and rng.random() < COVER_BIAS:
+                    val = bin_value(specs[k], rng.choice(missing[k]), rng)
+                else:
+                    val = rng.getrandbits(width)
+                if active:
+                    cover.sample(name, val)
+                files[k].write(f"{val:0{digits[k]}x}\n")
+
+            if target is not None and stop == cycles and cover.percent("inputs") >= target:
+                stop = min(cycles, cycle + 1 + COVER_TAIL)
+            if cycle + 1 >= stop:
+                break
+    finally:
+        for f in files:
+            f.close()
+
+    for p, (name, width) in zip(paths, port_widths):
+        print(f"[+] Generated HEX: {p} (width {width} bits, coverage-biased)")
+    return paths, stop
+
+
+def replay_biased_hex(cfg, result_dir="results"):
+    """config 의 "coverage_bias" 로 그 case 의 입력 hex 를 같은 값으로 다시 생성"""
+    import random
+    from auto_layout import layout_of
+
+    bias = cfg.get("coverage_bias")
+    if bias is None:
+        raise RuntimeError(f"[ERROR] CASE {cfg['case_id']} has no coverage_bias "
+                           "(not a --coverage case, or made before it was recorded)")
+
+    cover = CoverageCollector(coverage_space(cfg))
+    cover.restore_bias(bias["missing"])
+    ports = layout_of(cfg)["ports"]
+    port_widths = [(name, ports[name]["width"]) for name in cfg["input_ports"]]
+    paths, stop = write_biased_hex(port_widths, cfg["case_id"], bias["cycles"], result_dir,
+                                   random.Random(cfg["seed"]), cover, bias["target"])
+    if stop != cfg["cycles"]:
+        raise RuntimeError(f"[ERROR] CASE {cfg['case_id']}: replay stopped at {stop} cycles, "
+                           f"config has {cfg['cycles']}")
+    return paths
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="coverage-biased stimulus tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("replay", help="regenerate the input hex files of one --coverage case")
+    r.add_argument("case_id", type=int)
+    r.add_argument("--result-dir", default="results")
+    args = ap.parse_args()
+
+    from auto_compare import load_all_configs
+
+    cfg = next((c for c in load_all_configs(args.result_dir)
+                if c["case_id"] == args.case_id), None)
+    if cfg is None:
+        print(f"[ERROR] CASE {args.case_id} not found in {args.result_dir}")
+        return
+    replay_biased_hex(cfg, args.result_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 
-import json
+import argparse
+import io
 import os
+import shutil
 import sys
 import importlib.util
-import math
+from contextlib import redirect_stdout
+from itertools import islice, repeat
 from base_golden_model import BaseGoldenModel
+from auto_profile import Profiler
+from auto_storage import artifact_path, compression_of, find_artifact, open_text
+from auto_index import CycleIndex, index_path, text_bytes
+from auto_layout import RESET_CYCLES, control_ports, layout_of
 
 
 # ------------------------------------------------------------
 # Golden Model Loader
 # ------------------------------------------------------------
-def load_golden_class(py_file):
+def load_golden_class(py_file, verbose=True):
     """Load a golden model class that inherits from BaseGoldenModel."""
     spec = importlib.util.spec_from_file_location("golden_module", py_file)
     mod = importlib.util.module_from_spec(spec)
@@ -26,140 +33,446 @@ def load_golden_class(py_file):
     if golden_class is None:
         raise RuntimeError("[ERROR] No valid GoldenModel class found in file")
 
-    print(f"[+] Loaded Golden Model class: {golden_class.__name__}")
+    # shard worker 프로세스가 같은 파일을 다시 로드할 수 있도록 경로 기록
+    golden_class.__golden_file__ = os.path.abspath(py_file)
+
+    if verbose:
+        print(f"[+] Loaded Golden Model class: {golden_class.__name__}")
     return golden_class
 
 
 # ------------------------------------------------------------
-# HEX 파일 로더
+# HEX 파일을 line 번째 줄부터 열기
+#   plain 파일은 줄 길이(byte, 개행 포함)가 일정하면 바로 seek, 아니면 앞 줄을 읽어서 건너뜀
+#   cycles 를 주면 파일 크기 == cycles * 줄 길이 일 때만 seek (끝 줄만 짧은 파일 등 방지)
 # ------------------------------------------------------------
-def read_hex_file(path):
-    """Return list of hex strings."""
-    lines = []
-    with open(path, "r") as f:
-        for ln in f:
-            lines.append(ln.strip())
-    return lines
+def _hex_stride(path, cycles=None):
+    """모든 줄이 같은 byte 길이로 보이면 그 길이, 아니면 None"""
+    with open(path, "rb") as f:
+        stride = len(f.readline())
+    if stride <= 1:
+        return None
+    size = os.path.getsize(path)
+    if cycles is not None:
+        return stride if size == cycles * stride else None
+    return stride if size % stride == 0 else None
+
+
+def open_hex_at(path, line=0, cycles=None):
+    path = find_artifact(path)
+    if line and compression_of(path) == "none" and os.path.isfile(path):
+        stride = _hex_stride(path, cycles)
+        if stride is not None:
+            with open(path, "rb") as f:
+                f.seek(line * stride - 1)
+                boundary = f.read(1) == b"\n"      # seek 위치가 줄 시작인지 한 번 더 확인
+            if boundary:
+                f = open_text(path, "r")
+                f.seek(line * stride)
+                return f
+
+    f = open_text(path, "r")
+    for _ in islice(f, line):
+        pass
+    return f
 
 
 # ------------------------------------------------------------
-# 한 CASE 실행
+# HEX 스트리밍 리더 (cycle 수와 무관하게 메모리 일정)
 # ------------------------------------------------------------
-def run_single_case(golden_class, cfg):
+def iter_hex_chunks(paths, cycles, chunk_size, start=0):
+    """
+    모든 포트의 hex 파일을 동시에 chunk_size 줄씩 읽어서
+    (base_cycle, n, [포트별 raw 문자열 list]) 를 yield.
+    start 를 주면 [start, cycles) 구간만 읽음 (shard 실행).
+    파일이 cycles 보다 짧으면 어느 파일인지 알려주는 에러 발생.
+    """
+    files = [open_hex_at(p, start, cycles) for p in paths]
+    try:
+        for base in range(start, cycles, chunk_size):
+            n = min(chunk_size, cycles - base)
+            chunk = []
+            for path, f in zip(paths, files):
+                lines = list(islice(f, n))
+                if len(lines) < n:
+                    raise RuntimeError(
+                        f"[ERROR] HEX file too short: {path} has {base + len(lines)} lines "
+                        f"but cycles={cycles}")
+                chunk.append(lines)
+            yield base, n, chunk
+    finally:
+        for f in files:
+            f.close()
+
+
+# ------------------------------------------------------------
+# hex 문자열 → int (빈 값 / 전부 x 이면 None)
+# ------------------------------------------------------------
+def parse_hex_value(raw):
+    try:
+        return int(raw, 16)
+    except ValueError:
+        if raw.strip().strip("xX") == "":
+            return None
+        raise
+
+
+def parse_hex_chunk(raws):
+    """hex 문자열 여러 개를 한 번에 변환. x 가 섞인 chunk 만 한 줄씩 처리"""
+    try:
+        return list(map(int, raws, repeat(16, len(raws))))
+    except ValueError:
+        return [parse_hex_value(r) for r in raws]
+
+
+# ------------------------------------------------------------
+# 출력값 → CSV 칸 문자열 변환기 (case 마다 한 번 생성)
+# ------------------------------------------------------------
+def make_value_formatter(hex_len):
+    x_str = "x" * hex_len
+    spec = f"0{hex_len}x"
+
+    def fmt(val):
+        if val is None or isinstance(val, str) and val.lower().startswith("x"):
+            return x_str
+        return format(val, spec)
+
+    return fmt
 
-    case_id = cfg["case_id"]
-    cycles = cfg["cycles"]
+
+# CSV 를 몇 cycle 씩 모아서 쓸지 / 파일 버퍼 크기
+WRITE_BATCH  = 4096
+WRITE_BUFFER = 1 << 20
+
+
+# ------------------------------------------------------------
+# 한 CASE 의 golden CSV 행 생성기 (WRITE_BATCH 행씩 list 로 yield)
+#   run_single_case (파일 저장) 와 auto_cosim (lockstep 비교) 이 공용으로 사용
+#   start / stop / gm : shard 실행 시 [start, stop) 구간만, warm-up 된 모델로
+# ------------------------------------------------------------
+def iter_golden_rows(golden_class, cfg, start=0, stop=None, gm=None, cover=None):
+
+    cycles = cfg["cycles"] if stop is None else stop
 
     params = cfg["params"]
     input_ports = cfg["input_ports"]
     output_ports = cfg["output_ports"]
     hex_files = cfg["hex_files"]
 
-    print(f"\n[+] Running Golden Model for CASE {case_id} (cycles={cycles})")
+    if gm is None:
+        gm = golden_class(params)
+        gm.reset()
+
+    # 출력 hex 자리수 = 포트 선언 폭 (layout 표, RTL $display 와 같은 자리수)
+    layout = layout_of(cfg)["ports"]
+
+    # ---- case 단위 불변값 (cycle loop 밖에서 한 번만 계산) ----
+    port_names = [p["name"] for p in cfg["ports"]]
+    reset_cycles = RESET_CYCLES     # TB와 동일 : 처음 3 cycle 동안 reset = 0
+    clk_name, reset_name = control_ports(cfg)
+
+    reset_tmpl = {}
+    run_tmpl = {}
+    if reset_name in port_names:
+        reset_tmpl[reset_name] = 0
+        run_tmpl[reset_name] = 1
+    if clk_name in port_names:
+        reset_tmpl[clk_name] = 1    # Golden에서는 의미 없음
+        run_tmpl[clk_name] = 1
+
+    fmts = [make_value_formatter(layout[op]["hex_digits"]) for op in output_ports]
+    step = gm.step if cover is None else cover.wrap(gm.step)
+    hex_paths = [hex_files[p] for p in input_ports]
+    single_out = output_ports[0] if len(output_ports) == 1 else None
+    fmt = fmts[0] if fmts else None
+
+    # cycle loop : WRITE_BATCH cycle 단위로 입력을 한 번에 변환
+    for base, n, raw_chunk in iter_hex_chunks(hex_paths, cycles, WRITE_BATCH, start):
+        chunk = [parse_hex_chunk(raws) for raws in raw_chunk]
+
+        rows = []
+        cycle = base
+        for vals in (zip(*chunk) if chunk else repeat((), n)):
+
+            # ---- 입력 딕셔너리 구성 ----
+            in_dict = dict(reset_tmpl if cycle < reset_cycles else run_tmpl)
+            in_dict.update(zip(input_ports, vals))
+
+            # ---- GoldenModel 실행 ----
+            out_vals = step(in_dict)
+
+            # ---- CSV 행 ----
+            if single_out is not None:
+                rows.append(f"{cycle},{fmt(out_vals.get(single_out))}\n")
+            else:
+                rows.append(f"{cycle}," + ",".join([f(out_vals.get(op))
+                                                    for f, op in zip(fmts, output_ports)]) + "\n")
+            cycle += 1
+
+        yield rows
+
+
+# ------------------------------------------------------------
+# shard 실행 (긴 case 하나를 cycle 구간으로 나눠 여러 프로세스에서)
+#
+# 모델 상태는 latency 깊이의 파이프라인뿐이므로, 각 shard 는
+# 시작 cycle 직전 warmup_cycles() 만큼을 먼저 돌려서 상태를 맞춘 뒤 자기 구간을 출력
+# → 구간별 CSV 조각을 순서대로 이어붙이면 serial 실행과 byte 단위로 동일
+# ------------------------------------------------------------
+SHARD_MIN_CYCLES = 100000       # shard 하나의 최소 cycle 수
+
+
+def shard_ranges(cycles, jobs):
+    step = -(-cycles // jobs)
+    return [(s, min(s + step, cycles)) for s in range(0, cycles, step)]
+
 
-    gm = golden_class(params)
+def warm_golden_model(golden_class, cfg, start):
+    """start cycle 직전 상태의 모델 (serial 실행으로 start 까지 온 것과 같은 상태)"""
+    gm = golden_class(cfg["params"])
     gm.reset()
+    if start == 0:
+        return gm
+
+    depth = gm.warmup_cycles()
+    if depth is None:
+        raise RuntimeError(f"[ERROR] {golden_class.__name__} has unbounded state (no shard)")
+
+    begin = max(0, start - depth)
+    for _ in iter_golden_rows(golden_class, cfg, begin, start, gm):
+        pass
+
+    # 더 앞에서부터 돌린 모델과 상태가 같아야 warm-up 이 충분한 것
+    if begin > 0:
+        ref = golden_class(cfg["params"])
+        ref.reset()
+        for _ in iter_golden_rows(golden_class, cfg, max(0, start - 2 * depth - 1), start, ref):
+            pass
+        if ref.snapshot() != gm.snapshot():
+            raise RuntimeError(f"[ERROR] {golden_class.__name__} state is deeper than "
+                               f"warmup_cycles()={depth} (no shard)")
+    return gm
+
+
+def _run_shard(task):
+    """shard 하나 실행. print 는 모아서 반환 (부모가 출력 → worker socket 에 직접 쓰지 않음)"""
+    golden_file, cfg, start, stop, part_path = task
+    out = io.StringIO()
+    with redirect_stdout(out):
+        golden_class = load_golden_class(golden_file, verbose=False)
+        gm = warm_golden_model(golden_class, cfg, start)
+        index = CycleIndex(first_cycle=start)
+        with open(part_path, "w", buffering=WRITE_BUFFER) as fp:
+            cycle = start
+            for rows in iter_golden_rows(golden_class, cfg, start, stop, gm):
+                index.add_rows(cycle, rows)
+                cycle += len(rows)
+                fp.write("".join(rows))
+    return part_path, index, out.getvalue()
+
+
+def shard_count(golden_class, cfg, jobs):
+    """실제로 나눌 shard 수 (1 이면 serial)"""
+    if jobs <= 1 or cfg.get("stimulus", "file") != "file":
+        return 1
+    if getattr(golden_class, "__golden_file__", None) is None:
+        return 1
+    return max(1, min(jobs, cfg["cycles"] // SHARD_MIN_CYCLES))
+
+
+def run_sharded_rows(golden_class, cfg, jobs, fp, index, result_dir="results"):
+    """shard 별 CSV 조각을 만들고 fp 에 순서대로 이어 씀 (index 도 이어붙임)"""
+    case_id = cfg["case_id"]
+    tasks = []
+    for k, (start, stop) in enumerate(shard_ranges(cfg["cycles"], jobs)):
+        part = os.path.join(result_dir, f"golden_case{case_id}.csv.part{k}")
+        tasks.append((golden_class.__golden_file__, cfg, start, stop, part))
+
+    print(f"[+] Sharding CASE {case_id} into {len(tasks)} segments")
+    import multiprocessing      # shard 할 때만 (import 비용이 커서 시작 시간에서 제외)
+
+    try:
+        with multiprocessing.Pool(len(tasks)) as pool:
+            parts = pool.map(_run_shard, tasks)
+        for part, part_index, text in parts:
+            if text:
+                print(text, end="")
+            index.extend(part_index, index.pos)
+            index.pos += os.path.getsize(part)
+            with open(part, "r") as src:
+                shutil.copyfileobj(src, fp, WRITE_BUFFER)
+    finally:
+        for t in tasks:
+            if os.path.exists(t[4]):
+                os.remove(t[4])
 
-    # 입력 hex 읽기
-    hex_map = {}
-    for p in input_ports:
-        hex_map[p] = read_hex_file(hex_files[p])
-
-    # FINAL_WIDTH 계산
-    if hasattr(gm, "FINAL_WIDTH"):
-        FINAL_WIDTH = gm.FINAL_WIDTH
-    else:
-        INPUT_COUNT = params.get("INPUT_COUNT", 1)
-        DATA_WIDTH  = params.get("DATA_WIDTH", 1)
-        FINAL_WIDTH = DATA_WIDTH + math.ceil(math.log2(INPUT_COUNT))
-
-    hex_len = (FINAL_WIDTH + 3) // 4
-
-    # CSV 출력
-    out_csv = f"results/golden_case{case_id}.csv"
-    fp = open(out_csv, "w", encoding="utf-8")
-    fp.write("cycle," + ",".join(output_ports) + "\n")
-
-    # cycle loop
-    for cycle in range(cycles):
-
-        # ---- 입력 딕셔너리 구성 ----
-        in_dict = {}
-
-        # rst_n 자동 처리 (TB와 동일)
-        port_names = [p["name"] for p in cfg["ports"]]
-        if "rst_n" in port_names:
-            in_dict["rst_n"] = 0 if cycle < 3 else 1
-
-        # clk 자동 포함
-        if "clk" in port_names:
-            in_dict["clk"] = 1  # Golden에서는 의미 없음
-
-        # 입력 포트 값 로드
-        for p in input_ports:
-            raw = hex_map[p][cycle]  # hex 문자열
-            
-            if raw == "" or all(ch.lower() == "x" for ch in raw):
-                in_dict[p] = None
-            else:
-                in_dict[p] = int(raw, 16)
 
-        # ---- GoldenModel 실행 ----
-        out_vals = gm.step(in_dict)
+# ------------------------------------------------------------
+# 한 CASE 실행
+# ------------------------------------------------------------
+def _remove_partial(out_csv):
+    """중간에 실패한 CSV 와 .idx 를 지움 (반쯤 쓴 파일을 다음 단계가 읽지 않도록)"""
+    for path in (out_csv, index_path(out_csv)):
+        if os.path.exists(path):
+            os.remove(path)
+
 
-        # ---- CSV 출력 ----
-        line = f"{cycle}"
-        for op in output_ports:
-            val = out_vals.get(op, None)
+def run_single_case(golden_class, cfg, jobs=1, cover=None, result_dir="results"):
 
-            if val is None or isinstance(val, str) and val.lower().startswith("x"):
-                line += "," + ("x" * hex_len)
-            else:
-                line += "," + f"{val:0{hex_len}x}"
+    case_id = cfg["case_id"]
+    cycles = cfg["cycles"]
+    output_ports = cfg["output_ports"]
 
-        fp.write(line + "\n")
+    print(f"\n[+] Running Golden Model for CASE {case_id} (cycles={cycles})")
 
-    fp.close()
+    # CSV 출력 (config 의 compression 에 따라 .gz / .zst)
+    out_csv = artifact_path(os.path.join(result_dir, f"golden_case{case_id}.csv"),
+                            cfg.get("compression"))
+    header = "cycle," + ",".join(output_ports) + "\n"
+
+    # coverage 는 case 전체를 한 모델로 샘플링 (shard 안 함)
+    if cover is None and cfg.get("coverage"):
+        from auto_coverage import CoverageCollector, coverage_space
+        cover = CoverageCollector(coverage_space(cfg))
+
+    shards = 1 if cover is not None else shard_count(golden_class, cfg, jobs)
+    if shards > 1:
+        try:
+            index = CycleIndex(pos=text_bytes(header))
+            with open_text(out_csv, "w") as fp:
+                fp.write(header)
+                run_sharded_rows(golden_class, cfg, shards, fp, index, result_dir)
+            index.save(out_csv)
+            print(f"[+] Saved Golden CSV → {out_csv}")
+            return out_csv
+        except RuntimeError as e:
+            print(f"{e} → running CASE {case_id} serially")
+        except BaseException:
+            _remove_partial(out_csv)
+            raise
+
+    try:
+        with open_text(out_csv, "w") as fp:
+            fp.write(header)
+
+            # cycle → byte offset index (random access 용 .idx)
+            index = CycleIndex(pos=text_bytes(header))
+            cycle = 0
+            for rows in iter_golden_rows(golden_class, cfg, cover=cover):
+                index.add_rows(cycle, rows)
+                cycle += len(rows)
+                fp.write("".join(rows))
+        index.save(out_csv)
+    except BaseException:
+        _remove_partial(out_csv)
+        raise
     print(f"[+] Saved Golden CSV → {out_csv}")
 
+    if cover is not None:
+        from auto_coverage import coverage_path
+        path = cover.save(coverage_path(result_dir, case_id), case_id=case_id, cycles=cycles)
+        print(f"[+] Coverage {cover.percent():.1f}% → {path}")
+    return out_csv
+
+
+# ------------------------------------------------------------
+# golden CSV → 출력 포트별 기대값 hex (self-check TB 가 $fgets 로 읽음)
+# ------------------------------------------------------------
+def expect_hex_path(result_dir, port, case_id):
+    return os.path.join(result_dir, f"expect_{port}_case{case_id}.hex")
+
+
+def write_expect_hex(golden_csv, output_ports, case_id, result_dir="results"):
+    paths = {p: expect_hex_path(result_dir, p, case_id) for p in output_ports}
+    outs = [open(paths[p], "w", buffering=WRITE_BUFFER) for p in output_ports]
+
+    with open_text(find_artifact(golden_csv), "r") as f:
+        next(f)     # header
+        for line in f:
+            cells = line.rstrip("\n").split(",")
+            for fp, val in zip(outs, cells[1:]):
+                fp.write(val + "\n")
+
+    for fp in outs:
+        fp.close()
+
+    print(f"[+] Saved expectation HEX for CASE {case_id}: {', '.join(paths.values())}")
+    return paths
+
 
 # ------------------------------------------------------------
 # 모든 CASE 실행
 # ------------------------------------------------------------
-def run_all_cases(golden_class):
+def run_all_cases(golden_class, prof=None, jobs=1, case_ids=None, result_dir="results"):
+
+    if prof is None:
+        prof = Profiler("golden")
+
+    # config_case<N>.json 또는 (--store run) results.db
+    from auto_compare import load_all_configs
+
+    cfg_list = [cfg for cfg in load_all_configs(result_dir)
+                if case_ids is None or cfg["case_id"] in case_ids]
 
-    cfg_list = []
-    for f in os.listdir("results"):
-        if f.startswith("config_case") and f.endswith(".json"):
-            cfg_list.append(os.path.join("results", f))
+    print("[+] Found case configs:")
+    for cfg in cfg_list:
+        print(f"   - CASE {cfg['case_id']} ({cfg['cycles']} cycles)")
 
-    cfg_list.sort()
+    total_cover = None
+    for cfg in cfg_list:
+        cover = None
+        if cfg.get("coverage"):
+            from auto_coverage import CoverageCollector, coverage_space
+            cover = CoverageCollector(coverage_space(cfg))
+            if total_cover is None:
+                total_cover = CoverageCollector(coverage_space(cfg))
 
-    print("[+] Found config JSON files:")
-    for f in cfg_list:
-        print("   -", f)
+        with prof.stage("golden", cfg["case_id"], cfg["cycles"]) as rec:
+            rec["outputs"].append(run_single_case(golden_class, cfg, jobs, cover, result_dir))
 
-    for cfg_path in cfg_list:
-        with open(cfg_path, "r") as fp:
-            cfg = json.load(fp)
-        run_single_case(golden_class, cfg)
+        # run 전체 coverage 합계
+        if cover is not None:
+            total_cover.merge(cover)
+
+    if total_cover is not None:
+        path = total_cover.save(os.path.join(result_dir, "coverage_summary.json"),
+                                cases=len(cfg_list))
+        print(f"[+] Total coverage {total_cover.percent():.1f}% → {path}")
+
+    prof.save(result_dir)
 
 
 # ------------------------------------------------------------
 # Entry
 # ------------------------------------------------------------
-if __name__ == "__main__":
+def main():
 
     if len(sys.argv) < 2:
-        print("Usage: python auto_golden.py <golden_model_name_without_py>")
+        print("Usage: python auto_golden.py <golden_model_name_without_py> [--jobs N]")
         print("Example: python auto_golden.py golden_adder_tree")
         sys.exit(1)
 
-    model_name = sys.argv[1]
-    py_file = model_name
+    from auto_rundir import current_result_dir
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("golden_model")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="split each long case into up to N cycle shards run in parallel "
+                         f"(at least {SHARD_MIN_CYCLES} cycles per shard)")
+    ap.add_argument("--result-dir", default=current_result_dir(),
+                    help="run directory (default: the current run, else results)")
+    args = ap.parse_args()
+
+    py_file = args.golden_model
 
     if not os.path.exists(py_file):
         raise RuntimeError(f"[ERROR] Golden model file not found: {py_file}")
 
-    GoldenClass = load_golden_class(py_file)
-    run_all_cases(GoldenClass)
+    prof = Profiler("golden")
+    with prof.stage("golden_load"):
+        GoldenClass = load_golden_class(py_file)
+    run_all_cases(GoldenClass, prof, args.jobs, result_dir=args.result_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+# ============================================================
+# golden 모델 상주 worker (Unix socket)
+#
+# auto_golden 을 실행할 때마다
+#   python 시작 + auto_golden / numpy 등 import + load_golden_class (exec_module)
+#   → 짧은 case 여러 개를 돌리면 계산보다 시작 비용이 더 큼
+#
+# worker 는 한 번 띄워 두고 계속 사용
+#   - 모듈 import 는 시작할 때 한 번
+#   - golden class 는 파일 경로별로 캐시, golden 파일 + 그 파일이 import 한 helper 모듈의
+#     sha256 이 바뀌었을 때만 다시 로드 (helper 도 sys.modules 에서 지우고 다시 import)
+#   - worker 자신의 코드 (auto_golden / base_golden_model ...) 는 시작할 때 hash 를 기록,
+#     바뀌었으면 요청을 처리하지 않고 종료 → client 는 예전처럼 auto_golden 을 직접 실행
+#   - 요청은 Unix socket 으로 받고 하나씩 순서대로 처리
+#     (results/ 가 작업 디렉토리 기준 상대 경로라서 요청마다 그 디렉토리로 chdir)
+#   - socket 은 $XDG_RUNTIME_DIR 또는 <tmp>/auto_golden_<uid>/ (0700) 아래,
+#     client 는 connect 전에 socket 소유자가 자기 uid 인지 확인
+#
+# 사용
+#   python auto_golden_worker.py serve              # worker 시작 (foreground)
+#   python auto_golden_worker.py submit golden.py [--jobs N] [--cases 0,3]
+#   python auto_golden_worker.py status | stop
+#   auto_system 은 worker 가 떠 있으면 자동으로 worker 에 보내고, 없으면 예전처럼 auto_golden 실행
+#
+# 프로토콜 : 한 줄짜리 JSON 요청 → JSON 줄들로 응답
+#   {"cmd": "run", "golden": 경로, "cwd": 경로, "result_dir": 경로, "jobs": N,
+#    "cases": [id, ...] | null}
+#   → {"out": 출력 텍스트} ... {"done": true, "ok": bool, "error": 메시지}
+#     (worker 코드가 바뀌었으면 {"done": true, "ok": false, "stale": true})
+#   {"cmd": "status"} / {"cmd": "stop"} → {"done": true, "ok": true, ...}
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+SOCKET_ENV = "AUTO_GOLDEN_SOCKET"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_socket_path():
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "auto_golden.sock")
+    return os.path.join(tempfile.gettempdir(), f"auto_golden_{os.getuid()}", "worker.sock")
+
+
+def private_socket_dir(path):
+    """socket 디렉토리 생성 (0700). 다른 사용자 소유이거나 다른 사람이 쓸 수 있으면 거부"""
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, mode=0o700, exist_ok=True)
+    st = os.stat(d)
+    if st.st_uid != os.getuid():
+        raise RuntimeError(f"[ERROR] socket directory {d} is owned by uid {st.st_uid}")
+    if st.st_mode & 0o022 and not st.st_mode & stat.S_ISVTX:
+        raise RuntimeError(f"[ERROR] socket directory {d} is writable by other users")
+    return d
+
+
+def owned_socket(path):
+    """내 uid 소유의 socket 파일이면 True (다른 사용자가 만든 가짜 worker 에 붙지 않도록)"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def files_hash(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.encode())
+        try:
+            h.update(file_hash(path).encode())
+        except OSError:
+            h.update(b"missing")
+    return h.hexdigest()
+
+
+def _module_file(mod):
+    path = getattr(mod, "__file__", None)
+    return os.path.abspath(path) if path and path.endswith(".py") else None
+
+
+def _is_library(path):
+    """표준 라이브러리 / site-packages 모듈은 hash 대상에서 제외"""
+    return any(path.startswith(os.path.abspath(p) + os.sep)
+               for p in {sys.prefix, sys.base_prefix, sys.exec_prefix})
+
+
+def worker_code_files():
+    """worker 가 이미 import 한 이 저장소의 모듈 (auto_golden, base_golden_model ...)"""
+    files = {_module_file(m) for m in list(sys.modules.values())}
+    return sorted(f for f in files if f and os.path.dirname(f) == HERE)
+
+
+# ------------------------------------------------------------
+# golden class 캐시 (소스 hash 가 같으면 그대로 사용)
+# ------------------------------------------------------------
+class GoldenCache:
+    def __init__(self):
+        self.classes = {}       # abs path → (sha256, class, helper 모듈 {이름: 파일})
+        self.loads = 0
+
+    def get(self, py_file):
+        from auto_golden import load_golden_class
+
+        path = os.path.abspath(py_file)
+        cached = self.classes.get(path)
+        if cached is not None:
+            digest, golden_class, helpers = cached
+            if digest == files_hash([path] + sorted(helpers.values())):
+                return golden_class
+            # helper 도 다시 import 되도록 sys.modules 에서 제거
+            for name in helpers:
+                sys.modules.pop(name, None)
+
+        before = set(sys.modules)
+        golden_class = load_golden_class(path)
+        helpers = {}
+        for name in set(sys.modules) - before:
+            f = _module_file(sys.modules[name])
+            if f and not _is_library(f) and os.path.dirname(f) != HERE:
+                helpers[name] = f
+
+        self.classes[path] = (files_hash([path] + sorted(helpers.values())), golden_class,
+                              helpers)
+        self.loads += 1
+        return golden_class
+
+
+# ------------------------------------------------------------
+# 서버
+# ------------------------------------------------------------
+class _SocketOut:
+    """print 출력을 {"out": ...} 줄로 client 에 바로 전달"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        if text:
+            self.wfile.write((json.dumps({"out": text}) + "\n").encode())
+        return len(text)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+class GoldenRequestHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, **msg):
+        self.wfile.write((json.dumps(msg) + "\n").encode())
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            req = json.loads(line)
+        except ValueError:
+            self.reply(done=True, ok=False, error="[ERROR] invalid request")
+            return
+
+        cmd = req.get("cmd")
+        if cmd == "status":
+            self.reply(done=True, ok=True, pid=os.getpid(), jobs=self.server.jobs_done,
+                       loads=self.server.cache.loads, classes=sorted(self.server.cache.classes))
+        elif cmd == "stop":
+            self.reply(done=True, ok=True)
+            self.server.stopping = True
+        elif cmd == "run":
+            self.run_job(req)
+        else:
+            self.reply(done=True, ok=False, error=f"[ERROR] unknown command: {cmd}")
+
+    def run_job(self, req):
+        from auto_golden import run_all_cases
+        from auto_profile import Profiler
+
+        if self.server.code_changed():
+            # auto_golden / base_golden_model 이 바뀜 → 오래된 코드로 돌리지 않고 종료
+            self.server.stopping = True
+            self.reply(done=True, ok=False, stale=True,
+                       error="[ERROR] golden worker code changed since start (restart it)")
+            return
+
+        cwd = os.getcwd()
+        error = None
+        try:
+            os.chdir(req["cwd"])
+            with redirect_stdout(_SocketOut(self.wfile)):
+                prof = Profiler("golden")
+                with prof.stage("golden_load"):
+                    golden_class = self.server.cache.get(req["golden"])
+                cases = req.get("cases")
+                run_all_cases(golden_class, prof, req.get("jobs", 1),
+                              None if cases is None else set(cases),
+                              req.get("result_dir", "results"))
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:     # golden 코드의 sys.exit() 로 worker 가 죽지 않도록
+            error = str(e) if str(e).startswith("[ERROR]") else f"[ERROR] {type(e).__name__}: {e}"
+        finally:
+            os.chdir(cwd)
+
+        self.server.track_code()     # job 중에 처음 import 된 모듈도 다음 job 부터 검사
+        self.server.jobs_done += 1
+        self.reply(done=True, ok=error is None, error=error)
+
+
+class GoldenWorkerServer(socketserver.UnixStreamServer):
+    """요청을 하나씩 처리 (chdir 을 쓰므로 thread 로 나누지 않음)"""
+
+    def __init__(self, path):
+        self.cache = GoldenCache()
+        self.jobs_done = 0
+        self.stopping = False
+        self.code_hashes = {}       # 저장소 모듈 파일 → import 했을 때의 sha256
+        self.track_code()
+        super().__init__(path, GoldenRequestHandler)
+
+    def track_code(self):
+        """새로 import 된 저장소 모듈의 hash 를 기록 (이미 기록한 파일은 그대로)"""
+        for path in worker_code_files():
+            if path not in self.code_hashes:
+                try:
+                    self.code_hashes[path] = file_hash(path)
+                except OSError:
+                    self.code_hashes[path] = None
+
+    def code_changed(self):
+        for path, digest in self.code_hashes.items():
+            try:
+                if file_hash(path) != digest:
+                    return True
+            except OSError:
+                if digest is not None:
+                    return True
+        return False
+
+
+def serve(path):
+    private_socket_dir(path)
+    if os.path.lexists(path):
+        if ping(path):
+            raise RuntimeError(f"[ERROR] golden worker already running on {path}")
+        os.remove(path)     # 죽은 worker 가 남긴 socket 파일
+
+    # 요청이 올 때 import 하지 않도록 미리 로드
+    import auto_golden          # noqa: F401
+    import auto_coverage        # noqa: F401
+    import auto_compare         # noqa: F401
+    import auto_resultstore     # noqa: F401
+    import auto_rundir          # noqa: F401
+
+    old_umask = os.umask(0o077)     # socket 파일도 나만 접근
+    try:
+        server = GoldenWorkerServer(path)
+    finally:
+        os.umask(old_umask)
+    print(f"[+] golden worker listening on {path} (pid {os.getpid()})")
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+    print("[+] golden worker stopped")
+
+
+# ------------------------------------------------------------
+# client
+# ------------------------------------------------------------
+def request(msg, path=None, echo=True):
+    """요청 하나 → 마지막 응답 dict (worker 가 없으면 None). 중간 출력은 echo"""
+    path = path or default_socket_path()
+    if not owned_socket(path):
+        return None
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+    except OSError:
+        return None
+
+    with sock, sock.makefile("rb") as rf:
+        sock.sendall((json.dumps(msg) + "\n").encode())
+        for line in rf:
+            resp = json.loads(line)
+            if "out" in resp:
+                if echo:
+                    sys.stdout.write(resp["out"])
+                continue
+            return resp
+    return {"done": True, "ok": False, "error": "[ERROR] golden worker closed the connection"}
+
+
+def ping(path=None):
+    return request({"cmd": "status"}, path) is not None
+
+
+def submit(golden_file, jobs=1, case_ids=None, path=None, result_dir=None):
+    """worker 에 golden 실행 요청 → 종료코드 (worker 가 없으면 None)"""
+    from auto_rundir import current_result_dir
+
+    resp = request({"cmd": "run", "golden": os.path.abspath(golden_file), "cwd": os.getcwd(),
+                    "result_dir": result_dir or current_result_dir(), "jobs": jobs,
+                    "cases": None if case_ids is None else sorted(case_ids)},
+                   path)
+    if resp is None:
+        return None
+    if resp.get("stale"):
+        print(resp.get("error"))
+        return None         # worker 는 종료됨 → 호출 쪽이 auto_golden 을 직접 실행
+    if not resp.get("ok"):
+        print(resp.get("error"))
+        return 1
+    return 0
+
+
+# ------------------------------------------------------------
+# Entry
+# ------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="long-lived golden model worker")
+    ap.add_argument("--socket", default=None, help=f"socket path (default: ${SOCKET_ENV} or "
+                                                   f"{default_socket_path()})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("serve")
+    p = sub.add_parser("submit")
+    p.add_argument("golden_model")
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--cases", help="comma separated case ids (default: all)")
+    sub.add_parser("status")
+    sub.add_parser("stop")
+    args = ap.parse_args()
+
+    path = args.socket or default_socket_path()
+    if args.cmd == "serve":
+        serve(path)
+        return
+
+    if args.cmd == "submit":
+        cases = {int(c) for c in args.cases.split(",")} if args.cases else None
+        rc = submit(args.golden_model, args.jobs, cases, path)
+    else:
+        resp = request({"cmd": args.cmd}, path)
+        if resp is not None:
+            print(json.dumps({k: v for k, v in resp.items() if k != "done"}, indent=4))
+        rc = None if resp is None else 0
+
+    if rc is None:
+        print(f"[ERROR] no golden worker on {path} (python auto_golden_worker.py serve)")
+        rc = 1
+    sys.exit(rc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# ============================================================
+# run 간 regression 기록 (history.db, SQLite)
+#
+# compare_summary.txt 는 매 run 마다 덮어써지므로 과거 결과가 남지 않음
+# auto_compare 가 끝날 때마다 이 run 의 정보를 history.db 에 추가함
+#   runs         : top, RTL 해시, 시작 시각, PASS/전체
+#   case_results : case 별 판정, seed, 파라미터, 입력 hex 해시, cycles
+#   stage_times  : case 별 단계 시간 (profile_<tool>.json 에서)
+#
+# history.db 는 results/ 밖(실행 디렉토리)에 둠 → run 마다 지워지지 않음
+# 다른 위치를 쓰려면 환경변수 AUTO_TB_HISTORY=/path/history.db
+#
+# 조회
+#   python auto_history.py runs       [--top mux] [--last 20]
+#   python auto_history.py flaky      [--top mux] [--by-slot]
+#   python auto_history.py first-fail [--top mux] [--rtl HASH]
+#   python auto_history.py trend      [--top mux] [--stage vsim] [--last 20]
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from auto_storage import find_artifact, open_text
+
+DEFAULT_DB = "history.db"
+HASH_CHUNK = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded   REAL    NOT NULL,
+    started    REAL,
+    top        TEXT,
+    rtl_hash   TEXT,
+    result_dir TEXT,
+    cases      INTEGER NOT NULL,
+    passed     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS case_results (
+    run_id     INTEGER NOT NULL,
+    case_id    INTEGER NOT NULL,
+    ok         INTEGER NOT NULL,
+    error      TEXT,
+    seed       INTEGER,
+    cycles     INTEGER,
+    params     TEXT,                -- JSON (key 정렬)
+    input_hash TEXT,                -- 입력 hex 내용 해시 (stream 모드면 NULL)
+    PRIMARY KEY (run_id, case_id)
+);
+CREATE TABLE IF NOT EXISTS stage_times (
+    run_id  INTEGER NOT NULL,
+    case_id INTEGER,
+    stage   TEXT    NOT NULL,
+    wall_s  REAL    NOT NULL,
+    cpu_s   REAL,
+    cycles  INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_top      ON runs (top, run_id);
+CREATE INDEX IF NOT EXISTS runs_rtl      ON runs (top, rtl_hash, run_id);
+CREATE INDEX IF NOT EXISTS results_input ON case_results (input_hash, params, ok, run_id);
+CREATE INDEX IF NOT EXISTS results_case  ON case_results (case_id, ok, run_id);
+CREATE INDEX IF NOT EXISTS results_fail  ON case_results (run_id, case_id) WHERE ok = 0;
+CREATE INDEX IF NOT EXISTS stage_run     ON stage_times (run_id, stage);
+"""
+
+
+def history_path():
+    return os.environ.get("AUTO_TB_HISTORY", DEFAULT_DB)
+
+
+def open_history(path=None):
+    db = sqlite3.connect(path or history_path())
+    db.executescript(SCHEMA)
+    return db
+
+
+# ------------------------------------------------------------
+# 입력 hex 해시 (압축 여부와 무관하게 내용 기준)
+# ------------------------------------------------------------
+def input_hash(cfg):
+    if cfg.get("stimulus", "file") != "file":
+        return None
+
+    h = hashlib.sha1()
+    for port in cfg["input_ports"]:
+        path = find_artifact(cfg["hex_files"][port])
+        if not os.path.exists(path):
+            return None
+        h.update(port.encode("ascii") + b"\0")
+        with open_text(path, "r") as f:
+            while True:
+                data = f.read(HASH_CHUNK)
+                if not data:
+                    break
+                h.update(data.encode("ascii"))
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------
+# profile_<tool>.json 의 case 별 단계 기록
+# ------------------------------------------------------------
+def load_stage_records(result_dir):
+    records = []
+    for tool in ("vsim", "golden", "compare"):
+        path = os.path.join(result_dir, f"profile_{tool}.json")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            records.extend(json.load(f)["stages"])
+    return records
+
+
+# ------------------------------------------------------------
+# run 하나 기록 (auto_compare 마지막에 호출)
+#   verdicts      : {case_id: (ok, errmsg, zero_x_list)}
+#   extra_records : 아직 파일로 저장되지 않은 Profiler.records (compare 단계)
+# ------------------------------------------------------------
+def record_run(configs, verdicts, result_dir="results", extra_records=(), path=None):
+    info = {}
+    info_path = os.path.join(result_dir, "run_info.json")
+    if os.path.exists(info_path):
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+
+    passed = sum(1 for v in verdicts.values() if v[0])
+
+    db = open_history(path)
+    with db:
+        cur = db.execute(
+            "INSERT INTO runs (recorded, started, top, rtl_hash, result_dir, cases, passed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), info.get("started"), info.get("top"), info.get("rtl_hash"),
+             os.path.realpath(result_dir), len(verdicts), passed))
+        run_id = cur.lastrowid
+
+        for cfg in configs:
+            case_id = cfg["case_id"]
+            if case_id not in verdicts:
+                continue
+            ok, errmsg, _ = verdicts[case_id]
+            db.execute("INSERT INTO case_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (run_id, case_id, 1 if ok else 0, errmsg, cfg.get("seed"),
+                        cfg["cycles"], json.dumps(cfg["params"], sort_keys=True),
+                        input_hash(cfg)))
+
+        records = load_stage_records(result_dir) + list(extra_records)
+        db.executemany("INSERT INTO stage_times VALUES (?, ?, ?, ?, ?, ?)",
+                       [(run_id, r.get("case_id"), r["stage"], r["wall_s"],
+                         r.get("cpu_s"), r.get("cycles")) for r in records])
+    db.close()
+
+    print(f"[+] Recorded run {run_id} in {path or history_path()} ({passed}/{len(verdicts)} PASS)")
+    return run_id
+
+
+# ============================================================
+# 조회
+# ============================================================
+def _top_filter(top, alias="r"):
+    if top is None:
+        return "", ()
+    return f" AND {alias}.top = ?", (top,)
+
+
+def query_runs(db, top=None, last=20):
+    where, args = _top_filter(top)
+    return db.execute(
+        "SELECT r.run_id, r.recorded, r.top, r.rtl_hash, r.passed, r.cases FROM runs r "
+        f"WHERE 1=1{where} ORDER BY r.run_id DESC LIMIT ?", args + (last,)).fetchall()
+
+
+def query_flaky(db, top=None, by_slot=False):
+    """
+    같은 RTL 에서 판정이 바뀐 case
+      기본      : 같은 입력 hex (input_hash) + 파라미터 → PASS 와 FAIL 이 모두 있음
+      by_slot  : 같은 case 번호 (입력이 매번 랜덤이어도) 기준
+    """
+    where, args = _top_filter(top)
+    key = "case_id" if by_slot else "input_hash"
+    null_guard = "" if by_slot else " AND c.input_hash IS NOT NULL"
+
+    # 실패 기록(소수)이 있는 그룹만 골라서 → 그 그룹의 전체 기록을 index 로 조회
+    return db.execute(
+        "SELECT f.top, f.rtl_hash, f.k, f.params, COUNT(*), SUM(1 - c.ok), "
+        "MIN(c.run_id), MAX(c.run_id) "
+        f"FROM (SELECT DISTINCT r.top AS top, r.rtl_hash AS rtl_hash, c.{key} AS k, "
+        "       c.params AS params "
+        "      FROM case_results c JOIN runs r ON r.run_id = c.run_id "
+        f"      WHERE c.ok = 0{null_guard}{where}) f "
+        f"JOIN case_results c ON c.{key} = f.k AND c.params = f.params "
+        "JOIN runs r ON r.run_id = c.run_id AND r.top IS f.top AND r.rtl_hash IS f.rtl_hash "
+        "GROUP BY f.top, f.rtl_hash, f.k, f.params "
+        "HAVING MAX(c.ok) = 1 "
+        "ORDER BY SUM(1 - c.ok) DESC", args).fetchall()
+
+
+def query_first_fail(db, top, rtl_hash=None):
+    """
+    rtl_hash (기본: 가장 최근 run 의 RTL) 에서 실패하는 case 중
+    바로 이전 RTL 에서는 통과했던 case → (case_id, 첫 실패 run, 이전 RTL 의 마지막 통과 run, error)
+    """
+    if rtl_hash is None:
+        row = db.execute("SELECT rtl_hash FROM runs WHERE top = ? ORDER BY run_id DESC LIMIT 1",
+                         (top,)).fetchone()
+        if row is None:
+            return None, []
+        rtl_hash = row[0]
+
+    # 이 RTL 이 처음 나타난 run 이전의 마지막 다른 RTL
+    first_run = db.execute("SELECT MIN(run_id) FROM runs WHERE top = ? AND rtl_hash = ?",
+                           (top, rtl_hash)).fetchone()[0]
+    prev = db.execute("SELECT rtl_hash FROM runs WHERE top = ? AND run_id < ? AND rtl_hash != ? "
+                      "ORDER BY run_id DESC LIMIT 1", (top, first_run, rtl_hash)).fetchone()
+    prev_hash = prev[0] if prev else None
+
+    rows = db.execute(
+        "SELECT f.case_id, f.first_fail, "
+        "  (SELECT MAX(p.run_id) FROM case_results p JOIN runs pr ON pr.run_id = p.run_id "
+        "   WHERE pr.top = ? AND pr.rtl_hash = ? AND p.case_id = f.case_id AND p.ok = 1), "
+        "  (SELECT e.error FROM case_results e "
+        "   WHERE e.run_id = f.first_fail AND e.case_id = f.case_id) "
+        "FROM (SELECT c.case_id AS case_id, MIN(c.run_id) AS first_fail "
+        "      FROM case_results c JOIN runs r ON r.run_id = c.run_id "
+        "      WHERE r.top = ? AND r.rtl_hash = ? AND c.ok = 0 GROUP BY c.case_id) f "
+        "ORDER BY f.case_id",
+        (top, prev_hash, top, rtl_hash)).fetchall()
+
+    return prev_hash, [row for row in rows if row[2] is not None]
+
+
+def query_trend(db, top=None, stage="vsim", last=20):
+    """run 별 단계 throughput : (run_id, recorded, rtl_hash, 총 cycles, 총 wall_s, cycles/s)"""
+    where, args = _top_filter(top)
+    rows = db.execute(
+        "SELECT r.run_id, r.recorded, r.rtl_hash, SUM(s.cycles), SUM(s.wall_s) "
+        f"FROM (SELECT * FROM runs r WHERE 1=1{where} ORDER BY r.run_id DESC LIMIT ?) r "
+        "JOIN stage_times s ON s.run_id = r.run_id AND s.stage = ? "
+        "GROUP BY r.run_id ORDER BY r.run_id DESC", args + (last, stage)).fetchall()
+    return [(rid, rec, h, cyc, wall, (cyc / wall) if cyc and wall else None)
+            for rid, rec, h, cyc, wall in reversed(rows)]
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def _when(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="regression history 조회")
+    ap.add_argument("command", choices=["runs", "flaky", "first-fail", "trend"])
+    ap.add_argument("--db", help=f"history DB (default ${{AUTO_TB_HISTORY}} or {DEFAULT_DB})")
+    ap.add_argument("--top", help="top module name")
+    ap.add_argument("--last", type=int, default=20)
+    ap.add_argument("--by-slot", action="store_true",
+                    help="flaky: group by case number instead of identical input hex")
+    ap.add_argument("--rtl", help="first-fail: RTL hash (prefix ok, default = latest run)")
+    ap.add_argument("--stage", default="vsim", help="trend: profiled stage name")
+    args = ap.parse_args()
+
+    path = args.db or history_path()
+    if not os.path.exists(path):
+        print(f"[ERROR] No history DB: {path}")
+        raise SystemExit(1)
+    db = open_history(path)
+
+    if args.command == "runs":
+        for run_id, rec, top, h, passed, cases in query_runs(db, args.top, args.last):
+            print(f"run {run_id:5d}  {_when(rec)}  {top or '-':16s} rtl={(h or '-')[:10]}  "
+                  f"{passed}/{cases} PASS")
+
+    elif args.command == "flaky":
+        rows = query_flaky(db, args.top, args.by_slot)
+        if not rows:
+            print("[+] No flaky cases")
+        for top, h, key, params, n, fails, first, last in rows:
+            label = f"case {key}" if args.by_slot else f"input {key[:10]}"
+            print(f"{top or '-':16s} rtl={(h or '-')[:10]}  {label}  params={params}  "
+                  f"{fails}/{n} FAIL  (runs {first}..{last})")
+
+    elif args.command == "first-fail":
+        if args.top is None:
+            ap.error("first-fail needs --top")
+        rtl = args.rtl
+        if rtl is not None:
+            row = db.execute("SELECT rtl_hash FROM runs WHERE top = ? AND rtl_hash LIKE ? "
+                             "ORDER BY run_id DESC LIMIT 1", (args.top, rtl + "%")).fetchone()
+            if row is None:
+                print(f"[ERROR] No run of {args.top} with RTL {rtl}")
+                raise SystemExit(1)
+            rtl = row[0]
+        prev_hash, rows = query_first_fail(db, args.top, rtl)
+        print(f"[+] Previous RTL: {(prev_hash or '-')[:10]}")
+        if not rows:
+            print("[+] No case started failing")
+        for case_id, first_fail, last_pass, err in rows:
+            print(f"case {case_id}: first FAIL in run {first_fail} "
+                  f"(last PASS run {last_pass})  {err}")
+
+    else:
+        for run_id, rec, h, cyc, wall, rate in query_trend(db, args.top, args.stage, args.last):
+            rate_s = f"{rate:,.0f} cycles/s" if rate else "-"
+            print(f"run {run_id:5d}  {_when(rec)}  rtl={(h or '-')[:10]}  "
+                  f"{args.stage}: {wall:.3f}s  {rate_s}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+# ============================================================
+# cycle → byte offset sidecar index (<file>.idx)
+#
+# cycle 48,000,000 의 mismatch 를 보려고 CSV / 로그를 처음부터 읽지 않도록,
+# 파일을 쓰는 쪽(run_single_case, sim_to_csv)이 쓰면서 같이 index 를 만듦
+#   offsets[k] = cycle >= k * stride 인 첫 줄의 byte offset
+#
+#   golden_caseN.csv.idx      : run_single_case (shard 실행이면 조각 index 를 이어붙임)
+#   csv_result_caseN.csv.idx  : sim_to_csv
+#   SIMresult_caseN.txt.idx   : sim_to_csv 가 로그를 한 번 훑어서 '[Cycle N]' 위치 기록
+#   입력 hex                  : 줄 길이가 일정하므로 index 없이 바로 seek (open_hex_at)
+#
+# index 가 없거나 파일 크기가 달라졌으면 그 자리에서 다시 만듦
+# 압축 파일(.gz / .zst)은 seek 이 안 되므로 처음부터 읽음
+# offset 은 실제 파일의 byte 위치 (utf-8 길이 + text 모드 쓰기의 개행 변환 포함),
+# 읽을 때도 binary 로 seek 한 뒤 decode
+#
+# CLI
+#   python auto_index.py window CASE CYCLE [--around 5] [--result-dir results]
+#   python auto_index.py window CASE START STOP
+#   python auto_index.py build FILE...
+# ============================================================
+
+import argparse
+import io
+import os
+import re
+import struct
+from array import array
+from itertools import accumulate
+
+from auto_storage import compression_of, find_artifact, open_text
+
+INDEX_STRIDE = 1024
+INDEX_MAGIC = b"CYIDX1\n"
+INDEX_HEADER = struct.Struct("<IQI")     # stride, 데이터 파일 크기, offset 개수
+CONTEXT_CYCLES = 5                       # compare 리포트에 붙이는 앞뒤 cycle 수
+
+LOG_CYCLE_RE = re.compile(rb"\[Cycle\s+(\d+)\]")
+LOG_CYCLE_TEXT_RE = re.compile(r"\[Cycle\s+(\d+)\]")
+
+_CRLF = os.linesep != "\n"      # text 모드로 쓰면 "\n" → "\r\n" (Windows)
+
+
+def text_bytes(text):
+    """text 모드로 쓴 문자열이 파일에서 차지하는 byte 수"""
+    n = len(text.encode("utf-8"))
+    return n + text.count("\n") if _CRLF else n
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+class CycleIndex:
+    """
+    한 줄 = 한 cycle 인 행들을 쓰면서 add_rows() 로 넘기면 offset 을 기록.
+    shard 조각처럼 중간 cycle 부터 시작하면 first_cycle 을 지정.
+    """
+
+    def __init__(self, stride=INDEX_STRIDE, pos=0, first_cycle=0):
+        self.stride = stride
+        self.pos = pos
+        self.next_cycle = -(-first_cycle // stride) * stride    # 다음 mark 할 cycle
+        self.offsets = array("Q")
+
+    def add_rows(self, first_cycle, rows):
+        last = first_cycle + len(rows)
+        if self.next_cycle >= last:
+            self.pos += text_bytes("".join(rows))
+            return
+
+        acc = list(accumulate(map(text_bytes, rows), initial=self.pos))
+        while self.next_cycle < last:
+            self.offsets.append(acc[max(0, self.next_cycle - first_cycle)])
+            self.next_cycle += self.stride
+        self.pos = acc[-1]
+
+    def add_row(self, cycle, row):
+        """한 줄씩 쓰는 writer 용 (add_rows 보다 호출 비용이 작음)"""
+        if cycle >= self.next_cycle:
+            self.mark(cycle, self.pos)
+        self.pos += text_bytes(row)
+
+    def mark(self, cycle, offset):
+        """줄 단위로 직접 기록할 때 (로그 스캔)"""
+        while self.next_cycle <= cycle:
+            self.offsets.append(offset)
+            self.next_cycle += self.stride
+
+    def extend(self, other, base):
+        """다음 조각의 index 를 base byte 만큼 밀어서 이어붙임"""
+        self.offsets.extend(o + base for o in other.offsets)
+        self.next_cycle = other.next_cycle
+
+    def save(self, path):
+        # 압축 파일은 offset 이 의미 없으므로 만들지 않음
+        if compression_of(path) != "none" or not os.path.isfile(path):
+            return None
+        with open(index_path(path), "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(INDEX_HEADER.pack(self.stride, os.path.getsize(path), len(self.offsets)))
+            self.offsets.tofile(f)
+        return index_path(path)
+
+
+def load_index(path):
+    """(stride, offsets) / index 가 없거나 오래됐으면 None"""
+    ipath = index_path(path)
+    if not os.path.exists(ipath):
+        return None
+    with open(ipath, "rb") as f:
+        if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            return None
+        stride, size, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        if size != os.path.getsize(path):
+            return None
+        offsets = array("Q")
+        offsets.fromfile(f, count)
+    return stride, offsets
+
+
+# ------------------------------------------------------------
+# 이미 있는 파일의 index 만들기 (csv / log)
+# ------------------------------------------------------------
+def build_index(path, kind="csv", stride=INDEX_STRIDE):
+    index = CycleIndex(stride)
+    pos = 0
+    with open(path, "rb") as f:
+        if kind == "csv":
+            pos = len(f.readline())
+        for line in f:
+            if kind == "csv":
+                head = line.split(b",", 1)[0]
+                if head.isdigit():
+                    index.mark(int(head), pos)
+            elif b"[Cycle" in line:
+                m = LOG_CYCLE_RE.search(line)
+                if m:
+                    index.mark(int(m.group(1)), pos)
+            pos += len(line)
+    index.save(path)
+    return index.stride, index.offsets
+
+
+def _kind_of(path):
+    if path.endswith(".csv") or ".csv." in os.path.basename(path):
+        return "csv"
+    if path.endswith(".hex") or ".hex." in os.path.basename(path):
+        return "hex"
+    return "log"
+
+
+# ------------------------------------------------------------
+# 창(window) 읽기 : [start, stop) cycle 의 줄들 (csv 는 header 포함)
+# ------------------------------------------------------------
+def _seek_offset(path, kind, start):
+    if compression_of(path) != "none":
+        return None
+    idx = load_index(path) or build_index(path, kind)
+    stride, offsets = idx
+    if not offsets:
+        return None
+    return offsets[min(start // stride, len(offsets) - 1)]
+
+
+def read_window(path, start, stop, kind=None):
+    path = find_artifact(path)
+    if not os.path.exists(path):
+        return None
+    kind = kind or _kind_of(path)
+
+    if kind == "hex":
+        from auto_golden import open_hex_at
+        with open_hex_at(path, start) as f:
+            return [ln.rstrip("\n") for _, ln in zip(range(stop - start), f)]
+
+    out = []
+    if compression_of(path) == "none":
+        # offset 은 byte 위치 → binary 로 seek 하고 그 뒤를 text 로 읽음
+        raw = open(path, "rb")
+        if kind == "csv":
+            out.append(raw.readline().decode("utf-8", "ignore").rstrip("\r\n"))
+        offset = _seek_offset(path, kind, start)
+        if offset is not None:
+            raw.seek(offset)
+        f = io.TextIOWrapper(raw, encoding="utf-8", errors="ignore")
+    else:
+        f = open_text(path, "r", errors="ignore")
+        if kind == "csv":
+            out.append(f.readline().rstrip("\n"))
+
+    with f:
+        inside = False
+        for line in f:
+            line = line.rstrip("\n")
+            if kind == "csv":
+                head = line.split(",", 1)[0]
+                if not head.isdigit():
+                    continue
+                c = int(head)
+                if c >= stop:
+                    break
+                if c >= start:
+                    out.append(line)
+            else:
+                m = LOG_CYCLE_TEXT_RE.search(line)
+                if m:
+                    c = int(m.group(1))
+                    if c >= stop:
+                        break
+                    inside = c >= start
+                if inside:
+                    out.append(line)
+    return out
+
+
+# ------------------------------------------------------------
+# case 하나의 모든 파일에서 같은 창
+# ------------------------------------------------------------
+def case_window(case_id, start, stop, result_dir="results", cfg=None):
+    """{이름: 줄 list} (없는 파일은 빠짐)"""
+    if cfg is None:
+        import json
+        cfg_path = os.path.join(result_dir, f"config_case{case_id}.json")
+        if os.path.exists(cfg_path):
+            with open(cfg_path, "r") as f:
+                cfg = json.load(f)
+        else:
+            # --store run : config 는 results.db 에만 있음
+            from auto_resultstore import stored_configs
+            cfg = next((c for c in stored_configs(result_dir) if c["case_id"] == case_id), None)
+
+    files = [
+        ("golden", os.path.join(result_dir, f"golden_case{case_id}.csv"), "csv"),
+        ("rtl", os.path.join(result_dir, f"csv_result_case{case_id}.csv"), "csv"),
+    ]
+    if cfg and cfg.get("stimulus", "file") == "file":
+        for port in cfg["input_ports"]:
+            files.append((f"input {port}", cfg["hex_files"][port], "hex"))
+    files.append(("log", os.path.join(result_dir, f"SIMresult_case{case_id}.txt"), "log"))
+
+    window = {}
+    for name, path, kind in files:
+        lines = read_window(path, start, stop, kind)
+        if lines is not None:
+            window[name] = lines
+    return window
+
+
+def format_window(window, start):
+    out = []
+    for name, lines in window.items():
+        out.append(f"--- {name} ---\n")
+        if name.startswith("input"):
+            for i, ln in enumerate(lines):
+                out.append(f"{start + i},{ln}\n")
+        else:
+            out.extend(ln + "\n" for ln in lines)
+    return "".join(out)
+
+
+def failure_context(case_id, cycle, result_dir="results", around=CONTEXT_CYCLES, cfg=None):
+    """compare 리포트용 : 실패 cycle 앞뒤 around cycle"""
+    start = max(0, cycle - around)
+    window = case_window(case_id, start, cycle + around + 1, result_dir, cfg)
+    return (f"\n※ cycle {start}..{cycle + around} 주변 값 (실패 cycle {cycle}):\n"
+            + format_window(window, start))
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="cycle index / window")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    w = sub.add_parser("window", help="print a cycle window of one case")
+    w.add_argument("case_id", type=int)
+    w.add_argument("start", type=int)
+    w.add_argument("stop", type=int, nargs="?")
+    w.add_argument("--around", type=int, default=CONTEXT_CYCLES)
+    w.add_argument("--result-dir", default="results")
+
+    b = sub.add_parser("build", help="(re)build .idx for existing CSV / log files")
+    b.add_argument("files", nargs="+")
+
+    args = ap.parse_args()
+
+    if args.command == "build":
+        for path in args.files:
+            stride, offsets = build_index(path, _kind_of(path))
+            print(f"[+] {index_path(path)}: {len(offsets)} marks (stride {stride})")
+        return
+
+    if args.stop is None:
+        start = max(0, args.start - args.around)
+        stop = args.start + args.around + 1
+    else:
+        start, stop = args.start, args.stop
+    print(format_window(case_window(args.case_id, start, stop, args.result_dir), start), end="")
+
+
+if __name__ == "__main__":
+    main()
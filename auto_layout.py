@@ -0,0 +1,173 @@
+# ============================================================
+# 포트 layout 표 (top module 당 한 번 계산 → config_case JSON 의 "layout")
+#
+# 예전에는
+#   - 포트 폭 : generate_hex_inputs 안에서 calc_width 가 bracket 식을 eval
+#   - golden CSV 폭 : auto_golden 이 DATA_WIDTH + ceil(log2(INPUT_COUNT)) 로 추측
+#     → mux 처럼 출력이 DATA_WIDTH 인 모듈은 golden 9 자리 / RTL 8 자리로 어긋남
+#   - 파라미터는 int(v) → "DATA_WIDTH*2" 처럼 다른 파라미터를 쓰는 식이면 실패
+#
+# 지금은 여기서 한 번에
+#   params : 파라미터 식을 순서와 무관하게 풀어 둔 int 환경
+#   ports  : 포트마다 dir / width / dims(packed 차원별 폭) / lane_width / lanes / hex_digits
+#   TB / stimulus / constraints / coverage / golden 이 모두 이 표를 씀
+#
+# 식 계산은 eval 대신 AST 를 직접 계산 (허용 : 정수, 파라미터 이름, 산술 / 비트 / 비교 연산,
+#   $clog2, Verilog 숫자 literal 8'hFF / 'd10 / 1_000)
+# ============================================================
+
+import ast
+import math
+import operator
+import re
+
+RESET_CYCLES = 3        # TB 는 처음 3 cycle 동안 reset 을 걸고 시작 (golden / coverage / shrink 공통)
+
+_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.floordiv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+    ast.BitAnd: operator.and_, ast.BitOr: operator.or_, ast.BitXor: operator.xor,
+}
+_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert,
+          ast.Not: operator.not_}
+_COMPARE = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+            ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+
+_FUNCS = {"clog2": lambda x: math.ceil(math.log2(x)) if x > 1 else 0}
+
+_VLOG_NUM_RE = re.compile(r"(\d*)\s*'[sS]?([bBoOdDhH])\s*([0-9a-fA-F_]+)")
+_BASES = {"b": 2, "o": 8, "d": 10, "h": 16}
+
+
+def _verilog_to_python(expr):
+    expr = _VLOG_NUM_RE.sub(lambda m: str(int(m.group(3).replace("_", ""),
+                                              _BASES[m.group(2).lower()])), expr)
+    expr = re.sub(r"(?<=\d)_(?=\d)", "", expr)
+    expr = expr.replace("$clog2", "clog2").replace("&&", " and ").replace("||", " or ")
+    return re.sub(r"!(?!=)", " not ", expr)
+
+
+def _eval_node(node, env):
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body, env)
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in env:
+            raise NameError(node.id)
+        return env[node.id]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        return _BINOPS[type(node.op)](_eval_node(node.left, env), _eval_node(node.right, env))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return int(_UNARY[type(node.op)](_eval_node(node.operand, env)))
+    if isinstance(node, ast.BoolOp):
+        vals = [_eval_node(v, env) for v in node.values]
+        return int(all(vals) if isinstance(node.op, ast.And) else any(vals))
+    if isinstance(node, ast.Compare):
+        left = _eval_node(node.left, env)
+        for op, right in zip(node.ops, node.comparators):
+            right = _eval_node(right, env)
+            if type(op) not in _COMPARE or not _COMPARE[type(op)](left, right):
+                return 0
+            left = right
+        return 1
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCS and len(node.args) == 1 and not node.keywords):
+        return _FUNCS[node.func.id](_eval_node(node.args[0], env))
+    raise ValueError(f"unsupported expression element {type(node).__name__}")
+
+
+def eval_expr(expr, env):
+    """파라미터 식 → int (정해진 문법만 허용, 이름은 env 에서)"""
+    if isinstance(expr, int):
+        return expr
+    try:
+        tree = ast.parse(_verilog_to_python(str(expr).strip()), mode="eval")
+        return int(_eval_node(tree, env))
+    except NameError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"[ERROR] Cannot evaluate expression '{expr}': {e}")
+
+
+# ------------------------------------------------------------
+# 파라미터 환경 : 다른 파라미터를 참조하는 식도 (선언 순서와 무관하게) 풀어 둠
+# ------------------------------------------------------------
+def param_env(params):
+    """[(name, expr)] 또는 {name: value} → {name: int}"""
+    pending = list(params.items() if isinstance(params, dict) else params)
+    env = {}
+    while pending:
+        unresolved = []
+        for name, expr in pending:
+            try:
+                env[name] = eval_expr(expr, env)
+            except NameError:
+                unresolved.append((name, expr))
+        if len(unresolved) == len(pending):
+            names = ", ".join(f"{n} = {e}" for n, e in unresolved)
+            raise RuntimeError(f"[ERROR] Cannot resolve parameter(s): {names}")
+        pending = unresolved
+    return env
+
+
+# ------------------------------------------------------------
+# 포트 하나의 layout
+# ------------------------------------------------------------
+def decl_dims(full_decl, env):
+    """선언의 packed 차원별 폭 ([7:0][31:0] → [8, 32])"""
+    dims = []
+    for b in re.findall(r"\[(.*?)\]", full_decl):
+        hi, lo = b.split(":", 1)
+        dims.append(abs(eval_expr(hi, env) - eval_expr(lo, env)) + 1)
+    return dims
+
+
+def port_layout(direction, full_decl, env):
+    dims = decl_dims(full_decl, env)
+    width = math.prod(dims) if dims else 1
+
+    # lane : 2D 포트면 안쪽 차원, 1D 면 DATA_WIDTH 로 나눠떨어질 때 (mux 의 data_in)
+    lane_width = None
+    if len(dims) >= 2:
+        lane_width = dims[-1]
+    else:
+        dw = env.get("DATA_WIDTH")
+        if dw and width > dw and width % dw == 0:
+            lane_width = dw
+
+    return {
+        "dir": direction,
+        "width": width,
+        "dims": dims,
+        "lane_width": lane_width,
+        "lanes": width // lane_width if lane_width else 1,
+        "hex_digits": (width + 3) // 4,
+    }
+
+
+def build_layout(ports, params):
+    """
+    ports : parse_ports 결과 (full) 또는 config 의 ports (full_decl)
+    params : parse_parameters 결과 [(name, expr)] 또는 {name: value}
+    """
+    env = param_env(params)
+    layout = {}
+    for p in ports:
+        decl = p.get("full", p.get("full_decl"))
+        layout[p["name"]] = port_layout(p["dir"], decl, env)
+    return {"params": env, "ports": layout}
+
+
+def control_ports(cfg):
+    """(clk, reset) 포트 이름 : config 의 "run" (--clk / --reset / batch spec), 없으면 예전 기본값"""
+    run = cfg.get("run") or {}
+    return run.get("clk") or "clk", run.get("reset") or "rst_n"
+
+
+def layout_of(cfg):
+    """config 의 layout (예전 config 면 ports / params 로 다시 계산)"""
+    if cfg.get("layout"):
+        return cfg["layout"]
+    return build_layout(cfg["ports"], cfg["params"])
@@ -0,0 +1,162 @@
+# ============================================================
+# 단계별 성능 측정 (auto_vsim / auto_golden / auto_compare 공용)
+#
+# 각 단계(parse, tb_gen, hex_gen, vlog, vsim, sim_to_csv, golden, compare)를
+# with profiler.stage(...) 로 감싸면 wall time, CPU time, peak RSS,
+# 기록한 바이트 수, cycles/sec 를 case 별로 기록함
+#
+# peak RSS 는 ru_maxrss (프로세스가 시작된 뒤의 최고치) 라서 stage 값이 아님
+#   process_peak_rss_kb : stage 가 끝난 시점의 프로세스 peak
+#   rss_growth_kb       : 이 stage 동안 peak 가 늘어난 양 (앞 stage 보다 덜 쓰면 0)
+#
+# 결과는 results/ 폴더 안에
+#   profile_<tool>.json : 단계별 측정값 (회귀 추적용)
+#   trace_<tool>.json   : Chrome trace 포맷 타임라인 (chrome://tracing, Perfetto)
+# ============================================================
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource          # POSIX 전용
+except ImportError:          # Windows
+    resource = None
+
+
+# ------------------------------------------------------------
+# peak RSS (KB) : 자기 자신 / 자식 프로세스(vlog, vsim)
+# ------------------------------------------------------------
+def peak_rss_kb(children=False):
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # macOS 는 byte 단위, Linux 는 KB 단위
+    if sys.platform == "darwin":
+        rss //= 1024
+    return rss
+
+
+# ------------------------------------------------------------
+# CPU time (자기 자신 + 종료된 자식 프로세스 포함)
+# ------------------------------------------------------------
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ------------------------------------------------------------
+# 파일 크기 합계 (없는 파일은 무시)
+# ------------------------------------------------------------
+def total_size(paths):
+    size = 0
+    for p in paths:
+        if os.path.exists(p):
+            size += os.path.getsize(p)
+    return size
+
+
+class Profiler:
+    """
+    단계별 측정기.
+
+    with prof.stage("vsim", case_id=0, cycles=1000) as rec:
+        ...
+        rec["outputs"].append(sim_log)   # bytes_written 계산 대상
+    """
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.pid = os.getpid()
+        self.records = []
+
+    # --------------------------------------------------------------
+    @contextmanager
+    def stage(self, name, case_id=None, cycles=None, outputs=None):
+        rec = {
+            "stage": name,
+            "case_id": case_id,
+            "cycles": cycles,
+            "outputs": list(outputs or []),
+        }
+
+        # auto_vsim --jobs : 여러 case 의 stage 가 thread 마다 동시에 돌아감
+        #   → timeline 은 thread 별 track, CPU time 은 프로세스 전체 값이라 stage 에 나눌 수 없음
+        thread = threading.current_thread()
+        main_thread = thread is threading.main_thread()
+        rec["tid"] = self.tool if main_thread else f"{self.tool} ({thread.name})"
+
+        start_epoch = time.time()
+        t0 = time.perf_counter()
+        c0 = cpu_seconds()
+        rss0 = peak_rss_kb()
+        child_rss0 = peak_rss_kb(children=True)
+        try:
+            yield rec
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = cpu_seconds() - c0
+
+            rec["start"] = start_epoch
+            rec["wall_s"] = wall
+            rec["cpu_s"] = cpu if main_thread else None
+            rss = peak_rss_kb()
+            child_rss = peak_rss_kb(children=True)
+            rec["process_peak_rss_kb"] = rss
+            rec["child_process_peak_rss_kb"] = child_rss
+            rec["rss_growth_kb"] = None if rss is None else rss - rss0
+            rec["child_rss_growth_kb"] = None if child_rss is None else child_rss - child_rss0
+            rec["bytes_written"] = total_size(rec["outputs"])
+            if rec["cycles"] and wall > 0:
+                rec["cycles_per_s"] = rec["cycles"] / wall
+            else:
+                rec["cycles_per_s"] = None
+
+            self.records.append(rec)      # list.append 는 thread 간에도 안전
+
+    # --------------------------------------------------------------
+    def to_chrome_trace(self):
+        events = []
+        for rec in self.records:
+            name = rec["stage"]
+            if rec["case_id"] is not None:
+                name += f" (case {rec['case_id']})"
+            events.append({
+                "name": name,
+                "cat": self.tool,
+                "ph": "X",
+                "ts": int(rec["start"] * 1e6),
+                "dur": int(rec["wall_s"] * 1e6),
+                "pid": self.pid,
+                "tid": rec["tid"],
+                "args": {k: v for k, v in rec.items()
+                         if k not in ("stage", "start", "outputs", "tid")},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    # --------------------------------------------------------------
+    def save(self, result_dir="results"):
+        if not os.path.isdir(result_dir):
+            return None
+
+        profile_path = os.path.join(result_dir, f"profile_{self.tool}.json")
+        trace_path = os.path.join(result_dir, f"trace_{self.tool}.json")
+
+        data = {
+            "tool": self.tool,
+            "pid": self.pid,
+            "stages": [{k: v for k, v in r.items() if k != "outputs"}
+                       for r in self.records],
+        }
+        with open(profile_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+        print(f"[+] Saved profile: {profile_path}")
+        return profile_path
@@ -0,0 +1,429 @@
+# ============================================================
+# run 단위 결과 저장소 (results/results.db, SQLite)
+#
+# case 마다 results/ 에 hex(입력 포트별), TB, config JSON, SIMresult 로그,
+# RTL CSV, golden CSV, compare_case 가 생겨서 큰 regression 이면 작은 파일이
+# 수만 개가 됨 → listing / 백업 / 삭제가 느려짐
+#
+# auto_vsim.py --store 로 실행하면
+#   - config 는 config_case<N>.json 대신 처음부터 이 DB 에 기록 (auto_golden / auto_compare 는
+#     load_all_configs 로 DB 에서 읽음 → 재실행해도 case 를 찾음)
+#   - auto_compare 는 case 판정을 끝나는 대로 DB 에 기록
+#   - 비교가 끝나면 시뮬레이터 / golden 이 만든 case 별 파일을 이 DB 하나로 모으고 삭제
+#     (다시 돌리는 auto_compare 는 없어진 CSV 를 DB 의 컬럼에서 읽음)
+#   cases    : case_id → config JSON
+#   columns  : case 별 컬럼 (입력 hex / RTL CSV / golden CSV 의 각 열을 zlib 압축 blob 으로)
+#   files    : TB .sv, SIMresult 로그 (zlib 압축 blob)
+#   verdicts : PASS/FAIL, 에러 메시지, 0↔x 치환 목록
+#
+# 작은 파일이 다시 필요하면 요청할 때만 export
+#   python auto_resultstore.py export [results] [--cases 3,5]
+#   python auto_resultstore.py list   [results] [--failed]
+# ============================================================
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import zlib
+
+from auto_storage import COMPRESSION_EXT, compression_of, find_artifact, open_text
+
+DB_NAME = "results.db"
+ZLIB_LEVEL = 6
+READ_CHUNK = 1 << 16        # 컬럼 압축 시 한 번에 모으는 줄 수
+TB_RE = re.compile(r"^tb_\w+_case(\d+)\.sv$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id INTEGER PRIMARY KEY,
+    cycles  INTEGER NOT NULL,
+    config  TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS columns (
+    case_id  INTEGER NOT NULL,
+    source   TEXT    NOT NULL,      -- input / expect / rtl / golden
+    position INTEGER NOT NULL,      -- CSV 열 순서 (input 은 포트 순서)
+    name     TEXT    NOT NULL,
+    rows     INTEGER NOT NULL,
+    data     BLOB    NOT NULL,      -- zlib('값\\n값\\n...')
+    PRIMARY KEY (case_id, source, name)
+);
+CREATE TABLE IF NOT EXISTS files (
+    case_id INTEGER NOT NULL,
+    name    TEXT    NOT NULL,       -- results/ 안의 원래 파일 이름
+    data    BLOB    NOT NULL,
+    PRIMARY KEY (case_id, name)
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    case_id INTEGER PRIMARY KEY,
+    ok      INTEGER NOT NULL,
+    error   TEXT,
+    zero_x  TEXT    NOT NULL        -- JSON [[line, golden, rtl], ...]
+);
+CREATE INDEX IF NOT EXISTS verdicts_ok ON verdicts (ok);
+"""
+
+
+def db_path(result_dir="results"):
+    return os.path.join(result_dir, DB_NAME)
+
+
+# ------------------------------------------------------------
+# 줄 단위 iterator → zlib blob (메모리에는 압축된 데이터만 유지)
+# ------------------------------------------------------------
+def _pack_lines(lines):
+    comp = zlib.compressobj(ZLIB_LEVEL)
+    parts = []
+    buf = []
+    rows = 0
+    for ln in lines:
+        buf.append(ln)
+        if len(buf) >= READ_CHUNK:
+            parts.append(comp.compress(("\n".join(buf) + "\n").encode("ascii")))
+            rows += len(buf)
+            buf = []
+    if buf:
+        parts.append(comp.compress(("\n".join(buf) + "\n").encode("ascii")))
+        rows += len(buf)
+    parts.append(comp.flush())
+    return rows, b"".join(parts)
+
+
+def _unpack_lines(blob):
+    text = zlib.decompress(blob).decode("ascii")
+    return text.split("\n")[:-1]
+
+
+class _ColumnPacker:
+    """여러 컬럼을 한 번에 : 줄을 받아 컬럼별 zlib 스트림에 READ_CHUNK 줄씩 압축"""
+
+    def __init__(self, count):
+        self.comps = [zlib.compressobj(ZLIB_LEVEL) for _ in range(count)]
+        self.parts = [[] for _ in range(count)]
+        self.bufs = [[] for _ in range(count)]
+        self.rows = 0
+
+    def _flush_bufs(self):
+        for comp, parts, buf in zip(self.comps, self.parts, self.bufs):
+            if buf:
+                parts.append(comp.compress(("\n".join(buf) + "\n").encode("ascii")))
+                buf.clear()
+
+    def add(self, cells):
+        for buf, cell in zip(self.bufs, cells):
+            buf.append(cell)
+        self.rows += 1
+        if len(self.bufs[0]) >= READ_CHUNK:
+            self._flush_bufs()
+
+    def blobs(self):
+        self._flush_bufs()
+        return [b"".join(parts) + comp.flush() for comp, parts in zip(self.comps, self.parts)]
+
+
+class ResultStore:
+    """results/results.db 하나에 config / 컬럼 / 판정을 모아두는 저장소"""
+
+    def __init__(self, result_dir="results"):
+        self.result_dir = result_dir
+        self.db = sqlite3.connect(db_path(result_dir))
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------------------
+    # 쓰기
+    # --------------------------------------------------------------
+    def put_config(self, cfg):
+        self.db.execute("INSERT OR REPLACE INTO cases VALUES (?, ?, ?)",
+                        (cfg["case_id"], cfg["cycles"], json.dumps(cfg)))
+
+    def put_column(self, case_id, source, position, name, lines):
+        rows, blob = _pack_lines(lines)
+        self.db.execute("INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?)",
+                        (case_id, source, position, name, rows, blob))
+
+    def put_csv(self, case_id, source, path):
+        """CSV 파일 한 개를 열 단위로 저장 (파일은 한 번만 읽고 줄마다 열을 나눔)"""
+        with open_text(path, "r") as f:
+            header = f.readline().rstrip("\n").split(",")
+            packer = _ColumnPacker(len(header))
+            for ln in f:
+                packer.add(ln.rstrip("\n").split(","))
+        for pos, (name, blob) in enumerate(zip(header, packer.blobs())):
+            self.db.execute("INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?)",
+                            (case_id, source, pos, name, packer.rows, blob))
+
+    def put_file(self, case_id, path):
+        with open_text(path, "r", errors="ignore") as f:
+            data = zlib.compress(f.read().encode("utf-8"), ZLIB_LEVEL)
+        # export 는 plain 으로 쓰므로 압축 확장자를 뗀 이름으로 저장
+        name = os.path.basename(path)
+        ext = COMPRESSION_EXT[compression_of(name)]
+        if ext:
+            name = name[:-len(ext)]
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                        (case_id, name, data))
+
+    def put_verdict(self, case_id, ok, error, zero_x):
+        self.db.execute("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)",
+                        (case_id, 1 if ok else 0, error, json.dumps(zero_x)))
+
+    # --------------------------------------------------------------
+    # 읽기
+    # --------------------------------------------------------------
+    def configs(self):
+        cur = self.db.execute("SELECT config FROM cases ORDER BY case_id")
+        return [json.loads(row[0]) for row in cur]
+
+    def column_names(self, case_id, source):
+        cur = self.db.execute("SELECT name FROM columns WHERE case_id=? AND source=? "
+                              "ORDER BY position", (case_id, source))
+        return [row[0] for row in cur]
+
+    def csv_lines(self, case_id, source):
+        """저장된 rtl / golden CSV 를 파일과 같은 줄 list 로 (header 포함). 없으면 None"""
+        names = self.column_names(case_id, source)
+        if not names:
+            return None
+        cols = [self.column(case_id, source, n) for n in names]
+        return [",".join(names)] + [",".join(row) for row in zip(*cols)]
+
+    def column(self, case_id, source, name):
+        row = self.db.execute("SELECT data FROM columns WHERE case_id=? AND source=? AND name=?",
+                              (case_id, source, name)).fetchone()
+        return None if row is None else _unpack_lines(row[0])
+
+    def verdicts(self, failed_only=False):
+        sql = "SELECT case_id, ok, error, zero_x FROM verdicts"
+        if failed_only:
+            sql += " WHERE ok = 0"
+        cur = self.db.execute(sql + " ORDER BY case_id")
+        return [(cid, bool(ok), err, json.loads(zx)) for cid, ok, err, zx in cur]
+
+    def file_names(self, case_id):
+        cur = self.db.execute("SELECT name FROM files WHERE case_id=?", (case_id,))
+        return [row[0] for row in cur]
+
+    def file_text(self, case_id, name):
+        row = self.db.execute("SELECT data FROM files WHERE case_id=? AND name=?",
+                              (case_id, name)).fetchone()
+        return None if row is None else zlib.decompress(row[0]).decode("utf-8")
+
+
+# ------------------------------------------------------------
+# DB 가 있을 때만 여는 읽기 도우미 (auto_compare / auto_golden / auto_index 공용)
+# ------------------------------------------------------------
+def stored_configs(result_dir="results"):
+    if not os.path.exists(db_path(result_dir)):
+        return []
+    with ResultStore(result_dir) as store:
+        return store.configs()
+
+
+def stored_csv_lines(result_dir, case_id, source):
+    if not os.path.exists(db_path(result_dir)):
+        return None
+    with ResultStore(result_dir) as store:
+        return store.csv_lines(case_id, source)
+
+
+def store_config(cfg, result_dir="results"):
+    with ResultStore(result_dir) as store:
+        store.put_config(cfg)
+    return db_path(result_dir)
+
+
+# ------------------------------------------------------------
+# case 하나의 작은 파일 목록 (있는 것만, 압축된 것 포함)
+# ------------------------------------------------------------
+def list_tb_files(result_dir="results"):
+    """{case_id: [tb 경로]} (listdir 한 번)"""
+    tbs = {}
+    for fname in os.listdir(result_dir):
+        m = TB_RE.match(fname)
+        if m:
+            tbs.setdefault(int(m.group(1)), []).append(os.path.join(result_dir, fname))
+    return tbs
+
+
+def case_files(cfg, result_dir="results", tb_files=None):
+    from auto_golden import expect_hex_path
+
+    case_id = cfg["case_id"]
+    names = {
+        "config": f"config_case{case_id}.json",
+        "rtl":    f"csv_result_case{case_id}.csv",
+        "golden": f"golden_case{case_id}.csv",
+        "compare": f"compare_case{case_id}.txt",
+        "log":    f"SIMresult_case{case_id}.txt",
+    }
+    found = {k: find_artifact(os.path.join(result_dir, n)) for k, n in names.items()}
+
+    if tb_files is None:
+        tb_files = list_tb_files(result_dir)
+    found["tb"] = tb_files.get(case_id, [])
+
+    found["input"] = {}
+    if cfg.get("stimulus", "file") == "file":
+        found["input"] = {p: find_artifact(path) for p, path in cfg["hex_files"].items()}
+    found["expect"] = {}
+    if cfg.get("check") == "selfcheck":
+        found["expect"] = {p: find_artifact(expect_hex_path(result_dir, p, case_id))
+                           for p in cfg["output_ports"]}
+
+    return found
+
+
+# ------------------------------------------------------------
+# 비교가 끝난 run 을 DB 로 모으고 작은 파일 삭제
+#   verdicts : {case_id: (ok, errmsg, zero_x_list)}
+# ------------------------------------------------------------
+def consolidate(configs, verdicts, result_dir="results", remove=True):
+    removed = []
+    tb_files = list_tb_files(result_dir)
+
+    with ResultStore(result_dir) as store:
+        for cfg in configs:
+            case_id = cfg["case_id"]
+            files = case_files(cfg, result_dir, tb_files)
+
+            store.put_config(cfg)
+            for source in ("input", "expect"):
+                for pos, (port, path) in enumerate(files[source].items()):
+                    if os.path.exists(path):
+                        with open_text(path, "r") as f:
+                            store.put_column(case_id, source, pos, port,
+                                             (ln.rstrip("\n") for ln in f))
+                        removed.append(path)
+
+            for source in ("rtl", "golden"):
+                if os.path.exists(files[source]):
+                    store.put_csv(case_id, source, files[source])
+                    removed.append(files[source])
+
+            for path in files["tb"] + [files["log"]]:
+                if os.path.exists(path):
+                    store.put_file(case_id, path)
+                    removed.append(path)
+
+            if case_id in verdicts:
+                ok, errmsg, zx = verdicts[case_id]
+                store.put_verdict(case_id, ok, errmsg, zx)
+
+            for k in ("config", "compare"):
+                if os.path.exists(files[k]):
+                    removed.append(files[k])
+            for k in ("rtl", "golden", "log"):
+                if os.path.exists(files[k] + ".idx"):
+                    removed.append(files[k] + ".idx")
+
+            # case 단위 commit → 중간에 죽어도 끝난 case 는 남음
+            store.db.commit()
+
+    if remove:
+        for path in removed:
+            os.remove(path)
+
+    print(f"[+] Consolidated {len(configs)} case(s) into {db_path(result_dir)} "
+          f"({len(removed)} small files {'removed' if remove else 'kept'})")
+
+
+# ------------------------------------------------------------
+# 요청 시 작은 파일로 export (원래 이름 / 형식 그대로)
+# ------------------------------------------------------------
+def export_case(store, cfg, result_dir="results"):
+    from auto_compare import save_compare_result
+    from auto_golden import expect_hex_path
+
+    case_id = cfg["case_id"]
+    written = []
+
+    path = os.path.join(result_dir, f"config_case{case_id}.json")
+    with open(path, "w") as f:
+        json.dump(cfg, f, indent=4)
+    written.append(path)
+
+    for source in ("input", "expect"):
+        for port in store.column_names(case_id, source):
+            if source == "input":
+                path = cfg["hex_files"][port]
+            else:
+                path = expect_hex_path(result_dir, port, case_id)
+            with open(path, "w") as f:
+                f.writelines(v + "\n" for v in store.column(case_id, source, port))
+            written.append(path)
+
+    for source, fname in (("rtl", f"csv_result_case{case_id}.csv"),
+                          ("golden", f"golden_case{case_id}.csv")):
+        lines = store.csv_lines(case_id, source)
+        if lines is None:
+            continue
+        path = os.path.join(result_dir, fname)
+        with open(path, "w") as f:
+            f.writelines(ln + "\n" for ln in lines)
+        written.append(path)
+
+    for name in store.file_names(case_id):
+        path = os.path.join(result_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(store.file_text(case_id, name))
+        written.append(path)
+
+    for cid, ok, err, zx in store.verdicts():
+        if cid == case_id:
+            save_compare_result(case_id, ok, [tuple(x) for x in zx], err, result_dir)
+
+    return written
+
+
+def export(result_dir="results", case_ids=None):
+    with ResultStore(result_dir) as store:
+        for cfg in store.configs():
+            if case_ids is not None and cfg["case_id"] not in case_ids:
+                continue
+            written = export_case(store, cfg, result_dir)
+            print(f"[+] Exported CASE {cfg['case_id']}: {len(written)} files")
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="results.db 조회 / small-file export")
+    ap.add_argument("command", choices=["list", "export"])
+    ap.add_argument("result_dir", nargs="?", default="results")
+    ap.add_argument("--cases", help="comma separated case ids (export)")
+    ap.add_argument("--failed", action="store_true", help="only failing cases (list)")
+    args = ap.parse_args()
+
+    if not os.path.exists(db_path(args.result_dir)):
+        print(f"[ERROR] No result store: {db_path(args.result_dir)}")
+        raise SystemExit(1)
+
+    if args.command == "export":
+        case_ids = None
+        if args.cases:
+            case_ids = {int(c) for c in args.cases.split(",")}
+        export(args.result_dir, case_ids)
+        return
+
+    with ResultStore(args.result_dir) as store:
+        cycles = {cfg["case_id"]: cfg["cycles"] for cfg in store.configs()}
+        for case_id, ok, err, zx in store.verdicts(args.failed):
+            state = f"PASS (0-x mismatch {len(zx)}개)" if ok else f"FAIL - {err}"
+            print(f"CASE {case_id}: {state}  [cycles={cycles.get(case_id)}]")
+
+
+if __name__ == "__main__":
+    main()
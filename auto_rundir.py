@@ -0,0 +1,301 @@
+# ============================================================
+# run 별 결과 디렉토리 + 백그라운드 정리
+#
+# 예전에는 시작할 때 results/ 를 shutil.rmtree 로 지웠음
+#   → 파일이 수백만 개면 시작이 몇 분씩 멈추고, 이전 run 결과도 사라짐
+#
+# 지금은
+#   runs/<run_id>/        : run 마다 새 디렉토리 (run_id = 시작 시각(µs) + pid, 이름순 = 시간순)
+#   runs/latest → <run_id> : 가장 최근 run
+#   results → runs/<run_id> : 사람 / 단독 실행한 도구가 보는 경로
+#
+# results 는 모든 run 이 같이 쓰는 링크 → 동시에 다른 run 이 시작하면 중간에 바뀔 수 있음
+#   그래서 run 안의 단계들은 results 를 다시 열지 않고 make_run_dir 이 돌려준 실제 경로를 사용
+#   (같은 프로세스 / 자식 프로세스는 $AUTO_RESULT_DIR 로 전달, current_result_dir())
+#
+# 오래된 run 은 별도 프로세스가 백그라운드에서 삭제 (retention)
+#   --keep-runs N : 최근 N 개만 유지
+#   --keep-gb G   : 전체 크기가 G GB 를 넘으면 오래된 것부터 삭제
+# 삭제할 run 은 먼저 runs/.trash-<id> 로 rename(즉시) 한 뒤 지움
+# 실행 중인 run 은 runs/<run_id>/.running (만든 프로세스의 pid) 이 있으므로 지우지 않음
+#   (프로세스가 끝나면 atexit 으로 지움, 비정상 종료로 남은 marker 는 pid 가 죽었으면 무시)
+#
+# 수동 정리 : python auto_rundir.py prune --keep-runs 5 [--keep-gb 20]
+# 목록      : python auto_rundir.py list
+# ============================================================
+
+import argparse
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+RUNS_DIR    = "runs"
+RESULT_LINK = "results"
+LATEST      = "latest"
+TRASH_PREFIX = ".trash-"
+LEGACY_PREFIX = "legacy-"
+RESULT_DIR_ENV = "AUTO_RESULT_DIR"
+RUNNING_MARKER = ".running"
+MARKER_MAX_AGE_S = 24 * 3600     # pid 를 확인할 수 없는 환경(Windows) 에서 marker 유효 시간
+
+
+def new_run_id():
+    now = time.time()
+    return (time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+            + f".{int(now % 1 * 1e6):06d}-{os.getpid()}")
+
+
+def run_sort_key(name):
+    """run id 순서 (legacy-<id> 는 그 id 위치)"""
+    return name[len(LEGACY_PREFIX):] if name.startswith(LEGACY_PREFIX) else name
+
+
+def current_result_dir():
+    """지금 run 의 실제 결과 디렉토리 (make_run_dir 이 기록, 없으면 results)"""
+    return os.environ.get(RESULT_DIR_ENV) or RESULT_LINK
+
+
+# ------------------------------------------------------------
+# symlink 교체 (임시 링크 → os.replace 로 원자적으로)
+# ------------------------------------------------------------
+def _point(link, target):
+    tmp = f"{link}.tmp-{os.getpid()}"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(target, tmp, target_is_directory=True)
+    os.replace(tmp, link)
+
+
+def _supports_symlink():
+    probe = f".symlink-probe-{os.getpid()}"
+    try:
+        os.symlink(".", probe, target_is_directory=True)
+    except (OSError, NotImplementedError, AttributeError):
+        return False
+    os.remove(probe)
+    return True
+
+
+# ------------------------------------------------------------
+# 실행 중 marker
+# ------------------------------------------------------------
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:     # 다른 사용자의 프로세스 → 살아 있음
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def mark_running(run_path):
+    """run 디렉토리에 .running (pid) 을 쓰고, 이 프로세스가 끝날 때 지움"""
+    marker = os.path.join(run_path, RUNNING_MARKER)
+    with open(marker, "w") as f:
+        f.write(str(os.getpid()))
+
+    def _clear():
+        try:
+            os.remove(marker)
+        except OSError:
+            pass
+    atexit.register(_clear)
+
+
+def is_running(run_path):
+    """marker 가 있고 그 프로세스가 아직 살아 있으면 True"""
+    marker = os.path.join(run_path, RUNNING_MARKER)
+    try:
+        with open(marker) as f:
+            pid = int(f.read().strip() or 0)
+        age = time.time() - os.path.getmtime(marker)
+    except (OSError, ValueError):
+        return False
+    if os.name == "nt":         # os.kill(pid, 0) 이 프로세스를 종료시킴 → marker 나이로 판단
+        return age < MARKER_MAX_AGE_S
+    return pid > 0 and _pid_alive(pid)
+
+
+# ------------------------------------------------------------
+# 새 run 디렉토리 생성 → results 가 가리키게 함
+# ------------------------------------------------------------
+def make_run_dir(keep_runs=10, keep_gb=0, runs_dir=RUNS_DIR, link=RESULT_LINK):
+    os.makedirs(runs_dir, exist_ok=True)
+
+    # 예전 방식의 실제 results/ 디렉토리 → 지우지 않고 runs/ 로 옮김 (rename 은 즉시)
+    if os.path.isdir(link) and not os.path.islink(link):
+        legacy = os.path.join(runs_dir, LEGACY_PREFIX + new_run_id())
+        os.rename(link, legacy)
+        print(f"[+] Moved previous {link}/ → {legacy}")
+
+    run_id = new_run_id()
+    run_path = os.path.join(runs_dir, run_id)
+    os.makedirs(run_path)
+    mark_running(run_path)      # background prune 보다 먼저 (다른 run 의 prune 도 건너뛰도록)
+
+    if _supports_symlink():
+        _point(link, run_path)
+        _point(os.path.join(runs_dir, LATEST), run_id)
+    else:
+        # symlink 를 못 만드는 환경(권한 없는 Windows) : results/ 를 run 디렉토리로 옮겨가며 사용
+        # (이전 results/ 는 위에서 이미 legacy-<id> 로 옮김)
+        shutil.rmtree(run_path)
+        os.makedirs(link)
+        run_path = link
+
+    print(f"[+] Created result directory: {run_path} ({link} → latest run)")
+
+    # 이 run 의 다음 단계 (auto_golden / auto_compare / auto_wave) 가 같은 디렉토리를 쓰도록
+    os.environ[RESULT_DIR_ENV] = run_path
+
+    start_background_prune(keep_runs, keep_gb, runs_dir)
+    return run_path
+
+
+# ------------------------------------------------------------
+# run 목록 / 크기
+# ------------------------------------------------------------
+def list_runs(runs_dir=RUNS_DIR):
+    """오래된 것부터 [(name, path)] (latest 링크 / trash 제외)"""
+    runs = []
+    if not os.path.isdir(runs_dir):
+        return runs
+    for name in os.listdir(runs_dir):
+        path = os.path.join(runs_dir, name)
+        if name == LATEST or name.startswith(TRASH_PREFIX) or os.path.islink(path):
+            continue
+        if os.path.isdir(path):
+            runs.append((name, path))
+    # mtime 은 run 안의 파일이 바뀔 때마다 바뀜 → 시작 순서인 run id 로 정렬
+    runs.sort(key=lambda r: run_sort_key(r[0]))
+    return runs
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.lstat(os.path.join(root, f)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _protected(runs_dir):
+    """latest / results 가 가리키는 run, 아직 실행 중인 run 은 절대 지우지 않음"""
+    keep = set()
+    for link in (os.path.join(runs_dir, LATEST), RESULT_LINK):
+        if os.path.islink(link):
+            keep.add(os.path.realpath(link))
+    for _, path in list_runs(runs_dir):
+        if is_running(path):
+            keep.add(os.path.realpath(path))
+    return keep
+
+
+# ------------------------------------------------------------
+# retention 정책으로 지울 run 선택
+# ------------------------------------------------------------
+def select_expired(runs_dir=RUNS_DIR, keep_runs=10, keep_gb=0):
+    runs = list_runs(runs_dir)
+    protected = _protected(runs_dir)
+    expired = []
+
+    if keep_runs and len(runs) > keep_runs:
+        expired.extend(runs[:len(runs) - keep_runs])
+
+    if keep_gb:
+        limit = keep_gb * (1 << 30)
+        remain = [r for r in runs if r not in expired]
+        sizes = {path: dir_size(path) for _, path in remain}
+        total = sum(sizes.values())
+        for r in remain:
+            if total <= limit:
+                break
+            expired.append(r)
+            total -= sizes[r[1]]
+
+    return [r for r in expired if os.path.realpath(r[1]) not in protected]
+
+
+def prune(runs_dir=RUNS_DIR, keep_runs=10, keep_gb=0):
+    expired = select_expired(runs_dir, keep_runs, keep_gb)
+
+    # 먼저 전부 rename (즉시 목록에서 빠짐) → 그 다음 천천히 삭제
+    trash = []
+    for name, path in expired:
+        dst = os.path.join(runs_dir, TRASH_PREFIX + name)
+        try:
+            os.rename(path, dst)
+            trash.append(dst)
+        except OSError:
+            pass
+
+    # 이전 prune 이 중간에 끊긴 trash 도 같이 정리
+    for name in os.listdir(runs_dir):
+        path = os.path.join(runs_dir, name)
+        if name.startswith(TRASH_PREFIX) and path not in trash:
+            trash.append(path)
+
+    for path in trash:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return [name for name, _ in expired]
+
+
+# ------------------------------------------------------------
+# 백그라운드 정리 프로세스 (현재 run 과 독립적으로 실행 / 종료)
+# ------------------------------------------------------------
+def start_background_prune(keep_runs=10, keep_gb=0, runs_dir=RUNS_DIR):
+    if not keep_runs and not keep_gb:
+        return None
+
+    cmd = [sys.executable, os.path.abspath(__file__), "prune", "--quiet",
+           "--runs-dir", runs_dir, "--keep-runs", str(keep_runs), "--keep-gb", str(keep_gb)]
+
+    kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+              "stdin": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+
+    return subprocess.Popen(cmd, **kwargs)
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="run 디렉토리 목록 / 정리")
+    ap.add_argument("command", choices=["list", "prune"])
+    ap.add_argument("--runs-dir", default=RUNS_DIR)
+    ap.add_argument("--keep-runs", type=int, default=10)
+    ap.add_argument("--keep-gb", type=float, default=0)
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args()
+
+    if args.command == "list":
+        latest = os.path.realpath(os.path.join(args.runs_dir, LATEST))
+        for name, path in list_runs(args.runs_dir):
+            mark = "  ← latest" if os.path.realpath(path) == latest else ""
+            if is_running(path):
+                mark += "  (running)"
+            print(f"{name:32s} {dir_size(path) / (1 << 20):10.1f} MB{mark}")
+        return
+
+    removed = prune(args.runs_dir, args.keep_runs, args.keep_gb)
+    if not args.quiet:
+        print(f"[+] Removed {len(removed)} old run(s)" +
+              (": " + ", ".join(removed) if removed else ""))
+
+
+if __name__ == "__main__":
+    main()
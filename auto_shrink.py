@@ -0,0 +1,306 @@
+# ============================================================
+# 실패 case 최소화 (stimulus cycle 구간 bisection)
+#
+# 1M cycle random case 가 실패하면 auto_compare 는 첫 mismatch 줄만 알려주고
+# 재현 case 는 여전히 1M cycle → 고칠 때마다 몇 분씩 다시 돌려야 함
+#
+# 줄이는 방법
+#   1) 끝 : 실패 cycle c 이후의 입력은 c 의 출력에 영향이 없음 → [0, c] 로 자름
+#   2) 앞 : 입력 hex 의 [s, c] 구간만 잘라 새 case 로 돌려서 여전히 mismatch 가 나는지 확인
+#           → 재현되는 가장 큰 s 를 bisection 으로 찾음
+#           (s 의 상한 = c - latency - reset cycle : golden 모델의 latency 만큼은 있어야 출력이 나옴)
+#           "재현" = 원래와 같은 실패 : 같은 (상대) cycle 에서 같은 포트가 같은 golden / RTL 값으로
+#           (입력을 자르면 reset 직후 등 다른 이유로 실패할 수 있으므로 실패 여부만 보면 안 됨)
+#   (재현 후보는 항상 원래 실패 cycle 에서 끝나므로 끝은 1) 에서 정한 그대로)
+#
+# 한 round 에 후보 --jobs 개를 동시에 시뮬레이션 (구간을 jobs+1 등분한 지점들)
+#   후보마다 자기 디렉토리 + 자기 work library (RTL 은 공용 library 에 한 번만 컴파일)
+#
+# 결과 : results/shrink_case<N>/minimal/
+#   results/  : 잘린 입력 hex, config, TB, golden / RTL CSV, compare 결과 (보통 run 과 같은 구조)
+#   shrink.json : 원래 case 에서의 구간, 실패 cycle, 다시 돌리는 명령
+#
+# 사용 : python auto_shrink.py golden_model.py CASE [--jobs 4] [--result-dir results]
+# ============================================================
+
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from auto_compare import FAIL_LINE_RE, compare_csv, read_csv
+from auto_golden import iter_golden_rows, load_golden_class, open_hex_at
+from auto_index import read_window
+from auto_layout import RESET_CYCLES
+from auto_wave import case_run_info, failing_cycle, load_case_configs, load_run_info
+
+
+def failure_signature(header, golden_row, rtl_row):
+    """실패 행에서 값이 다른 (포트, golden 값, RTL 값) 들"""
+    ports = header.split(",")[1:]
+    golden = golden_row.split(",")[1:]
+    rtl = rtl_row.split(",")[1:]
+    return tuple((p, g, r) for p, g, r in zip(ports, golden, rtl) if g != r)
+
+
+def original_signature(case_id, cycle, result_dir="results"):
+    """원래 case 의 실패 cycle 행 (CSV 가 없으면 None → cycle 만 비교)"""
+    rows = [read_window(os.path.join(result_dir, name), cycle, cycle + 1, "csv")
+            for name in (f"golden_case{case_id}.csv", f"csv_result_case{case_id}.csv")]
+    if any(r is None or len(r) < 2 for r in rows):
+        return None
+    return failure_signature(rows[0][0], rows[0][1], rows[1][1])
+
+
+# ------------------------------------------------------------
+# 후보 하나 : 원래 case 의 [start, stop) 입력으로 만든 작은 case
+# ------------------------------------------------------------
+class Candidate:
+    def __init__(self, shrink_dir, cfg, start, stop, target):
+        self.start = start
+        self.stop = stop
+        self.target = target    # (원래 실패 cycle, failure_signature 또는 None)
+        self.dir = os.path.join(shrink_dir, f"cand-{start}-{stop}")
+        self.result_dir = os.path.join(self.dir, "results")
+        self.case_id = cfg["case_id"]
+
+        # 후보 디렉토리 안에서 보통 run 처럼 보이도록 상대 경로 (results/...)
+        self.cfg = dict(cfg)
+        self.cfg["cycles"] = stop - start
+        self.cfg["hex_files"] = {p: f"results/{p}_case{self.case_id}.hex"
+                                 for p in cfg["input_ports"]}
+        self.cfg["compression"] = "none"
+        self.cfg["store"] = False
+
+        self.ok = None          # compare 결과 (False = 실패)
+        self.error = None
+        self.signature = None   # 후보의 첫 실패 행
+
+    @property
+    def reproduces(self):
+        """원래와 같은 실패 : 같은 cycle 위치에서 같은 포트 / 같은 값"""
+        if self.ok is not False or self.first_fail() is None:
+            return False
+        cycle, signature = self.target
+        if self.start + self.first_fail() != cycle:
+            return False
+        return signature is None or self.signature == signature
+
+    def path(self, name):
+        return os.path.join(self.result_dir, name)
+
+    def first_fail(self):
+        """후보 안에서의 첫 mismatch cycle"""
+        m = FAIL_LINE_RE.search(self.error or "")
+        return int(m.group(1)) - 1 if m else None
+
+    # --------------------------------------------------------------
+    def write_inputs(self, src_cfg):
+        os.makedirs(self.result_dir, exist_ok=True)
+        n = self.stop - self.start
+        for p in src_cfg["input_ports"]:
+            with open_hex_at(src_cfg["hex_files"][p], self.start,
+                             src_cfg["cycles"]) as src, \
+                    open(os.path.join(self.dir, self.cfg["hex_files"][p]), "w") as dst:
+                dst.writelines(islice(src, n))
+
+        with open(self.path(f"config_case{self.case_id}.json"), "w") as f:
+            json.dump(self.cfg, f, indent=4)
+
+    def write_golden(self, golden_class):
+        # golden 은 이 프로세스 안에서 돌리므로 hex 경로를 절대 경로로
+        cfg = dict(self.cfg)
+        cfg["hex_files"] = {p: os.path.join(self.dir, h) for p, h in self.cfg["hex_files"].items()}
+        with open(self.path(f"golden_case{self.case_id}.csv"), "w") as fp:
+            fp.write("cycle," + ",".join(cfg["output_ports"]) + "\n")
+            for rows in iter_golden_rows(golden_class, cfg):
+                fp.write("".join(rows))
+
+    def write_tb(self, info):
+        from auto_vsim import build_tb_case
+
+        ports = [{"dir": p["dir"], "name": p["name"], "full": p["full_decl"]}
+                 for p in self.cfg["ports"]]
+        params = [(k, str(v)) for k, v in self.cfg["params"].items()]
+        tb_text = build_tb_case(info["top"], ports, params, self.case_id, self.cfg["cycles"],
+                                info["clk"], info["reset"])
+        tb_file = f"results/tb_{info['top']}_case{self.case_id}.sv"
+        with open(os.path.join(self.dir, tb_file), "w", encoding="utf-8") as f:
+            f.write(tb_text)
+        return tb_file
+
+    def sim_commands(self, info, tb_file, rtl_lib):
+        return [
+            ["vlib", "work"],
+            ["vlog", "-sv", "-work", "work", tb_file],
+            ["vsim", "-c", "-L", rtl_lib, f"tb_{info['top']}_case{self.case_id}",
+             "-do", "run -all; quit;"],
+        ]
+
+    # --------------------------------------------------------------
+    def run(self, src_cfg, golden_class, info, rtl_lib):
+        from auto_vsim import run_cmd, sim_to_csv
+
+        self.write_inputs(src_cfg)
+        self.write_golden(golden_class)
+        tb_file = self.write_tb(info)
+
+        sim_log = self.path(f"SIMresult_case{self.case_id}.txt")
+        with open(sim_log, "w", encoding="utf-8") as f:
+            f.write(f"==== Simulation Log for case {self.case_id} "
+                    f"(cycles {self.start}..{self.stop - 1}) ====\n")
+        for cmd in self.sim_commands(info, tb_file, rtl_lib):
+            run_cmd(cmd, sim_log, cwd=self.dir)
+
+        rtl_csv = self.path(f"csv_result_case{self.case_id}.csv")
+        sim_to_csv(sim_log, rtl_csv)
+
+        golden_lines = read_csv(self.path(f"golden_case{self.case_id}.csv"))
+        rtl_lines = read_csv(rtl_csv)
+        self.ok, self.error, _ = compare_csv(golden_lines, rtl_lines, self.case_id,
+                                             self.result_dir)
+        row = None if self.first_fail() is None else self.first_fail() + 1
+        if row is not None and row < min(len(golden_lines), len(rtl_lines)):
+            self.signature = failure_signature(golden_lines[0], golden_lines[row],
+                                               rtl_lines[row])
+        return self
+
+
+# ------------------------------------------------------------
+# 후보 여러 개를 동시에 (vsim 이 대부분이므로 thread 로 충분)
+# ------------------------------------------------------------
+def run_candidates(cands, src_cfg, golden_class, info, rtl_lib, jobs):
+    with ThreadPoolExecutor(max(1, jobs)) as pool:
+        list(pool.map(lambda c: c.run(src_cfg, golden_class, info, rtl_lib), cands))
+    for c in cands:
+        if c.reproduces:
+            state = "reproduces"
+        elif c.ok is False:
+            state = f"different failure ({c.error})"
+        else:
+            state = "passes"
+        print(f"[+] cycles {c.start}..{c.stop - 1} ({c.stop - c.start} cycles): {state}")
+    return cands
+
+
+def probe_points(lo, hi, jobs):
+    """(lo, hi] 구간을 jobs+1 등분한 지점들"""
+    n = min(jobs, hi - lo)
+    return sorted({lo + (hi - lo) * (k + 1) // (n + 1) for k in range(n)} - {lo}) or [hi]
+
+
+# ------------------------------------------------------------
+# 최소화
+# ------------------------------------------------------------
+def shrink_case(golden_class, info, cfg, result_dir="results", jobs=1):
+    from auto_vsim import check_modelsim, run_cmd
+
+    info = case_run_info(info, cfg)
+    case_id = cfg["case_id"]
+    cycle = failing_cycle(case_id, result_dir)
+    if cycle is None:
+        print(f"[ERROR] CASE {case_id} has no failing cycle in compare_case{case_id}.txt")
+        return None
+    if cfg.get("stimulus", "file") != "file":
+        print(f"[ERROR] CASE {case_id}: streamed stimulus cannot be replayed")
+        return None
+
+    check_modelsim()
+
+    shrink_dir = os.path.abspath(os.path.join(result_dir, f"shrink_case{case_id}"))
+    if os.path.exists(shrink_dir):
+        shutil.rmtree(shrink_dir)
+    os.makedirs(shrink_dir)
+
+    # RTL 은 공용 library 에 한 번만
+    rtl_lib = os.path.join(shrink_dir, "work")
+    rtl_log = os.path.join(shrink_dir, "vlog_rtl.txt")
+    run_cmd(["vlib", rtl_lib], rtl_log)
+    for vf in info["vfiles"]:
+        run_cmd(["vlog", "-sv", "-work", rtl_lib, os.path.abspath(vf)], rtl_log)
+
+    target = (cycle, original_signature(case_id, cycle, result_dir))
+    if target[1] is None:
+        print(f"[+] CASE {case_id}: CSV rows not available → matching the failing cycle only")
+
+    gm = golden_class(cfg["params"])
+    stop = cycle + 1
+    hi = max(0, cycle - gm.latency - RESET_CYCLES)
+    print(f"\n[+] Shrinking CASE {case_id}: mismatch at cycle {cycle}, "
+          f"latency {gm.latency} → searching start in 0..{hi}")
+
+    def cand(start):
+        return Candidate(shrink_dir, cfg, start, stop, target)
+
+    # 끝만 자른 후보 : 이것도 재현되지 않으면 더 줄일 수 없음 (비결정적 실패 등)
+    best = run_candidates([cand(0)], cfg, golden_class, info, rtl_lib, 1)[0]
+    if not best.reproduces:
+        print(f"[ERROR] CASE {case_id} does not reproduce on cycles 0..{cycle}")
+        return None
+
+    # 재현되는 가장 큰 start : lo 는 재현됨, hi 보다 크면 안 됨
+    lo = 0
+    while lo < hi:
+        cands = run_candidates([cand(s) for s in probe_points(lo, hi, jobs)],
+                               cfg, golden_class, info, rtl_lib, jobs)
+        ok = [c for c in cands if c.reproduces]
+        bad = [c for c in cands if not c.reproduces]
+        if ok:
+            best = max(ok, key=lambda c: c.start)
+            lo = best.start
+        above = [c.start for c in bad if c.start > lo]
+        hi = min(above) - 1 if above else hi
+        for c in cands:
+            if c is not best:
+                shutil.rmtree(c.dir, ignore_errors=True)
+
+    minimal = os.path.join(shrink_dir, "minimal")
+    os.rename(best.dir, minimal)
+    for name in os.listdir(shrink_dir):
+        if name.startswith("cand-"):
+            shutil.rmtree(os.path.join(shrink_dir, name), ignore_errors=True)
+
+    tb_file = f"results/tb_{info['top']}_case{case_id}.sv"
+    summary = {
+        "case_id": case_id,
+        "source_run": os.path.realpath(result_dir),
+        "window": [best.start, best.stop],
+        "cycles": best.stop - best.start,
+        "original_failing_cycle": cycle,
+        "failing_cycle": best.first_fail(),
+        "error": best.error,
+        "rtl_library": rtl_lib,
+        "rerun": [" ".join(cmd) for cmd in best.sim_commands(info, tb_file, rtl_lib)],
+    }
+    with open(os.path.join(minimal, "shrink.json"), "w") as f:
+        json.dump(summary, f, indent=4)
+
+    print(f"\n[+] Minimal reproducer: cycles {best.start}..{best.stop - 1} of CASE {case_id} "
+          f"({best.stop - best.start} of {cfg['cycles']} cycles) → {minimal}")
+    print(f"    {best.error}")
+    return minimal
+
+
+def main():
+    ap = argparse.ArgumentParser(description="shrink a failing case to a minimal stimulus window")
+    ap.add_argument("golden_model")
+    ap.add_argument("case_id", type=int)
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="candidate windows simulated in parallel per bisection round")
+    ap.add_argument("--result-dir", default="results")
+    args = ap.parse_args()
+
+    info = load_run_info(args.result_dir)
+    configs = load_case_configs(args.result_dir, {args.case_id})
+    if info is None or not configs:
+        print(f"[ERROR] CASE {args.case_id} not found in {args.result_dir}")
+        return
+
+    golden_class = load_golden_class(args.golden_model)
+    shrink_case(golden_class, info, configs[0], args.result_dir, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# ============================================================
+# 시뮬레이션 진행 상황 실시간 모니터링
+#
+# TB 가 주기적으로 '[Progress N/TOTAL]' 을 출력하면
+# run_cmd_live() 가 vsim 실행 중에 sim 로그를 tail 하면서
+# case 별 상태 / cycles/sec / ETA 를 StatusBoard 에 반영함
+#
+# StatusBoard 는 results/status.prom 파일(Prometheus text exposition)을
+# 매번 임시파일 → os.replace 로 원자적으로 다시 씀
+#   → 로컬 대시보드 / node_exporter textfile collector 가 그대로 읽을 수 있음
+# ============================================================
+
+import os
+import re
+import subprocess
+import threading
+import time
+
+PROGRESS_RE = re.compile(rb"\[Progress\s+(\d+)/(\d+)\]")
+
+CASE_STATES = ("pending", "compiling", "running", "converting", "done", "failed")
+
+
+class StatusBoard:
+    """case 별 진행 상태를 모아서 status 파일로 내보냄"""
+
+    def __init__(self, path, top=None):
+        self.path = path
+        self.top = top or ""
+        self.jobs = {}      # case_id -> dict
+        self.lock = threading.Lock()    # auto_vsim --jobs : 여러 case 가 동시에 갱신
+
+    # --------------------------------------------------------------
+    def add_case(self, case_id, total_cycles):
+        self.jobs[case_id] = {
+            "state": "pending",
+            "done": 0,
+            "total": total_cycles,
+            "started": None,
+            "first_mark": None,   # (time, cycles) 첫 progress 마커
+            "rate": 0.0,
+            "eta": None,
+        }
+        self.write()
+
+    # --------------------------------------------------------------
+    def set_state(self, case_id, state):
+        job = self.jobs[case_id]
+        job["state"] = state
+        if state == "running" and job["started"] is None:
+            job["started"] = time.time()
+        if state == "done":
+            job["done"] = job["total"]
+            job["eta"] = 0.0
+        self.write()
+
+    # --------------------------------------------------------------
+    def update_progress(self, case_id, done, total=None):
+        job = self.jobs[case_id]
+        now = time.time()
+
+        if total:
+            job["total"] = total
+        job["done"] = done
+
+        # cycles/sec : 첫 마커 이후 구간 평균 (컴파일/로딩 시간 제외)
+        if job["first_mark"] is None:
+            job["first_mark"] = (now, done)
+            if job["started"] and now > job["started"]:
+                job["rate"] = done / (now - job["started"])
+        else:
+            t0, c0 = job["first_mark"]
+            if now > t0:
+                job["rate"] = (done - c0) / (now - t0)
+
+        if job["rate"] > 0:
+            job["eta"] = (job["total"] - done) / job["rate"]
+
+        self.write()
+
+    # --------------------------------------------------------------
+    def render(self):
+        out = []
+
+        def metric(name, kind, help_text, samples):
+            out.append(f"# HELP {name} {help_text}\n")
+            out.append(f"# TYPE {name} {kind}\n")
+            for labels, value in samples:
+                out.append(f"{name}{{{labels}}} {value}\n")
+
+        def lbl(case_id, **extra):
+            text = f'top="{self.top}",case="{case_id}"'
+            for k, v in extra.items():
+                text += f',{k}="{v}"'
+            return text
+
+        items = sorted(self.jobs.items())
+
+        metric("auto_tb_case_state", "gauge",
+               "1 for the current state of each case",
+               [(lbl(cid, state=s), 1 if job["state"] == s else 0)
+                for cid, job in items for s in CASE_STATES])
+        metric("auto_tb_cycles_done", "gauge",
+               "simulated cycles reported by the TB",
+               [(lbl(cid), job["done"]) for cid, job in items])
+        metric("auto_tb_cycles_total", "gauge",
+               "total cycles of the case",
+               [(lbl(cid), job["total"]) for cid, job in items])
+        metric("auto_tb_cycles_per_second", "gauge",
+               "live simulation throughput",
+               [(lbl(cid), f"{job['rate']:.3f}") for cid, job in items])
+        metric("auto_tb_eta_seconds", "gauge",
+               "estimated seconds until the case finishes",
+               [(lbl(cid), f"{job['eta']:.1f}") for cid, job in items
+                if job["eta"] is not None])
+        metric("auto_tb_active_jobs", "gauge",
+               "number of cases currently compiling or running",
+               [(f'top="{self.top}"',
+                 sum(1 for _, j in items
+                     if j["state"] in ("compiling", "running", "converting")))])
+        metric("auto_tb_last_update_timestamp_seconds", "gauge",
+               "unix time of the last status rewrite",
+               [(f'top="{self.top}"', f"{time.time():.3f}")])
+
+        return "".join(out)
+
+    # --------------------------------------------------------------
+    def write(self):
+        # 같은 디렉토리에 임시파일을 쓰고 rename → 읽는 쪽은 항상 완성된 파일만 봄
+        with self.lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, self.path)
+
+
+# ============================================================
+# 실행 중 로그 tail 하면서 명령 실행
+# ============================================================
+def run_cmd_live(cmd, log_path, on_progress=None, poll_interval=0.5):
+    """
+    cmd 의 stdout/stderr 을 log_path 에 append 하면서 실행하고,
+    실행 도중 새로 쓰인 줄에서 '[Progress N/TOTAL]' 을 찾아 on_progress(N, TOTAL) 호출.
+    return: 종료 코드
+    """
+    print("[CMD]", " ".join(cmd))
+
+    with open(log_path, "ab") as log_w, open(log_path, "rb") as log_r:
+        log_r.seek(0, os.SEEK_END)
+        proc = subprocess.Popen(cmd, stdout=log_w, stderr=log_w)
+
+        pending = b""
+
+        def drain():
+            nonlocal pending
+            chunk = log_r.read()
+            if not chunk:
+                return
+            data = pending + chunk
+            lines = data.split(b"\n")
+            pending = lines.pop()    # 아직 줄바꿈이 안 온 마지막 조각
+            if on_progress is None:
+                return
+            for ln in lines:
+                m = PROGRESS_RE.search(ln)
+                if m:
+                    on_progress(int(m.group(1)), int(m.group(2)))
+
+        while proc.poll() is None:
+            time.sleep(poll_interval)
+            drain()
+
+        drain()
+
+    return proc.returncode
@@ -0,0 +1,129 @@
+# ============================================================
+# 결과 파일 저장 계층 (압축 투명 처리)
+#
+# auto_vsim.py --compress gzip|zstd 로 실행하면 config_case JSON 에
+# "compression" 이 기록되고, 각 단계가 이 모듈을 통해 파일을 읽고 씀
+#   - 쓰기 : artifact_path() 로 확장자(.gz / .zst)를 붙이고 open_text() 로 스트리밍 압축
+#   - 읽기 : find_artifact() 가 plain / .gz / .zst 중 있는 파일을 찾고 확장자로 판단
+#
+# 시뮬레이터가 직접 읽는 파일(TB .sv, 입력 hex, self-check 기대값 hex)은
+# 시뮬레이션이 끝날 때까지 plain text 로 두고, 끝난 뒤 compress_file() 로 압축함
+#
+# zstd 는 'zstandard' 패키지가 있을 때만 사용 가능 (gzip 은 표준 라이브러리)
+# ============================================================
+
+import os
+import shutil
+
+COMPRESSION_EXT = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _gzip():
+    import gzip     # 압축을 쓸 때만 import (시작 시간)
+    return gzip
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("[ERROR] zstd compression needs the 'zstandard' package "
+                           "(pip install zstandard) — or use --compress gzip")
+    return zstandard
+
+
+# ------------------------------------------------------------
+# 경로
+# ------------------------------------------------------------
+def artifact_path(path, compression=None):
+    """압축 방식에 맞는 확장자를 붙인 경로"""
+    if not compression or compression == "none":
+        return path
+    if compression not in COMPRESSION_EXT:
+        raise RuntimeError(f"[ERROR] Unknown compression: {compression}")
+    return path + COMPRESSION_EXT[compression]
+
+
+def compression_of(path):
+    for name, ext in COMPRESSION_EXT.items():
+        if ext and path.endswith(ext):
+            return name
+    return "none"
+
+
+def find_artifact(path):
+    """path 자체 또는 압축된 형태(.gz / .zst) 중 존재하는 파일 경로. 없으면 path"""
+    if os.path.exists(path):
+        return path
+    for ext in COMPRESSION_EXT.values():
+        if ext and os.path.exists(path + ext):
+            return path + ext
+    return path
+
+
+# ------------------------------------------------------------
+# 열기 (확장자로 압축 여부 판단)
+# ------------------------------------------------------------
+def open_text(path, mode="r", encoding="utf-8", errors=None):
+    kind = compression_of(path)
+
+    if kind == "gzip":
+        if "w" in mode or "a" in mode:
+            return _gzip().open(path, mode + "t", compresslevel=GZIP_LEVEL,
+                             encoding=encoding, errors=errors)
+        return _gzip().open(path, mode + "t", encoding=encoding, errors=errors)
+
+    if kind == "zstd":
+        zstandard = _zstd()
+        if "w" in mode or "a" in mode:
+            return zstandard.open(path, mode + "t",
+                                  cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL),
+                                  encoding=encoding, errors=errors)
+        return zstandard.open(path, mode + "t", encoding=encoding, errors=errors)
+
+    return open(path, mode, encoding=encoding, errors=errors, buffering=1 << 20)
+
+
+# ------------------------------------------------------------
+# 다 쓴 plain 파일 압축 (원본 삭제)
+# ------------------------------------------------------------
+def compress_file(path, compression):
+    if not compression or compression == "none" or not os.path.isfile(path):
+        return path
+
+    dst = artifact_path(path, compression)
+    if compression == "gzip":
+        with open(path, "rb") as src, _gzip().open(dst, "wb", compresslevel=GZIP_LEVEL) as out:
+            shutil.copyfileobj(src, out, 1 << 20)
+    else:
+        zstandard = _zstd()
+        with open(path, "rb") as src, open(dst, "wb") as out:
+            zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, out)
+
+    os.remove(path)
+    # plain 파일 기준 cycle index (.idx) 는 더 이상 맞지 않음
+    if os.path.exists(path + ".idx"):
+        os.remove(path + ".idx")
+    return dst
+
+
+# ------------------------------------------------------------
+# 압축된 파일을 plain 으로 되살리기 (시뮬레이터가 다시 읽어야 할 때)
+#   return: 새로 만들었으면 True (호출한 쪽이 끝나고 지움)
+# ------------------------------------------------------------
+def restore_plain(path):
+    if os.path.exists(path):
+        return False
+    src = find_artifact(path)
+    if src == path:
+        raise RuntimeError(f"[ERROR] File not found: {path}")
+    with open_text(src, "r") as f, open(path, "w", encoding="utf-8") as out:
+        shutil.copyfileobj(f, out, 1 << 20)
+    return True
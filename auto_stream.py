@@ -0,0 +1,171 @@
+# ============================================================
+# 디스크를 쓰지 않는 stimulus 공급 (named pipe)
+#
+# auto_vsim.py --cosim golden.py --stream-stimulus file1.v ... 로 실행하면
+# results/<port>_case<N>.hex 를 일반 파일 대신 FIFO 로 만들고,
+# 별도 생성기 프로세스가 랜덤 값을 만들어서
+#   - TB 용 FIFO           : results/<port>_case<N>.hex        (TB 는 그대로 $fgets)
+#   - golden 용 tee FIFO    : results/<port>_case<N>.golden.hex (auto_golden 이 그대로 읽음)
+# 두 곳에 같은 값을 흘려보냄 → 중간 hex 파일 없음, 생성이 끝나기 전에 시뮬 시작 가능
+#
+# TB 는 포트들을 한 줄씩 번갈아 읽고 golden 은 포트별로 WRITE_BATCH 줄씩 읽으므로
+# 생성기는 non-blocking write + 포트별 버퍼로 소비 속도 차이를 흡수함
+# (버퍼가 PENDING_LIMIT 줄을 넘으면 생성을 멈춤 → 메모리 상한 고정)
+#
+# named pipe(os.mkfifo)가 필요하므로 Linux/macOS 전용
+# ============================================================
+
+import errno
+import multiprocessing
+import os
+import random
+import select
+
+from auto_golden import WRITE_BATCH
+from auto_cosim import make_fifo
+
+STREAM_CHUNK  = 256                 # 한 번에 생성하는 cycle 수
+PENDING_LIMIT = 4 * WRITE_BATCH     # FIFO 별 최대 대기 줄 수
+
+
+# ------------------------------------------------------------
+# 경로
+# ------------------------------------------------------------
+def tb_stream_path(result_dir, port, case_id):
+    return os.path.join(result_dir, f"{port}_case{case_id}.hex")
+
+
+def tee_stream_path(result_dir, port, case_id):
+    return os.path.join(result_dir, f"{port}_case{case_id}.golden.hex")
+
+
+# ------------------------------------------------------------
+# case 하나의 FIFO 생성
+#   port_widths : [(port_name, width), ...]
+#   return      : golden 쪽 hex_files dict (config JSON 에 기록)
+# ------------------------------------------------------------
+def prepare_stream_fifos(port_widths, case_id, result_dir):
+    hex_files = {}
+    for name, _ in port_widths:
+        make_fifo(tb_stream_path(result_dir, name, case_id))
+        hex_files[name] = make_fifo(tee_stream_path(result_dir, name, case_id))
+        print(f"[+] Stimulus FIFO: {name} (case {case_id})")
+    return hex_files
+
+
+def remove_stream_fifos(port_widths, case_id, result_dir):
+    for name, _ in port_widths:
+        for path in (tb_stream_path(result_dir, name, case_id),
+                     tee_stream_path(result_dir, name, case_id)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ------------------------------------------------------------
+# 생성기 프로세스 본체
+# ------------------------------------------------------------
+class _Sink:
+    """FIFO 하나 (아직 reader 가 없으면 fd=None)"""
+
+    def __init__(self, path, line_bytes):
+        self.path = path
+        self.fd = None
+        self.buf = bytearray()
+        self.limit = PENDING_LIMIT * line_bytes
+        self.dead = False
+
+    def try_open(self):
+        # reader 가 없으면 ENXIO → 다음 loop 에서 다시 시도
+        try:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                raise
+
+
+def stream_stimulus(port_widths, case_id, cycles, result_dir, seed=None, tee=True,
+                    constraints=None, params=None):
+    from auto_constraints import hex_lines, port_generators
+
+    rnd = random.Random(seed)
+    gens = port_generators(port_widths, params or {}, rnd, constraints)
+
+    specs = []      # (width, hex_digits, [sinks])
+    sinks = []
+    for (name, width), gen in zip(port_widths, gens):
+        hex_digits = (width + 3) // 4
+        port_sinks = [_Sink(tb_stream_path(result_dir, name, case_id), hex_digits + 1)]
+        if tee:
+            port_sinks.append(_Sink(tee_stream_path(result_dir, name, case_id), hex_digits + 1))
+        specs.append((gen, hex_digits, port_sinks))
+        sinks.extend(port_sinks)
+
+    generated = 0
+    while True:
+        live = [s for s in sinks if not s.dead]
+
+        # ---- 버퍼가 모두 여유 있을 때만 다음 chunk 생성 ----
+        while generated < cycles and all(len(s.buf) < s.limit for s in live):
+            n = min(STREAM_CHUNK, cycles - generated)
+            for gen, hex_digits, port_sinks in specs:
+                data = hex_lines(gen.take(n), hex_digits).encode("ascii")
+                for s in port_sinks:
+                    if not s.dead:
+                        s.buf += data
+            generated += n
+
+        if generated >= cycles and not any(s.buf for s in live):
+            break
+        if not live:
+            break
+
+        # ---- reader 가 생긴 FIFO 열기 ----
+        for s in live:
+            if s.fd is None:
+                s.try_open()
+
+        # ---- 쓸 수 있는 FIFO 에 가능한 만큼 쓰기 ----
+        waiting = [s for s in live if s.fd is not None and s.buf]
+        if not waiting:
+            select.select([], [], [], 0.05)
+            continue
+
+        _, writable, _ = select.select([], [s.fd for s in waiting], [], 0.05)
+        for s in waiting:
+            if s.fd not in writable:
+                continue
+            try:
+                written = os.write(s.fd, s.buf[:1 << 16])
+                del s.buf[:written]
+            except BlockingIOError:
+                pass
+            except BrokenPipeError:
+                # 소비자가 먼저 닫음 (예: cosim mismatch 로 vsim 종료)
+                s.dead = True
+                s.buf = bytearray()
+
+    for s in sinks:
+        if s.fd is not None:
+            os.close(s.fd)
+
+
+# ------------------------------------------------------------
+# 생성기 프로세스 시작 / 종료
+# ------------------------------------------------------------
+def start_stimulus_stream(port_widths, case_id, cycles, result_dir, seed=None, tee=True,
+                          constraints=None, params=None):
+    proc = multiprocessing.Process(
+        target=stream_stimulus,
+        args=(port_widths, case_id, cycles, result_dir, seed, tee, constraints, params),
+        daemon=True,
+    )
+    proc.start()
+    print(f"[+] Stimulus generator started (case {case_id}, pid {proc.pid})")
+    return proc
+
+
+def stop_stimulus_stream(proc, timeout=5):
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
@@ -5,8 +5,37 @@
 # 예시)  python auto_compare.py golden_model.py file1.v file2.v ... -> 이런식으로 실행하면
 # hw모델과 sw모델을 반복실행하여 결과 비교함
 
-import subprocess
+import argparse
+import importlib
 import sys
+import traceback
+
+from auto_golden_worker import submit
+
+
+# ------------------------------------------------------------
+# 각 단계를 같은 프로세스에서 실행 (python auto_X.py args 와 같은 동작)
+#   예전에는 단계마다 interpreter 를 새로 띄움 → 시작 + 공용 모듈 import 가 단계 수만큼 반복
+#   종료코드 : sys.exit 값, 예외면 traceback 출력 후 1
+# ------------------------------------------------------------
+def run_stage(module_name, args):
+    old_argv = sys.argv
+    sys.argv = [module_name + ".py"] + list(args)
+    try:
+        importlib.import_module(module_name).main()
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = old_argv
+        sys.stdout.flush()
+
 
 if len(sys.argv) < 2:
     print("Usage: python auto_vsim.py golden_model.py file1.v file2.v ...")
@@ -21,21 +50,58 @@ else:
     sys.exit(1)
 
 
+# ------------------------------------------------------------
+# golden 모델은 하나 → --spec 의 run 들이 서로 다른 TOP 이면 비교할 수 없음
+# ------------------------------------------------------------
+def spec_tops(args):
+    """auto_vsim 인자의 --spec / --top 으로 정해지는 TOP 이름들 (정하지 않은 run 은 제외)"""
+    from auto_vsim import load_run_spec, spec_runs
+
+    ap = argparse.ArgumentParser(add_help=False)
+    ap.add_argument("--spec")
+    ap.add_argument("--top")
+    known, _ = ap.parse_known_args(args)
+    if not known.spec:
+        return []
+    runs = spec_runs(load_run_spec(known.spec), {"top": known.top})
+    return list(dict.fromkeys(run["top"] for run in runs if run.get("top")))
+
+
+try:
+    tops = spec_tops(vfiles)
+except (OSError, ValueError, RuntimeError) as e:
+    print(e if str(e).startswith("[ERROR]") else f"[ERROR] {e}")
+    sys.exit(1)
+if len(tops) > 1:
+    print(f"[ERROR] run spec has several TOPs ({', '.join(tops)}) but only one golden model "
+          f"({golden_file}); run auto_vsim / auto_golden per TOP instead")
+    sys.exit(1)
+
+
 # 첫 번째 프로그램
 print("auto_vsim 실행 중...")
-r1 = subprocess.run(["python", "auto_vsim.py"]+vfiles)
-print("auto_vsim 종료코드:", r1.returncode)
+rc1 = run_stage("auto_vsim", vfiles)
+print("auto_vsim 종료코드:", rc1)
 
-# 두 번째 프로그램
+# 두 번째 프로그램 (golden worker 가 떠 있으면 worker 에서, 없으면 이 프로세스에서)
 print("auto_golden 실행 중...")
-r2 = subprocess.run(["python", "auto_golden.py"]+[golden_file])
-print("auto_golden 종료코드:", r2.returncode)
+rc2 = submit(golden_file)
+if rc2 is None:
+    rc2 = run_stage("auto_golden", [golden_file])
+else:
+    print("(golden worker 사용)")
+print("auto_golden 종료코드:", rc2)
 
 # 둘 다 정상 종료 시
-if r1.returncode == 0 and r2.returncode == 0:
+if rc1 == 0 and rc2 == 0:
     print("두 프로그램 모두 성공적으로 종료됨 → auto_compare 실행")
     print("auto_golden 실행 중...")
-    r3 = subprocess.run(["python", "auto_compare.py"])
-    print("auto_golden 종료코드:", r3.returncode)
+    rc3 = run_stage("auto_compare", [])
+    print("auto_golden 종료코드:", rc3)
+
+    # 실패한 case 가 있으면 실패 cycle 주변만 waveform 재시뮬레이션
+    print("auto_wave 실행 중...")
+    rc4 = run_stage("auto_wave", [])
+    print("auto_wave 종료코드:", rc4)
 else:
     print("오류 존재")
\ No newline at end of file
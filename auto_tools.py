@@ -0,0 +1,95 @@
+# ============================================================
+# 외부 tool (vsim / vlog ...) 위치 찾기 + 결과 캐시
+#
+# 예전 check_modelsim 은 실행할 때마다 which / where 를 tool 수만큼 subprocess 로 실행
+#   → 작은 case 를 수천 번 돌리는 CI 에서는 이것만으로도 시작 시간의 상당 부분
+#
+# 지금은 shutil.which (프로세스 생성 없음) 결과를 캐시 파일에 저장
+#   캐시 파일 : $AUTO_TOOLS_CACHE 또는 ~/.cache/auto_tb/tools.json
+#   무효화   : PATH 문자열이 바뀌었거나, PATH 디렉토리 중 하나의 mtime 이 바뀌었을 때
+#              (디렉토리에 파일이 추가 / 삭제 / rename 되면 mtime 이 바뀜 → 설치 / 제거 감지)
+#              찾았던 파일이 사라진 경우도 다시 찾음
+# ============================================================
+
+import json
+import os
+
+CACHE_ENV = "AUTO_TOOLS_CACHE"
+CACHE_VERSION = 1
+
+
+def cache_path():
+    if os.environ.get(CACHE_ENV):
+        return os.environ[CACHE_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "auto_tb", "tools.json")
+
+
+def _path_state():
+    """현재 PATH 와 PATH 디렉토리별 mtime (없는 디렉토리는 None)"""
+    path_env = os.environ.get("PATH", "")
+    dirs = {}
+    for d in path_env.split(os.pathsep):
+        if d and d not in dirs:
+            try:
+                dirs[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                dirs[d] = None
+    return path_env, dirs
+
+
+def _load_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(path, data):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp, path)
+    except OSError:
+        pass        # 캐시는 없어도 동작 (읽기 전용 home 등)
+
+
+def find_tools(names, use_cache=True):
+    """{tool 이름: 절대 경로 또는 None}"""
+    path_env, dirs = _path_state()
+    cache_file = cache_path()
+
+    cache = _load_cache(cache_file) if use_cache else {}
+    tools = {}
+    if cache.get("path") == path_env and cache.get("dirs") == dirs:
+        tools = cache.get("tools", {})
+
+    found = {}
+    missing = []
+    for name in names:
+        hit = tools.get(name, False)
+        if hit is False or (hit is not None and not os.path.exists(hit)):
+            missing.append(name)
+        else:
+            found[name] = hit
+
+    if missing:
+        import shutil
+
+        for name in missing:
+            found[name] = tools[name] = shutil.which(name)
+        if use_cache:
+            _save_cache(cache_file, {"version": CACHE_VERSION, "path": path_env,
+                                     "dirs": dirs, "tools": tools})
+    return found
+
+
+def clear_cache():
+    try:
+        os.remove(cache_path())
+    except OSError:
+        pass
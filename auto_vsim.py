@@ -13,58 +13,43 @@
 # 결과는 results/ 폴더 안에    골든모델 결과 ,TB 파일, hex파일, 시뮬 로그가 저장
 # ============================================================
 
-import shutil
-import importlib.util
+# 시작 시간을 줄이기 위해 여기서는 가벼운 모듈만 import
+#   (random / hashlib / math 는 쓰는 함수 안에서, tool 탐색은 auto_tools 캐시로)
 import re
 import subprocess
 import sys
 import os
-import platform
-import random
-import math
 import json
+import argparse
+import time
+
+from auto_profile import Profiler
+from auto_status import StatusBoard, run_cmd_live
+from auto_storage import artifact_path, compress_file, find_artifact, open_text
+from auto_rundir import make_run_dir
+from auto_index import CycleIndex, build_index, text_bytes
 
 
 # ============================================================
 # Make result directory
 # ============================================================
-def make_result_dir():
-    result_dir = "results"
-
-    # 디렉토리가 이미 존재하면 삭제
-    if os.path.exists(result_dir):
-        shutil.rmtree(result_dir)
-        print(f"[+] Removed existing directory: {result_dir}")
-
-    # 새로 생성
-    os.makedirs(result_dir)
-    print(f"[+] Created result directory: {result_dir}")
-
-    return result_dir
+def make_result_dir(keep_runs=10, keep_gb=0):
+    # run 마다 runs/<run_id>/ 를 새로 만들고 results 가 그곳을 가리키게 함
+    # 이전 run 은 지우지 않고, retention 을 넘은 run 만 백그라운드에서 삭제
+    return make_run_dir(keep_runs, keep_gb)
 
 
 # ============================================================
 # Check ModelSim PATH
 # ============================================================
 def check_modelsim():
-    system = platform.system().lower()
-
-    def exists(cmd, checker):
-        try:
-            subprocess.check_output([checker, cmd], stderr=subprocess.STDOUT)
-            return True
-        except subprocess.CalledError:
-            return False
-
-    if "windows" in system:
-        vsim_ok = exists("vsim", "where")
-        vlog_ok = exists("vlog", "where")
-    else:
-        vsim_ok = exists("vsim", "which")
-        vlog_ok = exists("vlog", "which")
+    # which / where 를 subprocess 로 돌리지 않고 shutil.which 결과를 캐시 (auto_tools)
+    from auto_tools import find_tools
 
-    if not vsim_ok or not vlog_ok:
-        print("[ERROR] ModelSim vsim/vlog not found in PATH.")
+    tools = find_tools(["vsim", "vlog"])
+    missing = [name for name, path in tools.items() if path is None]
+    if missing:
+        print(f"[ERROR] ModelSim {'/'.join(missing)} not found in PATH.")
         sys.exit(1)
 
     print("[+] ModelSim PATH OK.\n")
@@ -237,13 +222,18 @@ def parse_ports(vfile, module_name):
 # ============================================================
 # Generate SystemVerilog TB to text
 # ============================================================
-def generate_tb_header(top, ports, params, case_id):
+def tb_module_name(top, case_id, suffix=""):
+    """TB module 이름 (suffix : wave 재시뮬레이션처럼 work 의 원래 TB 를 덮으면 안 되는 변형)"""
+    return f"tb_{top}_case{case_id}{suffix}"
+
+
+def generate_tb_header(top, ports, params, case_id, suffix=""):
 
     tb = []
 
     # 1) Timescale + Module
     tb.append("`timescale 1ns / 1ps\n\n")
-    tb.append(f"module tb_{top}_case{case_id};\n\n\n")
+    tb.append(f"module {tb_module_name(top, case_id, suffix)};\n\n\n")
 
     # 2) Parameter block
     if params:
@@ -316,12 +306,25 @@ def generate_tb_header(top, ports, params, case_id):
 # gen one TB stimulus case
 # ============================================================
 
-def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
+# cosim stream : 이 cycle 수마다 fd_stream 을 flush (첫 mismatch 에서 빨리 멈추도록)
+STREAM_FLUSH_EVERY = 64
+
+
+def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name, progress_every=0,
+                      stream_path=None, expect_files=None, log_changes=False, dump_window=None,
+                      hex_dir="results"):
 
     input_ports  = [p["name"] for p in ports 
                     if p["dir"] == "input" and p["name"] not in (clk_name, reset_name)]
     output_ports = [p["name"] for p in ports if p["dir"] == "output"]
 
+    # value-change 로그는 transcript 출력 모드에서만 의미 있음
+    log_changes = log_changes and not (stream_path or expect_files)
+
+    # waveform 재시뮬레이션 : [dump_start, dump_stop] cycle 만 VCD 에 기록하고 그 뒤에 종료
+    if dump_window:
+        dump_start, dump_stop, vcd_path = dump_window
+
     stim = []
 
     # ===========================================
@@ -332,7 +335,38 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
     stim.append("    integer fd_count = 0;\n")
     stim.append("    string fn;\n")
     stim.append("    string line;\n")
-    stim.append("    integer cycle;\n\n")
+    stim.append("    integer cycle;\n")
+    if stream_path:
+        stim.append("    integer fd_stream;\n")
+    if log_changes:
+        # 직전 cycle 에 출력한 값 (값이 바뀔 때만 출력)
+        for p in output_ports:
+            stim.append(f"    logic [$bits({p})-1:0] prev_{p};\n")
+    if expect_files:
+        stim.append(f"    integer fd_exp[{len(output_ports)}];\n")
+        stim.append("    string exp_str;\n")
+        stim.append("    string act_str;\n")
+        stim.append("    integer zx_count = 0;\n")
+    stim.append("\n")
+
+    # ===========================================
+    # SELF-CHECK : compare_csv 와 같은 0↔x 허용 비교
+    #   return 0 = mismatch, 1 = 같음, 2 = 0↔x 치환으로 같음
+    # ===========================================
+    if expect_files:
+        stim.append("    function automatic int match_0x(string e, string a);\n")
+        stim.append("        int zx = 0;\n")
+        stim.append("        if (e.len() != a.len()) return 0;\n")
+        stim.append("        for (int i = 0; i < e.len(); i++) begin\n")
+        stim.append("            if (e[i] == a[i]) continue;\n")
+        stim.append("            if ((e[i] == \"0\" && a[i] == \"x\") || (e[i] == \"x\" && a[i] == \"0\")) begin\n")
+        stim.append("                zx = 1;\n")
+        stim.append("                continue;\n")
+        stim.append("            end\n")
+        stim.append("            return 0;\n")
+        stim.append("        end\n")
+        stim.append("        return zx ? 2 : 1;\n")
+        stim.append("    endfunction\n\n")
 
     # ===========================================
     # CLOCK
@@ -353,11 +387,21 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
     stim.append("    // ===============================================\n\n")
 
     stim.append("    initial begin\n")
-    stim.append(f"        $display(\"==== START CASE {case_id} ====\");\n\n")
+    stim.append(f"        $display(\"==== START CASE {case_id} ====\");\n")
+    if dump_window:
+        # 시작하자마자 dump 를 꺼두고 창 안에서만 $dumpon
+        stim.append(f"        $dumpfile(\"{vcd_path}\");\n")
+        stim.append("        $dumpvars(0, uut);\n")
+        stim.append("        $dumpoff;\n")
+    if log_changes:
+        # sim_to_csv 가 이 표시를 보고 value-change 로그로 해석함
+        stim.append("        $display(\"[ValueChangeLog]\");\n")
+    stim.append("\n")
 
     # RESET
+    from auto_layout import RESET_CYCLES
     stim.append(f"        {reset_name} = 0;\n")
-    stim.append(f"        repeat (3) @(posedge {clk_name});\n")
+    stim.append(f"        repeat ({RESET_CYCLES}) @(posedge {clk_name});\n")
     stim.append(f"        {reset_name} = 1;\n")
     stim.append(f"        @(posedge {clk_name});\n\n")
 
@@ -365,8 +409,9 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
     stim.append("        // ---- OPEN ALL INPUT HEX FILES ----\n")
     stim.append("        fd_count = 0;\n")
 
+    hex_dir = hex_dir.replace(os.sep, "/")      # verilog 문자열 안이므로 '\' 대신 '/'
     for p in input_ports:
-        stim.append(f"        fn = \"results/{p}_case{case_id}.hex\";\n")
+        stim.append(f"        fn = \"{hex_dir}/{p}_case{case_id}.hex\";\n")
         stim.append(f"        fd[fd_count] = $fopen(fn, \"r\");\n")
         stim.append("        if (fd[fd_count] == 0) begin\n")
         stim.append("            $display(\"ERROR: cannot open %s\", fn);\n")
@@ -374,10 +419,41 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
         stim.append("        end\n")
         stim.append("        fd_count = fd_count + 1;\n\n")
 
+    # SELF-CHECK : golden 기대값 파일 열기 (출력 포트별 hex 한 줄 / cycle)
+    if expect_files:
+        stim.append("        // ---- OPEN GOLDEN EXPECTATION FILES (self-check) ----\n")
+        for k, p in enumerate(output_ports):
+            stim.append(f"        fd_exp[{k}] = $fopen(\"{expect_files[p]}\", \"r\");\n")
+            stim.append(f"        if (fd_exp[{k}] == 0) begin\n")
+            stim.append(f"            $display(\"ERROR: cannot open {expect_files[p]}\");\n")
+            stim.append("            $finish;\n")
+            stim.append("        end\n")
+        stim.append("\n")
+
+    # COSIM : 출력 스트림(FIFO) 열기 → auto_cosim 이 반대편에서 읽음
+    if stream_path:
+        stim.append("        // ---- OPEN OUTPUT STREAM (cosim) ----\n")
+        stim.append(f"        fd_stream = $fopen(\"{stream_path}\", \"w\");\n")
+        stim.append("        if (fd_stream == 0) begin\n")
+        stim.append(f"            $display(\"ERROR: cannot open {stream_path}\");\n")
+        stim.append("            $finish;\n")
+        stim.append("        end\n\n")
+
     # LOOP
     stim.append(f"        for (cycle = 0; cycle < {cycles}; cycle++) begin\n")
     stim.append(f"            @(posedge {clk_name});\n\n")
 
+    # WAVEFORM WINDOW
+    if dump_window:
+        stim.append("            // ---- Waveform window ----\n")
+        stim.append(f"            if (cycle == {dump_start}) $dumpon;\n")
+        stim.append(f"            if (cycle > {dump_stop}) begin\n")
+        stim.append("                $dumpoff;\n")
+        stim.append("                $dumpflush;\n")
+        stim.append(f"                $display(\"[WaveWindow {dump_start}..{dump_stop}] done\");\n")
+        stim.append("                $finish;\n")
+        stim.append("            end\n\n")
+
     # READ INPUTS
     stim.append("            // ---- Read one value per input port ----\n")
     for idx, p in enumerate(input_ports):
@@ -386,18 +462,80 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
         stim.append("            end\n\n")
 
     # PRINT OUTPUTS
-    stim.append("            // ---- Display outputs ----\n")
-    stim.append("            $display(\"[Cycle %0d]\", cycle);\n")
-    for p in output_ports:
-        stim.append(f"            $display(\"   {p} = %h\", {p});\n")
+    if stream_path:
+        # cosim : transcript 대신 'cycle,out1,out2...' 한 줄을 스트림으로
+        stim.append("            // ---- Stream outputs (cosim) ----\n")
+        stim.append("            $fwrite(fd_stream, \"%0d\", cycle);\n")
+        for p in output_ports:
+            stim.append(f"            $fwrite(fd_stream, \",%h\", {p});\n")
+        stim.append("            $fwrite(fd_stream, \"\\n\");\n")
+        # progress marker 의 $fflush 에만 맡기면 mismatch 감지가 progress_every cycle 만큼 늦음
+        stim.append(f"            if ((cycle + 1) % {STREAM_FLUSH_EVERY} == 0) $fflush(fd_stream);\n")
+    elif expect_files:
+        # self-check : 매 cycle 시뮬레이터 안에서 바로 비교, 첫 mismatch 에서 $fatal
+        stim.append("            // ---- Check outputs against golden (self-check) ----\n")
+        for k, p in enumerate(output_ports):
+            stim.append(f"            if ($fgets(line, fd_exp[{k}])) $sscanf(line, \"%s\", exp_str);\n")
+            stim.append("            else exp_str = \"<eof>\";\n")
+            stim.append(f"            act_str = $sformatf(\"%h\", {p});\n")
+            stim.append("            case (match_0x(exp_str, act_str))\n")
+            stim.append(f"                0: $fatal(1, \"[SELFCHECK MISMATCH] cycle=%0d port={p} expected=%s actual=%s\",\n")
+            stim.append("                          cycle, exp_str, act_str);\n")
+            stim.append("                2: begin\n")
+            stim.append("                    zx_count++;\n")
+            stim.append(f"                    $display(\"[SELFCHECK ZX] cycle=%0d port={p} expected=%s actual=%s\",\n")
+            stim.append("                             cycle, exp_str, act_str);\n")
+            stim.append("                end\n")
+            stim.append("            endcase\n")
+    elif log_changes:
+        # 값이 바뀐 포트만 출력 (cycle 0 은 전부 출력)
+        changed = " || ".join([f"{p} !== prev_{p}" for p in output_ports]) or "0"
+        stim.append("            // ---- Display changed outputs only ----\n")
+        stim.append(f"            if (cycle == 0 || {changed}) begin\n")
+        stim.append("                $display(\"[Cycle %0d]\", cycle);\n")
+        for p in output_ports:
+            stim.append(f"                if (cycle == 0 || {p} !== prev_{p}) $display(\"   {p} = %h\", {p});\n")
+            stim.append(f"                prev_{p} = {p};\n")
+        stim.append("            end\n")
+    elif dump_window:
+        # 재시뮬레이션 : 창 안의 cycle 만 출력
+        stim.append("            // ---- Display outputs (waveform window only) ----\n")
+        stim.append(f"            if (cycle >= {dump_start}) begin\n")
+        stim.append("                $display(\"[Cycle %0d]\", cycle);\n")
+        for p in output_ports:
+            stim.append(f"                $display(\"   {p} = %h\", {p});\n")
+        stim.append("            end\n")
+    else:
+        stim.append("            // ---- Display outputs ----\n")
+        stim.append("            $display(\"[Cycle %0d]\", cycle);\n")
+        for p in output_ports:
+            stim.append(f"            $display(\"   {p} = %h\", {p});\n")
+
+    # PROGRESS MARKER (run_cmd_live 가 실행 중에 읽음)
+    if progress_every > 0:
+        stim.append(f"\n            if ((cycle + 1) % {progress_every} == 0 || cycle + 1 == {cycles}) begin\n")
+        stim.append(f"                $display(\"[Progress %0d/%0d]\", cycle + 1, {cycles});\n")
+        stim.append("                $fflush();\n")
+        stim.append("            end\n")
 
     stim.append("        end\n\n")
 
+    if log_changes:
+        # 마지막 변화 이후 몇 cycle 이 더 있었는지 알려줌
+        stim.append(f"        $display(\"[End %0d]\", {cycles});\n\n")
+
     # CLOSE FILES
     stim.append("        // ---- Close files ----\n")
     stim.append("        for (int i = 0; i < fd_count; i++) begin\n")
     stim.append("            $fclose(fd[i]);\n")
-    stim.append("        end\n\n")
+    stim.append("        end\n")
+    if stream_path:
+        stim.append("        $fclose(fd_stream);\n")
+    if expect_files:
+        for k in range(len(output_ports)):
+            stim.append(f"        $fclose(fd_exp[{k}]);\n")
+        stim.append(f"        $display(\"[SELFCHECK PASS] cycles=%0d zero_x=%0d\", {cycles}, zx_count);\n")
+    stim.append("\n")
 
     stim.append("        $finish;\n")
     stim.append("    end\n")
@@ -411,12 +549,15 @@ def generate_stimulus(case_id, ports, params, cycles, clk_name, reset_name):
 # ============================================================
 # build one whole tb case
 # ============================================================
-def build_tb_case(top, ports, params, case_id,cycles,clk_name,reset_name):
+def build_tb_case(top, ports, params, case_id,cycles,clk_name,reset_name,progress_every=0,
+                  stream_path=None, expect_files=None, log_changes=False, dump_window=None,
+                  hex_dir="results", suffix=""):
 
-    header = generate_tb_header(top, ports, params, case_id)
+    header = generate_tb_header(top, ports, params, case_id, suffix)
     header = header.replace("{CASE_ID}", str(case_id))
     
-    stim = generate_stimulus(case_id, ports, params,cycles,clk_name,reset_name)
+    stim = generate_stimulus(case_id, ports, params,cycles,clk_name,reset_name,progress_every,
+                             stream_path, expect_files, log_changes, dump_window, hex_dir)
 
     return header + stim
 
@@ -425,9 +566,9 @@ def build_tb_case(top, ports, params, case_id,cycles,clk_name,reset_name):
 # save SystemVerilog TB case into result directory
 # ============================================================
 
-def save_tb_case(top, tb_text, case_id):
-    os.makedirs("results", exist_ok=True)
-    path = f"results/tb_{top}_case{case_id}.sv"
+def save_tb_case(top, tb_text, case_id, result_dir="results"):
+    os.makedirs(result_dir, exist_ok=True)
+    path = os.path.join(result_dir, f"tb_{top}_case{case_id}.sv")
     with open(path, "w", encoding="utf-8") as f:
         f.write(tb_text)
     print("[+] Saved", path)
@@ -438,23 +579,16 @@ def save_tb_case(top, tb_text, case_id):
 # ============================================================
 # Run command
 # ============================================================
-def run_cmd(cmd, log_path=None):
+def run_cmd(cmd, log_path=None, cwd=None):
     print("[CMD]", " ".join(cmd))
     if log_path:
         with open(log_path, "a", encoding="utf-8", errors="ignore") as f:
-            subprocess.run(cmd, stdout=f, stderr=f)
-    else:
-        subprocess.run(cmd)
+            return subprocess.run(cmd, stdout=f, stderr=f, cwd=cwd).returncode
+    return subprocess.run(cmd, cwd=cwd).returncode
 
 
 
 
-# -----------------------------
-# clog2 지원
-# -----------------------------
-def clog2(x):
-    return math.ceil(math.log2(x))
-
 # -----------------------------
 # 포트 폭 계산
 # -----------------------------
@@ -462,72 +596,82 @@ def calc_width(full_port, params_dict):
     """
     1D/2D width 계산 지원.
     예) [7:0][31:0] → 8 * 32 = 256 bit
+    (식 계산은 auto_layout 의 AST 계산기, 파라미터끼리 참조해도 됨)
     """
-    brackets = re.findall(r"\[(.*?)\]", full_port)
-    if not brackets:
-        return 1
-
-    env = {}
-    env.update(params_dict)
-    env["clog2"] = clog2
-
-    total_width = 1
-
-    for b in brackets:
-        b = b.replace("$clog2", "clog2")
-        hi, lo = [x.strip() for x in b.split(":")]
-        hi = eval(hi, {}, env)
-        lo = eval(lo, {}, env)
+    from auto_layout import decl_dims, param_env
 
-        w = abs(hi - lo) + 1
-        total_width *= w
+    import math
 
-    return total_width
+    return math.prod(decl_dims(full_port, param_env(params_dict)))
 
 # ============================================================
 # Generate HEX inputs for each case
 # ============================================================
-def generate_hex_inputs(ports, params, case_id, cycles, result_dir):
+def stimulus_port_widths(ports, params, layout=None, clk_name="clk", reset_name="rst_n"):
+    """clk / reset 제외한 input port 의 [(name, width)] (layout 이 있으면 그대로 사용)
+    clk_name / reset_name 은 config 의 input_ports 와 같은 기준 (auto_layout.control_ports)"""
+
+    if layout is None:
+        from auto_layout import build_layout
+        layout = build_layout(ports, params)
+
+    return [
+        (p["name"], layout["ports"][p["name"]]["width"]) for p in ports
+        if p["dir"] == "input" and p["name"] not in (clk_name, reset_name)
+    ]
+
+
+def generate_hex_inputs(ports, params, case_id, cycles, result_dir, seed=None, constraints=None,
+                        layout=None, clk_name="clk", reset_name="rst_n"):
     """
     Generate hex input vectors based on port bit-width.
-    clk / rst_n 제외한 모든 input port에 대해 생성
+    clk / reset 제외한 모든 input port에 대해 생성
+    seed 를 주면 같은 입력을 다시 만들 수 있음 (config JSON 에 기록)
+    constraints 가 있으면 그 포트는 제약대로 (auto_constraints 참고)
     """
+    import random
+    from auto_constraints import CONSTRAINT_CHUNK, hex_lines, port_generators
 
-    # 파라미터 dict 변환
-    params_dict = {k:int(v) for (k,v) in params}
-
-    # 입력 포트 필터링
-    input_ports = [
-        p for p in ports
-        if p["dir"] == "input" and p["name"] not in ("clk", "rst_n")
-    ]
+    rnd = random.Random(seed)
+    hex_paths = []
 
-    for p in input_ports:
-        port_name = p["name"]
-        full_decl = p["full"]
+    if layout is None:
+        from auto_layout import build_layout
+        layout = build_layout(ports, params)
+    port_widths = stimulus_port_widths(ports, params, layout, clk_name, reset_name)
+    gens = port_generators(port_widths, layout["params"], rnd, constraints)
 
-        # --- 포트 비트폭 계산 ---
-        width = calc_width(full_decl, params_dict)
+    for (port_name, width), gen in zip(port_widths, gens):
 
         # 필요한 hex 문자 수 (4bit = hex 1글자)
         hex_digits = (width + 3)//4
 
-        # 출력 파일 생성
+        # 출력 파일 생성 (CONSTRAINT_CHUNK cycle 씩 한 번에)
         hex_path = os.path.join(result_dir, f"{port_name}_case{case_id}.hex")
         with open(hex_path, "w") as f:
-            for _ in range(cycles):
-                val = random.getrandbits(width)
-                f.write(f"{val:0{hex_digits}x}\n")
+            for base in range(0, cycles, CONSTRAINT_CHUNK):
+                f.write(hex_lines(gen.take(min(CONSTRAINT_CHUNK, cycles - base)), hex_digits))
 
-        print(f"[+] Generated HEX: {hex_path} (width {width} bits, {hex_digits} hex digits)")
+        hex_paths.append(hex_path)
+        kind = "constrained" if constraints and port_name in constraints else "random"
+        print(f"[+] Generated HEX: {hex_path} (width {width} bits, {hex_digits} hex digits, {kind})")
+
+    return hex_paths
 
 # ============================================================
 # json저장
 # ============================================================
 
-def save_case_json(case_id, ports, params, cycles, result_dir):
+def make_case_config(case_id, ports, params, cycles, result_dir, hex_files=None, stimulus="file",
+                     check="compare", compression="none", store=False, seed=None,
+                     coverage=False, constraints=None, layout=None, run=None):
 
-    params_dict = {k: int(v) for (k, v) in params}
+    # 포트 폭 / lane / hex 자리수 + 풀어 둔 파라미터 (모든 단계가 이 표를 씀)
+    if layout is None:
+        from auto_layout import build_layout
+        layout = build_layout(ports, params)
+    from auto_layout import control_ports
+    params_dict = layout["params"]
 
     port_dicts = []
     for p in ports:
@@ -537,9 +681,10 @@ def save_case_json(case_id, ports, params, cycles, result_dir):
             "full_decl": p["full"]
         })
 
+    clk_name, reset_name = control_ports({"run": run})
     input_ports = [
         p["name"] for p in ports
-        if p["dir"] == "input" and p["name"] not in ("clk", "rst_n")
+        if p["dir"] == "input" and p["name"] not in (clk_name, reset_name)
     ]
 
     output_ports = [
@@ -547,73 +692,182 @@ def save_case_json(case_id, ports, params, cycles, result_dir):
         if p["dir"] == "output"
     ]
 
-    hex_files = {
-        p: os.path.join(result_dir, f"{p}_case{case_id}.hex")
-        for p in input_ports
-    }
+    # stream 모드면 golden 쪽 tee FIFO 경로가 넘어옴
+    if hex_files is None:
+        hex_files = {
+            p: os.path.join(result_dir, f"{p}_case{case_id}.hex")
+            for p in input_ports
+        }
 
-    data = {
+    return {
         "case_id": case_id,
         "cycles": cycles,
         "params": params_dict,
         "ports": port_dicts,
         "input_ports": input_ports,
         "output_ports": output_ports,
-        "hex_files": hex_files
+        "hex_files": hex_files,
+        "stimulus": stimulus,
+        "check": check,
+        "compression": compression,
+        "store": store,
+        "seed": seed,
+        "coverage": coverage,
+        "constraints": constraints,
+        "layout": layout,
+        "run": run          # batch 의 어느 run 인지 (name / top / clk / reset)
     }
 
-    json_path = os.path.join(result_dir, f"config_case{case_id}.json")
+
+def save_case_json(case_id, ports, params, cycles, result_dir, hex_files=None, stimulus="file",
+                   check="compare", compression="none", store=False, seed=None,
+                   coverage=False, constraints=None, layout=None, run=None):
+
+    data = make_case_config(case_id, ports, params, cycles, result_dir, hex_files, stimulus,
+                            check, compression, store, seed, coverage, constraints, layout, run)
+    return write_case_config(data, result_dir)
+
+
+def write_case_config(cfg, result_dir):
+    """config_case<N>.json, --store 면 작은 파일 대신 results.db 에 바로"""
+    if cfg.get("store"):
+        from auto_resultstore import store_config
+        path = store_config(cfg, result_dir)
+        print(f"[+] Saved config for CASE {cfg['case_id']} → {path}")
+        return path
+
+    json_path = os.path.join(result_dir, f"config_case{cfg['case_id']}.json")
     with open(json_path, "w") as f:
-        json.dump(data, f, indent=4)
+        json.dump(cfg, f, indent=4)
 
     print(f"[+] Saved JSON config: {json_path}")
     return json_path
 
+# ============================================================
+# run 정보 저장 (auto_history 가 run 단위로 기록할 때 사용)
+#   rtl_hash : RTL 파일 내용 해시 → "RTL 이 바뀐 뒤부터 실패" 추적
+# ============================================================
+def save_run_info(result_dir, top, vfiles, clk_name=None, reset_name=None, runs=None):
+    import hashlib
+
+    h = hashlib.sha1()
+    for vf in sorted(vfiles):
+        with open(vf, "rb") as f:
+            h.update(f.read())
+
+    info = {
+        "top": top,
+        "vfiles": list(vfiles),
+        "rtl_hash": h.hexdigest(),
+        "started": time.time(),
+        "clk": clk_name,
+        "reset": reset_name,
+        "runs": runs,       # batch 실행이면 run 별 요약 (case 범위 포함)
+    }
+    path = os.path.join(result_dir, "run_info.json")
+    with open(path, "w") as f:
+        json.dump(info, f, indent=4)
+    return path
+
+
+# ============================================================
+# 시뮬레이션이 끝난 case 의 plain 파일 압축
+#   sim 로그, 입력 hex, self-check 기대값 hex → .gz / .zst
+# ============================================================
+def archive_case_files(cfg, result_dir, sim_log, compression):
+    paths = [sim_log]
+    if cfg.get("stimulus", "file") == "file":
+        paths.extend(cfg["hex_files"].values())
+    if cfg.get("check") == "selfcheck":
+        from auto_golden import expect_hex_path
+        paths.extend(expect_hex_path(result_dir, p, cfg["case_id"]) for p in cfg["output_ports"])
+
+    return [compress_file(p, compression) for p in paths]
+
+
 # ============================================================
 # vsim출력을 csv형태로 바꾸기
+#   - 일반 로그        : 매 cycle '[Cycle N]' + 모든 포트 값
+#   - value-change 로그 : '[ValueChangeLog]' 표시가 있으면 바뀐 포트만 기록되어 있음
+#                         → 빠진 cycle / 포트는 직전 값으로 채워서 dense CSV 로 복원
+#                           ('[End N]' 까지 마지막 값을 반복)
 # ============================================================
+CYCLE_RE     = re.compile(r"#?\s*\[Cycle\s+(\d+)\]")
+END_RE       = re.compile(r"#?\s*\[End\s+(\d+)\]")
+VALUE_RE     = re.compile(r"#?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9a-fA-Fx]+)")
+PORT_SCAN_RE = re.compile(r"#\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9a-fA-Fx]+)")
+VCLOG_MARK   = "[ValueChangeLog]"
+FILL_BATCH   = 65536
+
+
 def sim_to_csv(sim_log, out_csv):
 
     cycle = None
     current_values = {}   # {port_name: value}
     output_ports = []     # 포트 리스트 (처음 발견 시 자동 기록)
+    sparse = False        # value-change 로그 여부
 
-    with open(sim_log, "r") as f:
+    with open_text(find_artifact(sim_log), "r", errors="ignore") as f:
         lines = f.readlines()
 
     # 1. 먼저 모든 출력 포트를 자동 감지
     for line in lines:
-        m_port = re.search(r"#\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9a-fA-Fx]+)", line)
+        m_port = PORT_SCAN_RE.search(line)
         if m_port:
             port = m_port.group(1)
             if port not in output_ports:
                 output_ports.append(port)
+        elif VCLOG_MARK in line:
+            sparse = True
 
-    # 2. CSV 생성
-    with open(out_csv, "w") as w:
+    # 2. CSV 생성 (cycle → byte offset index 도 같이)
+    header = "cycle," + ",".join(output_ports) + "\n"
+    index = CycleIndex(pos=text_bytes(header))
+    with open_text(out_csv, "w") as w:
 
         # CSV header
-        w.write("cycle," + ",".join(output_ports) + "\n")
+        w.write(header)
+
+        def write_rows(upto=None):
+            """현재 cycle 행을 쓰고, sparse 면 upto 직전 cycle 까지 같은 값으로 채움"""
+            row = ",".join([current_values.get(p, "xxxxx") for p in output_ports])
+            first = f"{cycle},{row}\n"
+            index.add_row(cycle, first)
+            w.write(first)
+            if not sparse or upto is None:
+                return
+            for base in range(cycle + 1, upto, FILL_BATCH):
+                stop = min(base + FILL_BATCH, upto)
+                rows = [f"{c},{row}\n" for c in range(base, stop)]
+                index.add_rows(base, rows)
+                w.write("".join(rows))
 
         for line in lines:
             line = line.strip()
 
             # (1) Cycle 번호 찾기
-            m = re.match(r"#?\s*\[Cycle\s+(\d+)\]", line)
+            m = CYCLE_RE.match(line)
             if m:
+                new_cycle = int(m.group(1))
                 # 이전 cycle 값 쓰기
                 if cycle is not None:
-                    row = [str(cycle)]
-                    for p in output_ports:
-                        row.append(current_values.get(p, "xxxxx"))
-                    w.write(",".join(row) + "\n")
+                    write_rows(new_cycle)
 
-                cycle = int(m.group(1))
-                current_values = {}  # 새 사이클 값 초기화
+                cycle = new_cycle
+                if not sparse:
+                    current_values = {}  # 새 사이클 값 초기화 (sparse 면 직전 값 유지)
                 continue
 
-            # (2) '포트명 = 값' 찾기
-            m2 = re.match(r"#?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*([0-9a-fA-Fx]+)", line)
+            # (2) 마지막 cycle 번호 (value-change 로그)
+            m = END_RE.match(line)
+            if m:
+                if cycle is not None:
+                    write_rows(int(m.group(1)))
+                cycle = None
+                continue
+
+            # (3) '포트명 = 값' 찾기
+            m2 = VALUE_RE.match(line)
             if m2:
                 port = m2.group(1)
                 value = m2.group(2)
@@ -621,55 +875,408 @@ def sim_to_csv(sim_log, out_csv):
 
         # 마지막 cycle 출력
         if cycle is not None:
-            row = [str(cycle)]
-            for p in output_ports:
-                row.append(current_values.get(p, "xxxxx"))
-            w.write(",".join(row) + "\n")
+            write_rows()
+
+    index.save(out_csv)
+    # 로그도 '[Cycle N]' 위치 index (plain 로그일 때만)
+    log_path = find_artifact(sim_log)
+    if log_path == sim_log:
+        build_index(sim_log, "log")
 
 
 
 # ============================================================
-# Main
+# Run spec (비대화형 / batch 실행)
+#
+# 예전 main 은 top module / case 수 / clk / reset / cycle 수를 input() 으로 물어봄
+#   → 터미널 없는 job runner / 여러 노드 batch 에서는 실행 불가
+#
+# 지금은 CLI flag 또는 run spec JSON 으로 모두 지정 가능 (빠진 값은 터미널일 때만 물어봄)
+#   python auto_vsim.py --top generic_adder_tree --cases 4 --clk clk --reset rst_n \
+#                       --cycles 1000 --seed 7 --param INPUT_COUNT=16 --jobs 4 adder_tree.v
+#   python auto_vsim.py --spec regress.json
+#
+# run spec 형식 (run 하나면 "runs" 없이 최상위에 바로 써도 됨)
+#   {
+#     "vfiles": ["adder_tree.v"],            (CLI 에 .v 를 주면 그쪽 사용)
+#     "jobs": 4,                              (동시에 돌리는 vsim 수)
+#     "clk": "clk", "reset": "rst_n",         (최상위 값 = 모든 run 의 기본값)
+#     "runs": [
+#       {"name": "n8",  "top": "generic_adder_tree", "cases": 4, "cycles": 1000, "seed": 1},
+#       {"name": "n16", "top": "generic_adder_tree", "cases": 2, "cycles": 5000,
+#        "params": {"INPUT_COUNT": 16}, "constraints": "c.json"}
+#     ]
+#   }
+#   우선순위 : CLI flag > run 항목 > spec 최상위 (params 는 이름별로 합침)
+#
+# batch 의 모든 run 은 한 run 디렉토리에 case 번호를 이어서 만들어짐
+#   → RTL 은 한 번만 컴파일, TB 도 한 번의 vlog 로 컴파일, golden / compare 는 그대로 동작
+#   (파라미터는 TB 의 parameter 로 넘기므로 RTL 을 다시 컴파일할 필요 없음)
+#   case 별 run 정보 (name / top / clk / reset) 는 config_case<N>.json 의 "run"
 # ============================================================
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python auto_vsim.py file1.v file2.v ...")
+RUN_KEYS = ("name", "top", "cases", "cycles", "clk", "reset", "seed", "params", "constraints")
+SPEC_KEYS = RUN_KEYS + ("vfiles", "jobs", "runs")
+
+
+def load_run_spec(path):
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {"runs": spec}
+    if not isinstance(spec, dict):
+        raise RuntimeError(f"[ERROR] {path}: run spec must be an object or a list of runs")
+    unknown = set(spec) - set(SPEC_KEYS)
+    if unknown:
+        raise RuntimeError(f"[ERROR] {path}: unknown run spec key(s): {', '.join(sorted(unknown))}")
+    return spec
+
+
+def parse_param_overrides(items):
+    """["NAME=EXPR", ...] → {NAME: EXPR}"""
+    overrides = {}
+    for item in items or []:
+        name, sep, expr = item.partition("=")
+        if not sep or not name.strip() or not expr.strip():
+            raise RuntimeError(f"[ERROR] --param expects NAME=VALUE, got '{item}'")
+        overrides[name.strip()] = expr.strip()
+    return overrides
+
+
+def spec_runs(spec, cli):
+    """spec 의 run 목록에 CLI 값을 덮어쓴 최종 run dict list"""
+    base = {k: spec[k] for k in RUN_KEYS if k in spec}
+    entries = spec.get("runs") or [{}]
+
+    runs = []
+    for k, entry in enumerate(entries):
+        unknown = set(entry) - set(RUN_KEYS)
+        if unknown:
+            raise RuntimeError(f"[ERROR] run {k}: unknown key(s): {', '.join(sorted(unknown))}")
+        run = dict(base)
+        run.update(entry)
+        run.update({key: v for key, v in cli.items() if v is not None})
+
+        params = {}
+        for src in (base, entry, cli):
+            params.update(src.get("params") or {})
+        run["params"] = params
+        if len(entries) > 1:
+            run.setdefault("name", f"run{k}")
+        runs.append(run)
+    return runs
+
+
+def ask(value, prompt, flag, conv=str):
+    """값이 있으면 그대로, 없으면 터미널일 때만 input() 으로"""
+    if value is not None:
+        return conv(value)
+    if not sys.stdin.isatty():
+        print(f"[ERROR] {flag} is required when running without a terminal "
+              f"(or set it in the --spec file)")
         sys.exit(1)
+    return conv(input(prompt))
+
+
+def select_top(module_map, top=None):
+    """--top (모듈 이름 또는 목록 번호) → (파일, 모듈 이름). 없으면 번호를 물어봄"""
+    files = list(module_map.keys())
+    if top is None or str(top).isdigit():
+        choice = ask(top, "\nSelect TOP module (number): ", "--top", int)
+        if not 1 <= choice <= len(files):
+            print("Invalid selection")
+            sys.exit(1)
+        top_file = files[choice - 1]
+    else:
+        matches = [vf for vf in files if module_map[vf] == top]
+        if not matches:
+            print(f"[ERROR] TOP module '{top}' not found in {', '.join(files)}")
+            sys.exit(1)
+        top_file = matches[0]
+    return top_file, module_map[top_file]
+
+
+def apply_param_overrides(params, overrides):
+    """parse_parameters 결과의 기본값을 override 값으로 (TB parameter 로 DUT 에 전달됨)"""
+    names = {name for name, _ in params}
+    unknown = set(overrides) - names
+    if unknown:
+        raise RuntimeError(f"[ERROR] Unknown parameter override(s): {', '.join(sorted(unknown))}")
+    return [(name, str(overrides[name]) if name in overrides else expr) for name, expr in params]
 
-    vfiles = sys.argv[1:]
+
+def resolve_run(run, module_map, prof):
+    """run dict → top / 포트 / 파라미터 / layout 까지 계산 (빠진 값은 물어봄)"""
+    import random
+    from auto_layout import build_layout, control_ports
+
+    if run.get("name"):
+        print(f"\n=== Run '{run['name']}' ===")
+
+    top_file, top_module = select_top(module_map, run.get("top"))
+    print(f"\n[+] Selected TOP module: {top_module}\n")
+
+    with prof.stage("parse_ports"):
+        ports = parse_ports(top_file, top_module)
+        params = parse_parameters(top_file, top_module)
+    params = apply_param_overrides(params, run.get("params") or {})
+
+    # 포트 layout 표 : run 당 한 번 (config_case JSON 에 같이 저장)
+    layout = build_layout(ports, params)
+
+    # clk / reset 이름을 먼저 정해야 stimulus 포트 목록이 config 의 input_ports 와 같아짐
+    cases = ask(run.get("cases"), "\nhow many cases do you want? (number): ", "--cases", int)
+    clk_name, reset_name = control_ports({"run": {
+        "clk": ask(run.get("clk"), "\ntype clk name :", "--clk"),
+        "reset": ask(run.get("reset"), "type reset name : ", "--reset"),
+    }})
+    port_widths = stimulus_port_widths(ports, params, layout, clk_name, reset_name)
+
+    # 제약 파일을 시뮬레이션 전에 한 번 검사 (포트 이름 / 값 범위 / 파라미터 식)
+    constraints = run.get("constraints")
+    if isinstance(constraints, str):
+        from auto_constraints import load_constraints
+        constraints = load_constraints(constraints)
+    if constraints:
+        from auto_constraints import port_generators
+        port_generators(port_widths, layout["params"], random.Random(), constraints)
+
+    return {
+        "name": run.get("name"),
+        "top": top_module,
+        "ports": ports,
+        "params": params,
+        "layout": layout,
+        "port_widths": port_widths,
+        "constraints": constraints,
+        "cases": cases,
+        "clk": clk_name,
+        "reset": reset_name,
+        "cycles": ask(run.get("cycles"), "type cycle count : ", "--cycles", int),
+        "seed": run.get("seed"),
+    }
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    ap = argparse.ArgumentParser(usage="python auto_vsim.py [options] file1.v file2.v ...")
+    ap.add_argument("vfiles", nargs="*")
+    ap.add_argument("--spec", metavar="JSON",
+                    help="run spec file: top / cases / clk / reset / cycles / seed / params / "
+                         "constraints, or a batch of runs sharing one compilation")
+    ap.add_argument("--top", help="TOP module name (or its number in the detected list)")
+    ap.add_argument("--cases", type=int, help="number of cases")
+    ap.add_argument("--clk", help="clock port name")
+    ap.add_argument("--reset", help="reset port name")
+    ap.add_argument("--cycles", type=int, help="cycles per case")
+    ap.add_argument("--seed", type=int,
+                    help="base seed: the same seed regenerates the same per-case stimulus")
+    ap.add_argument("--param", action="append", metavar="NAME=VALUE",
+                    help="override a TOP module parameter (repeatable)")
+    ap.add_argument("--jobs", type=int,
+                    help="simulate up to N cases at the same time (default 1)")
+    ap.add_argument("--progress-every", type=int, default=10000,
+                    help="TB prints [Progress N/TOTAL] every N cycles (0 = off)")
+    ap.add_argument("--cosim", metavar="GOLDEN_PY",
+                    help="lockstep co-simulation with this golden model through named pipes "
+                         "(stops vsim at the first mismatch)")
+    ap.add_argument("--stream-stimulus", action="store_true",
+                    help="feed stimulus through named pipes from a generator process "
+                         "instead of writing hex files (requires --cosim)")
+    ap.add_argument("--self-check", metavar="GOLDEN_PY",
+                    help="run this golden model first and generate self-checking TBs that "
+                         "compare every cycle inside the simulator ($fatal on first mismatch)")
+    ap.add_argument("--log-changes", action="store_true",
+                    help="TB prints an output only when its value changes "
+                         "(sim_to_csv expands it back to one row per cycle)")
+    ap.add_argument("--compress", choices=["none", "gzip", "zstd"], default="none",
+                    help="compress CSV / sim log / hex artifacts (simulator inputs stay plain "
+                         "until the case has finished)")
+    ap.add_argument("--store", action="store_true",
+                    help="after auto_compare, move per-case files into results/results.db "
+                         "(export them again with auto_resultstore.py export)")
+    ap.add_argument("--constraints", metavar="JSON",
+                    help="per-port stimulus constraints (ranges, dist, sequence, lanes, hold; "
+                         "see auto_constraints.py)")
+    ap.add_argument("--coverage", action="store_true",
+                    help="bias stimulus toward input coverage bins not hit yet in this run "
+                         "(auto_golden writes results/coverage_case<N>.json)")
+    ap.add_argument("--coverage-target", type=float, metavar="PERCENT",
+                    help="with --coverage: end the case once input coverage reaches PERCENT "
+                         "and skip the remaining cases")
+    ap.add_argument("--keep-runs", type=int, default=10,
+                    help="keep the last N run directories under runs/ (0 = no limit)")
+    ap.add_argument("--keep-gb", type=float, default=0,
+                    help="also remove old runs while runs/ is larger than this many GB (0 = off)")
+    args = ap.parse_args()
+
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+
+    if args.self_check and args.cosim:
+        ap.error("--self-check and --cosim are alternative checking modes")
+    if args.stream_stimulus and not args.cosim:
+        ap.error("--stream-stimulus needs --cosim (the golden model reads the stimulus tee live)")
+    if args.coverage and args.stream_stimulus:
+        ap.error("--coverage biases the hex files (not available with --stream-stimulus)")
+    if args.coverage_target is not None and not args.coverage:
+        ap.error("--coverage-target needs --coverage")
+    if args.compress == "zstd":
+        # 압축은 시뮬레이션이 끝난 뒤에 하므로, 패키지가 없으면 vsim 을 돌리기 전에 멈춤
+        from auto_storage import _zstd
+        try:
+            _zstd()
+        except RuntimeError as e:
+            ap.error(str(e))
+
+    spec = load_run_spec(args.spec) if args.spec else {}
+    runs = spec_runs(spec, {
+        "top": args.top, "cases": args.cases, "cycles": args.cycles, "clk": args.clk,
+        "reset": args.reset, "seed": args.seed, "constraints": args.constraints,
+        "params": parse_param_overrides(args.param) or None,
+    })
+    if args.coverage and any(run.get("constraints") for run in runs):
+        ap.error("--coverage and --constraints are alternative stimulus generators")
+
+    vfiles = args.vfiles or spec.get("vfiles")
+    if not vfiles:
+        ap.error("no Verilog files (give them on the command line or as \"vfiles\" in --spec)")
+    jobs = max(1, args.jobs or spec.get("jobs", 1))
+    if args.cosim:
+        jobs = 1        # cosim 은 case 마다 golden 을 같은 프로세스에서 lockstep 으로 돌림
+
+    prof = Profiler("vsim")
+
+    golden_class = None
+    if args.cosim or args.self_check:
+        from auto_golden import load_golden_class
+        golden_class = load_golden_class(args.cosim or args.self_check)
 
     check_modelsim()
-    result_dir = make_result_dir()
+    result_dir = make_result_dir(args.keep_runs, args.keep_gb)
 
     # Extract module names
     print("\n=== Detected Modules ===")
-    module_map = {vf: extract_module_name(vf) for vf in vfiles}
+    with prof.stage("parse_modules"):
+        module_map = {vf: extract_module_name(vf) for vf in vfiles}
     for i, (vf, mn) in enumerate(module_map.items(), 1):
         print(f"{i}) {mn:20s}  (from {vf})")
 
-    choice = int(input("\nSelect TOP module (number): "))
-    if not 1 <= choice <= len(vfiles):
-        print("Invalid selection")
-        sys.exit(1)
-
-    top_file = list(module_map.keys())[choice - 1]
-    top_module = module_map[top_file]
-    print(f"\n[+] Selected TOP module: {top_module}\n")
+    # 모든 run 의 값을 먼저 확정 (대화형이면 여기서 한꺼번에 물어봄)
+    runs = [resolve_run(run, module_map, prof) for run in runs]
+    tops = list(dict.fromkeys(run["top"] for run in runs))
 
-    ports = parse_ports(top_file, top_module)
-    params=parse_parameters(top_file,top_module)
+    status = StatusBoard(os.path.join(result_dir, "status.prom"), ",".join(tops))
 
-    cases_count = int(input("\nhow many cases do you want? (number): "))
-    clk_name=str(input("\ntype clk name :"))
-    reset_name=str(input("type reset name : "))
-    cycles=int(input("type cycle count : "))
     tb_files=[]
-    for case_id in range(cases_count):
-        tb_text = build_tb_case(top_module, ports, params, case_id, cycles,clk_name,reset_name)
-        tb_file = save_tb_case(top_module, tb_text, case_id)
-        tb_files.append(tb_file)
-        generate_hex_inputs(ports, params,case_id, cycles, result_dir)
-        save_case_json(case_id, ports, params, cycles, result_dir)
+    case_cfgs=[]
+    case_tops=[]
+    case_cycle_counts=[]
+    case_runs=[]
+    summaries=[]
+    for run in runs:
+        top_module, ports, params = run["top"], run["ports"], run["params"]
+        layout, port_widths, constraints = run["layout"], run["port_widths"], run["constraints"]
+        clk_name, reset_name, cycles = run["clk"], run["reset"], run["cycles"]
+        run_tag = {"name": run["name"], "top": top_module, "clk": clk_name, "reset": reset_name}
+
+        # --seed : 같은 seed 면 case 별 seed 도 같음 → 같은 stimulus
+        seed_rng = random.Random(run["seed"]) if run["seed"] is not None else random
+
+        # --coverage : run 안에서 누적되는 입력 coverage (case 가 지날수록 미도달 bin 쪽으로)
+        cover = None
+        if args.coverage:
+            from auto_coverage import CoverageCollector, coverage_space
+            cover = CoverageCollector(coverage_space(
+                make_case_config(0, ports, params, cycles, result_dir, layout=layout,
+                                 run=run_tag)))
+
+        first_case = len(tb_files)
+        for case_id in range(first_case, first_case + run["cases"]):
+            seed = seed_rng.randrange(1 << 32)
+
+            # coverage 모드 : 입력을 먼저 만들어야 (target 도달 시) 실제 cycle 수를 앎
+            case_cycles = cycles
+            coverage_bias = None
+            if cover is not None:
+                from auto_coverage import write_biased_hex
+                # bias 는 앞 case 까지의 coverage 에 따라 달라짐 → 재현용으로 config 에 기록
+                coverage_bias = {"missing": cover.bias_state(), "cycles": cycles,
+                                 "target": args.coverage_target}
+                with prof.stage("hex_gen", case_id, cycles) as rec:
+                    rec["outputs"], case_cycles = write_biased_hex(
+                        port_widths, case_id, cycles, result_dir,
+                        random.Random(seed), cover, args.coverage_target)
+                print(f"[+] CASE {case_id}: input coverage {cover.percent('inputs'):.1f}% "
+                      f"after {case_cycles} cycles")
+
+            status.add_case(case_id, case_cycles)
+            stream_path = None
+            if args.cosim:
+                stream_path = os.path.join(result_dir, f"cosim_case{case_id}.fifo")
+            expect_files = None
+            if args.self_check:
+                from auto_golden import expect_hex_path
+                expect_files = {p["name"]: expect_hex_path(result_dir, p["name"], case_id)
+                                for p in ports if p["dir"] == "output"}
+            with prof.stage("tb_gen", case_id) as rec:
+                tb_text = build_tb_case(top_module, ports, params, case_id, case_cycles,clk_name,reset_name,
+                                        args.progress_every, stream_path, expect_files,
+                                        args.log_changes, hex_dir=result_dir)
+                tb_file = save_tb_case(top_module, tb_text, case_id, result_dir)
+                rec["outputs"].append(tb_file)
+            tb_files.append(tb_file)
+            case_tops.append(top_module)
+            case_cycle_counts.append(case_cycles)
+            case_runs.append(run)
+
+            if args.stream_stimulus:
+                from auto_stream import prepare_stream_fifos
+                hex_files = prepare_stream_fifos(port_widths, case_id, result_dir)
+                cfg = make_case_config(case_id, ports, params, cycles, result_dir,
+                                       hex_files, "stream", compression=args.compress,
+                                       store=args.store, seed=seed,
+                                       constraints=constraints, layout=layout, run=run_tag)
+                write_case_config(cfg, result_dir)
+                case_cfgs.append(cfg)
+                continue
+
+            if cover is None:
+                with prof.stage("hex_gen", case_id, cycles) as rec:
+                    rec["outputs"] = generate_hex_inputs(ports, params,case_id, cycles, result_dir,
+                                                         seed, constraints, layout,
+                                                         clk_name, reset_name)
+            cfg = make_case_config(case_id, ports, params, case_cycles, result_dir,
+                                   check="selfcheck" if args.self_check else "compare",
+                                   compression=args.compress, store=args.store,
+                                   seed=seed, coverage=args.coverage,
+                                   constraints=constraints, layout=layout, run=run_tag)
+            if coverage_bias is not None:
+                cfg["coverage_bias"] = coverage_bias
+            write_case_config(cfg, result_dir)
+            case_cfgs.append(cfg)
+
+            # self-check : golden 을 먼저 돌려서 기대값 hex 생성
+            if args.self_check:
+                from auto_golden import run_single_case, write_expect_hex
+                with prof.stage("golden", case_id, cycles) as rec:
+                    golden_csv = run_single_case(golden_class, cfg, result_dir=result_dir)
+                    rec["outputs"].extend(write_expect_hex(golden_csv, cfg["output_ports"],
+                                                           case_id, result_dir).values())
+
+            if args.coverage_target is not None and cover.percent("inputs") >= args.coverage_target:
+                print(f"[+] Input coverage target {args.coverage_target}% reached → "
+                      f"{case_id + 1 - first_case} of {run['cases']} cases generated")
+                break
+
+        summaries.append(dict(run_tag, cycles=cycles, seed=run["seed"],
+                              params=run["layout"]["params"],
+                              case_ids=[first_case, len(tb_files) - 1]))
+
+    first = runs[0]
+    save_run_info(result_dir, ",".join(tops), vfiles, first["clk"], first["reset"],
+                  summaries if len(runs) > 1 else None)
 
     # ============================================================
     # ModelSim 작업 공간 생성
@@ -679,35 +1286,118 @@ def main():
     run_cmd(["vmap", "work", work_dir])
 
     # ============================================================
-    # RTL 컴파일
+    # RTL 컴파일 (batch 전체에서 한 번)
     # ============================================================
-    for vf in vfiles:
-        run_cmd(["vlog", "-sv", vf])
+    with prof.stage("vlog_rtl"):
+        for vf in vfiles:
+            run_cmd(["vlog", "-sv", vf])
 
     # ============================================================
-    # 각 케이스별 TB 컴파일 → 시뮬레이션
+    # TB 컴파일 (모든 case 를 vlog 한 번으로)
     # ============================================================
-    for case_id, tb_file in enumerate(tb_files):
-        print(f"\n[=== SIMULATING CASE {case_id} ===]")
+    for case_id in range(len(tb_files)):
+        status.set_state(case_id, "compiling")
+    with prof.stage("vlog_tb"):
+        run_cmd(["vlog", "-sv"] + tb_files)
 
-        # compile TB
-        run_cmd(["vlog", "-sv", tb_file])
+    # ============================================================
+    # 각 케이스별 시뮬레이션 (--jobs 개까지 동시에)
+    # ============================================================
+    def simulate_case(case_id):
+        print(f"\n[=== SIMULATING CASE {case_id} ===]")
+        cycles = case_cycle_counts[case_id]
 
         # sim log path
         sim_log = os.path.join(result_dir, f"SIMresult_case{case_id}.txt")
         with open(sim_log, "w", encoding="utf-8") as f:
             f.write(f"==== Simulation Log for case {case_id} ====\n")
         # run simulation
-        tb_modname = f"tb_{top_module}_case{case_id}"
-        run_cmd(
-            ["vsim", "-c", tb_modname, "-do", "run -all; quit;"],
-            sim_log
-        )
-        csv_log=os.path.join(result_dir, f"csv_result_case{case_id}.csv")
-        sim_to_csv(sim_log,csv_log)
+        tb_modname = tb_module_name(case_tops[case_id], case_id)
+        status.set_state(case_id, "running")
+
+        # vsim 은 기본으로 ./transcript 에 로그를 씀 → --jobs 면 여러 vsim 이 같은 파일에 씀
+        # case 마다 자기 transcript (내용은 sim_log 에 이미 있으므로 끝나면 지움)
+        transcript = os.path.join(result_dir, f"transcript_case{case_id}")
+        vsim_cmd = ["vsim", "-c", "-l", transcript, tb_modname, "-do", "run -all; quit;"]
+
+        if args.cosim:
+            from auto_cosim import run_cosim_case
+            cfg = case_cfgs[case_id]
+
+            stim_proc = None
+            if args.stream_stimulus:
+                from auto_stream import start_stimulus_stream
+                run = case_runs[case_id]
+                stim_proc = start_stimulus_stream(run["port_widths"],
+                                                  case_id, cycles, result_dir, cfg["seed"],
+                                                  constraints=run["constraints"],
+                                                  params=cfg["params"])
+
+            with prof.stage("cosim", case_id, cycles, [sim_log]):
+                ok, errmsg, _ = run_cosim_case(
+                    vsim_cmd,
+                    sim_log,
+                    os.path.join(result_dir, f"cosim_case{case_id}.fifo"),
+                    golden_class, cfg, result_dir,
+                    lambda done, total, cid=case_id: status.update_progress(cid, done, total)
+                )
+
+            if stim_proc is not None:
+                from auto_stream import stop_stimulus_stream, remove_stream_fifos
+                stop_stimulus_stream(stim_proc)
+                remove_stream_fifos(case_runs[case_id]["port_widths"], case_id, result_dir)
+
+            print(f"   → {'PASS' if ok else 'FAIL - ' + errmsg}")
+            status.set_state(case_id, "done" if ok else "failed")
 
-        print(f"[+] Simulation log saved: {sim_log}")
+        else:
+            with prof.stage("vsim", case_id, cycles, [sim_log]):
+                rc = run_cmd_live(
+                    vsim_cmd,
+                    sim_log,
+                    lambda done, total, cid=case_id: status.update_progress(cid, done, total)
+                )
+
+            if args.self_check:
+                # self-check : 출력 transcript 가 없으므로 CSV 변환 대신 TB 판정을 바로 기록
+                from auto_compare import read_selfcheck_result, save_compare_result
+                ok, errmsg, zx_list = read_selfcheck_result(sim_log)
+                save_compare_result(case_id, ok, zx_list, errmsg, result_dir)
+                print(f"   → {'PASS' if ok else 'FAIL - ' + errmsg}")
+                status.set_state(case_id, "done" if ok else "failed")
+            else:
+                status.set_state(case_id, "converting")
+                csv_log = artifact_path(os.path.join(result_dir, f"csv_result_case{case_id}.csv"),
+                                        args.compress)
+                with prof.stage("sim_to_csv", case_id, cycles, [csv_log]):
+                    sim_to_csv(sim_log,csv_log)
+
+                if rc != 0:
+                    print(f"[ERROR] vsim exited with code {rc} (case {case_id})")
+                    status.set_state(case_id, "failed")
+                else:
+                    status.set_state(case_id, "done")
+
+        if os.path.exists(transcript):
+            os.remove(transcript)
+
+        # 시뮬레이터가 다 읽은 plain 파일 압축 (golden / compare 는 압축된 채로 읽음)
+        if args.compress != "none":
+            with prof.stage("compress", case_id) as rec:
+                rec["outputs"] = archive_case_files(case_cfgs[case_id], result_dir, sim_log,
+                                                    args.compress)
+
+        print(f"[+] Simulation log saved: {find_artifact(sim_log)}")
+
+    if jobs > 1 and len(tb_files) > 1:
+        print(f"\n[+] Simulating {len(tb_files)} cases, {jobs} at a time")
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(simulate_case, range(len(tb_files))))
+    else:
+        for case_id in range(len(tb_files)):
+            simulate_case(case_id)
 
+    prof.save(result_dir)
     print("\n[완료] All simulations finished.\n")
 
 if __name__ == "__main__":
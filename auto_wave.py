@@ -0,0 +1,171 @@
+# ============================================================
+# 실패 case 의 실패 cycle 주변만 waveform 재시뮬레이션
+#
+# 전체 run 을 VCD 로 덤프하면 너무 크고 느려서 평소에는 덤프하지 않음
+# auto_compare 가 끝난 뒤 실패한 case 마다 ('Mismatch at line N' → cycle N-1)
+#   - 같은 입력 hex 로 TB 를 다시 만들고
+#   - 시작하자마자 $dumpoff, [cycle-window, cycle+window] 에서만 $dumpon
+#   - 창이 끝나면 바로 $finish
+# → 덤프 비용이 run 길이가 아니라 창 크기에 비례
+#
+# 결과 : results/wave_case<N>.vcd, results/WAVEresult_case<N>.txt
+#
+# 사용 : python auto_wave.py [--window 100] [--cases 3,5]
+#        (auto_system.py 는 compare 뒤에 자동으로 실행)
+# ============================================================
+
+import argparse
+import json
+import os
+
+from auto_compare import FAIL_LINE_RE, load_all_configs
+from auto_rundir import current_result_dir
+from auto_storage import restore_plain
+
+WAVE_WINDOW = 100       # 실패 cycle 앞뒤로 덤프할 cycle 수
+WAVE_SUFFIX = "_wave"   # 재시뮬레이션 TB 의 파일 / 모듈 이름 뒤에 붙음
+
+
+# ------------------------------------------------------------
+# compare_case<N>.txt 에서 실패 cycle 찾기
+# ------------------------------------------------------------
+def failing_cycle(case_id, result_dir="results"):
+    path = os.path.join(result_dir, f"compare_case{case_id}.txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("[FAIL]"):
+                m = FAIL_LINE_RE.search(line)
+                return int(m.group(1)) - 1 if m else None
+    return None
+
+
+def wave_paths(case_id, result_dir="results"):
+    return (os.path.join(result_dir, f"wave_case{case_id}.vcd"),
+            os.path.join(result_dir, f"WAVEresult_case{case_id}.txt"))
+
+
+def case_run_info(info, cfg):
+    """batch 실행이면 case 마다 top / clk / reset 이 다를 수 있음 → config 의 "run" 우선"""
+    run = cfg.get("run") or {}
+    return dict(info, **{k: run[k] for k in ("top", "clk", "reset") if run.get(k)})
+
+
+# ------------------------------------------------------------
+# case 하나 재시뮬레이션
+# ------------------------------------------------------------
+def resimulate_case(info, cfg, cycle, window=WAVE_WINDOW, result_dir="results"):
+    from auto_vsim import build_tb_case, run_cmd, tb_module_name
+
+    info = case_run_info(info, cfg)
+    case_id = cfg["case_id"]
+    top = info["top"]
+    start = max(0, cycle - window)
+    stop = min(cfg["cycles"] - 1, cycle + window)
+    vcd_path, log_path = wave_paths(case_id, result_dir)
+
+    # config 의 포트 / 파라미터 → parse_ports / parse_parameters 형식
+    ports = [{"dir": p["dir"], "name": p["name"], "full": p["full_decl"]} for p in cfg["ports"]]
+    params = [(k, str(v)) for k, v in cfg["params"].items()]
+
+    tb_text = build_tb_case(top, ports, params, case_id, cfg["cycles"],
+                            info["clk"], info["reset"],
+                            dump_window=(start, stop, vcd_path), hex_dir=result_dir,
+                            suffix=WAVE_SUFFIX)
+    # 모듈 이름도 _wave : 같은 이름이면 vlog 가 work 의 원래 TB 를 덮어씀
+    tb_name = tb_module_name(top, case_id, WAVE_SUFFIX)
+    tb_file = os.path.join(result_dir, f"{tb_name}.sv")
+    with open(tb_file, "w", encoding="utf-8") as f:
+        f.write(tb_text)
+
+    # --compress 로 압축된 입력 hex 는 재시뮬레이션 동안만 plain 으로
+    restored = [p for p in cfg["hex_files"].values() if restore_plain(p)]
+    try:
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write(f"==== Waveform re-simulation for case {case_id} "
+                    f"(cycles {start}..{stop}) ====\n")
+        run_cmd(["vlog", "-sv", tb_file], log_path)
+        run_cmd(["vsim", "-c", tb_name, "-do", "run -all; quit;"], log_path)
+    finally:
+        for p in restored:
+            os.remove(p)
+
+    print(f"[+] Waveform CASE {case_id}: cycles {start}..{stop} → {vcd_path}")
+    return vcd_path
+
+
+# ------------------------------------------------------------
+# run 정보 / 실패 case config 읽기 (auto_shrink 도 사용)
+# ------------------------------------------------------------
+def load_run_info(result_dir="results"):
+    info_path = os.path.join(result_dir, "run_info.json")
+    if not os.path.exists(info_path):
+        print(f"[ERROR] {info_path} not found (run auto_vsim.py first)")
+        return None
+    with open(info_path, "r", encoding="utf-8") as f:
+        info = json.load(f)
+    if not info.get("clk") or not info.get("reset"):
+        print("[ERROR] run_info.json has no clk / reset names")
+        return None
+    return info
+
+
+def load_case_configs(result_dir="results", case_ids=None):
+    configs = load_all_configs(result_dir)      # json + results.db
+    from auto_resultstore import ResultStore, db_path, export
+    if os.path.exists(db_path(result_dir)):
+        # --store run : 실패한 case 중 파일(compare 리포트 / hex)이 아직 db 에만 있는 것만 꺼내옴
+        with ResultStore(result_dir) as store:
+            failed = {cid for cid, *_ in store.verdicts(failed_only=True)}
+        if case_ids is not None:
+            failed &= case_ids
+        missing = {cid for cid in failed
+                   if not os.path.exists(os.path.join(result_dir, f"compare_case{cid}.txt"))}
+        if missing:
+            export(result_dir, missing)
+
+    return [cfg for cfg in configs if case_ids is None or cfg["case_id"] in case_ids]
+
+
+def resimulate_failures(window=WAVE_WINDOW, case_ids=None, result_dir="results"):
+    info = load_run_info(result_dir)
+    if info is None:
+        return []
+
+    targets = []
+    for cfg in load_case_configs(result_dir, case_ids):
+        if cfg.get("stimulus", "file") != "file":
+            print(f"[+] CASE {cfg['case_id']}: streamed stimulus cannot be replayed (skip)")
+            continue
+        cycle = failing_cycle(cfg["case_id"], result_dir)
+        if cycle is not None:
+            targets.append((cfg, cycle))
+
+    if not targets:
+        print("[+] No failing case with a cycle position → no waveform re-simulation")
+        return []
+
+    from auto_vsim import check_modelsim
+    check_modelsim()
+
+    return [resimulate_case(info, cfg, cycle, window, result_dir) for cfg, cycle in targets]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="waveform re-simulation around failing cycles")
+    ap.add_argument("--window", type=int, default=WAVE_WINDOW,
+                    help="cycles to dump before and after the failing cycle")
+    ap.add_argument("--cases", help="comma separated case ids (default: every failing case)")
+    ap.add_argument("--result-dir", default=current_result_dir(),
+                    help="run directory (default: the current run, else results)")
+    args = ap.parse_args()
+
+    case_ids = None
+    if args.cases:
+        case_ids = {int(c) for c in args.cases.split(",")}
+    resimulate_failures(args.window, case_ids, args.result_dir)
+
+
+if __name__ == "__main__":
+    main()
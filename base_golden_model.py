@@ -1,5 +1,31 @@
 # base_golden_model.py
+import copy
 import math
+import sys
+
+
+# ============================================================
+# packed bus → lane 값 (lane0 = LSB)
+#   8/16/32/64-bit lane : to_bytes 한 번 + memoryview.cast 로 읽음
+#     (lane 마다 (v >> k*W) & mask 를 하면 4096-bit 값을 lane 수만큼 다시 훑음)
+#   그 외 폭 : shift / mask loop (문자열로 잘라 읽는 것보다 빠름, 60-bit lane 기준 약 2 배)
+# ============================================================
+_LANE_FORMATS = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+
+def unpack_lanes(value, lane_width, lanes):
+    """packed int 하나 → lane 값 sequence"""
+    # lanes 개 lane 보다 위의 bit 는 버림 (to_bytes 폭을 넘지 않도록)
+    value &= (1 << lane_width * lanes) - 1
+    fmt = _LANE_FORMATS.get(lane_width)
+    if fmt is not None:
+        if sys.byteorder == "little":
+            return memoryview(value.to_bytes(lanes * lane_width // 8, "little")).cast(fmt)
+        return memoryview(value.to_bytes(lanes * lane_width // 8, "big")).cast(fmt)[::-1]
+
+    mask = (1 << lane_width) - 1
+    return [(value >> (k * lane_width)) & mask for k in range(lanes)]
+
 
 class BaseGoldenModel:
     """
@@ -29,6 +55,35 @@ class BaseGoldenModel:
     def reset(self):
         self.queue = [None] * self.latency
 
+    # --------------------------------------------------------------
+    # 상태 snapshot
+    #   auto_golden 의 shard 실행이 warm-up 이 충분한지 검사할 때 사용
+    # --------------------------------------------------------------
+    def snapshot(self):
+        """params 를 제외한 내부 상태의 복사본"""
+        return copy.deepcopy({k: v for k, v in self.__dict__.items() if k != "params"})
+
+    # --------------------------------------------------------------
+    def warmup_cycles(self):
+        """
+        상태가 최근 몇 cycle 의 입력만으로 결정되는지 (기본: latency FIFO 깊이).
+        누산기처럼 더 오래된 입력에 의존하는 모델은 None 을 반환 → shard 실행 안 함
+        """
+        return self.latency
+
+    # --------------------------------------------------------------
+    # packed bus helper (lane 폭 / 개수 기본값 = DATA_WIDTH / INPUT_COUNT)
+    # --------------------------------------------------------------
+    def lanes(self, value, lane_width=None, count=None):
+        """packed 입력 → lane 값들 (sum / max 등을 바로 적용 가능)"""
+        return unpack_lanes(value, lane_width or self.params["DATA_WIDTH"],
+                            count or self.params["INPUT_COUNT"])
+
+    def lane(self, value, index, lane_width=None):
+        """lane 하나만 (shift 한 번)"""
+        width = lane_width or self.params["DATA_WIDTH"]
+        return (value >> (index * width)) & ((1 << width) - 1)
+
     # --------------------------------------------------------------
     def compute_raw(self, inputs: dict):
         """
@@ -29,11 +29,5 @@ class GoldenAdderTree(BaseGoldenModel):
         if flat is None:
             return None
 
-        mask = (1 << self.DATA_WIDTH) - 1
-        total = 0
-
-        for i in range(self.INPUT_COUNT):
-            part = (flat >> (i * self.DATA_WIDTH)) & mask
-            total += part
-
-        return total
+        # lane 전체 합을 한 번에 (lane 별 shift / mask loop 없음)
+        return sum(self.lanes(flat))
@@ -41,8 +41,7 @@ class GoldenMux(BaseGoldenModel):
         if sel < 0 or sel >= self.INPUT_COUNT:
             return 0
 
-        mask = (1 << self.DATA_WIDTH) - 1
-        return (data_in_int >> (sel * self.DATA_WIDTH)) & mask
+        return self.lane(data_in_int, sel)
 
     # ---------------------------------------------------------
     # step